@@ -1,2 +1,5 @@
 from DiffTool.parser import *
-from DiffTool.utils import *
\ No newline at end of file
+from DiffTool.utils import *
+from DiffTool.scan import *
+from DiffTool.model import *
+from DiffTool.report import *
\ No newline at end of file
@@ -0,0 +1,5 @@
+from DiffTool.model.records import *
+from DiffTool.model.snapshot import *
+from DiffTool.model.deprecation_index import *
+from DiffTool.model.hierarchy import *
+from DiffTool.model.matching import *
\ No newline at end of file
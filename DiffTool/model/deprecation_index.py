@@ -0,0 +1,125 @@
+import os
+import sqlite3
+from collections.abc import Iterable
+from typing import Any
+
+
+DEPRECATION_INDEX_FORMAT_VERSION = 1
+DEPRECATION_FIELDS = ("relpath", "module", "name", "scope", "reason", "declaration", "macro", "version")
+
+
+def version_key(version: str) -> tuple[int, ...]:
+    """Orders engine versions numerically, so "5.10" comes after "5.9"."""
+    return tuple(int(part) for part in version.split("."))
+
+
+class DeprecationIndex:
+    """
+    Deprecation records of an engine tree, keyed by the version they were deprecated in.
+
+    Built in a single pass over the tree, after which any version can be reported without rescanning it.
+    """
+
+    def __init__(self, records: Iterable[dict[str, Any]] = ()):
+        self.by_version: dict[str, list[dict[str, Any]]] = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Adds a deprecation record, which must have a `version`."""
+        self.by_version.setdefault(record["version"], []).append(record)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self.by_version.values())
+
+    def versions(self) -> list[str]:
+        """Returns the versions with at least one deprecation, oldest first."""
+        return sorted(self.by_version, key=version_key)
+
+    def deprecated_in(self, version: str) -> list[dict[str, Any]]:
+        """Returns the records deprecated in exactly `version`, in engine tree order."""
+        return list(self.by_version.get(version, []))
+
+    def deprecated_since(self, max_version: str) -> list[dict[str, Any]]:
+        """Returns the records deprecated in `max_version` or earlier, oldest version first."""
+        return [
+            record
+            for version in self.versions() if version_key(version) <= version_key(max_version)
+            for record in self.by_version[version]
+        ]
+
+    def save(self, path: str, **meta: str) -> None:
+        """
+        Saves the index as a SQLite database indexed by version.
+
+        Args:
+            path: Index file to write, replaced if it exists
+            **meta: Descriptive metadata stored alongside, e.g. `choice="Plugins"`
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        db = sqlite3.connect(tmp_path)
+        try:
+            db.executescript(f"""
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE deprecations (id INTEGER PRIMARY KEY, {", ".join(DEPRECATION_FIELDS)});
+            """)
+            db.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("format_version", str(DEPRECATION_INDEX_FORMAT_VERSION)),
+                    *((key, str(value)) for key, value in meta.items()),
+                ],
+            )
+            db.executemany(
+                f"INSERT INTO deprecations ({', '.join(DEPRECATION_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(DEPRECATION_FIELDS))})",
+                (
+                    tuple(record.get(field) for field in DEPRECATION_FIELDS)
+                    for records in self.by_version.values() for record in records
+                ),
+            )
+            db.execute("CREATE INDEX deprecations_by_version ON deprecations (version)")
+            db.commit()
+        finally:
+            db.close()
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> tuple["DeprecationIndex", dict[str, str]]:
+        """
+        Loads an index written by `save`.
+
+        Returns:
+            tuple[DeprecationIndex, dict[str, str]]: The index and its metadata
+
+        Raises:
+            ValueError: If the file is not a deprecation index or was written in another format version
+        """
+        if not os.path.isfile(path):
+            raise ValueError(f"Deprecation index not found: {path}")
+
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            try:
+                meta = dict(db.execute("SELECT key, value FROM meta"))
+            except sqlite3.DatabaseError as e:
+                raise ValueError(f"Not a deprecation index: {path}") from e
+            if meta.get("format_version") != str(DEPRECATION_INDEX_FORMAT_VERSION):
+                raise ValueError(
+                    f"Deprecation index format version {meta.get('format_version')} is not supported, "
+                    f"expected {DEPRECATION_INDEX_FORMAT_VERSION}: {path}"
+                )
+
+            index = cls(
+                dict(zip(DEPRECATION_FIELDS, row))
+                for row in db.execute(f"SELECT {', '.join(DEPRECATION_FIELDS)} FROM deprecations ORDER BY id")
+            )
+        finally:
+            db.close()
+
+        meta.pop("format_version")
+        return index, meta
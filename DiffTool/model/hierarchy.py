@@ -0,0 +1,97 @@
+from collections import deque
+from DiffTool.model.records import UClassRecord
+
+
+def parse_specifiers(params: tuple[str, ...]) -> frozenset[str]:
+    """Returns the specifier names of UCLASS parameters, e.g. `meta` for `meta=(DisplayName="Foo")`."""
+    return frozenset(param.split('=')[0].strip() for param in params)
+
+
+class ClassHierarchy:
+    """
+    Parent and child links between parsed UE classes, with the specifiers of every class parsed once.
+
+    Classes are walked iteratively, so deep inheritance chains cannot exceed the recursion limit, and inheritance
+    cycles in malformed input terminate.
+
+    Args:
+        u_classes: Classes as returned by `parse_ue_classes`
+    """
+
+    def __init__(self, u_classes: dict[str, UClassRecord]):
+        self.specifiers: dict[str, frozenset[str]] = {}
+        self.parents: dict[str, tuple[str, ...]] = {}
+        self.children: dict[str, list[str]] = {}
+        for class_name, class_info in u_classes.items():
+            self.specifiers[class_name] = parse_specifiers(class_info.uclass_params)
+            self.parents[class_name] = tuple(parent.name for parent in class_info.inheritance_list)
+            for parent in self.parents[class_name]:
+                # Parents outside the parsed classes, e.g. UObject, are kept so their subclasses can be listed
+                self.children.setdefault(parent, []).append(class_name)
+
+        self._blueprintable: frozenset[str] | None = None
+        self._inherited: dict[str, frozenset[str]] = {}
+
+    def __contains__(self, class_name: str) -> bool:
+        return class_name in self.specifiers
+
+    def blueprintable_classes(self) -> frozenset[str]:
+        """
+        Returns the classes that can be extended in Blueprints, resolved for all classes in one pass.
+
+        A class is Blueprintable if it is not marked `NotBlueprintable`, and is either marked `Blueprintable` or has a
+        Blueprintable parent.
+        """
+        if self._blueprintable is None:
+            blueprintable = set()
+            queue = deque(
+                class_name for class_name, specifiers in self.specifiers.items()
+                if "Blueprintable" in specifiers and "NotBlueprintable" not in specifiers
+            )
+            blueprintable.update(queue)
+            while queue:
+                for child in self.children.get(queue.popleft(), ()):
+                    if child not in blueprintable and "NotBlueprintable" not in self.specifiers[child]:
+                        blueprintable.add(child)
+                        queue.append(child)
+            self._blueprintable = frozenset(blueprintable)
+        return self._blueprintable
+
+    def is_blueprintable(self, class_name: str) -> bool:
+        return class_name in self.blueprintable_classes()
+
+    def subclasses(self, class_name: str) -> list[str]:
+        """Returns every direct and indirect subclass of a class, nearest first."""
+        result, seen = [], {class_name}
+        queue = deque([class_name])
+        while queue:
+            for child in self.children.get(queue.popleft(), ()):
+                if child not in seen:
+                    seen.add(child)
+                    result.append(child)
+                    queue.append(child)
+        return result
+
+    def inherited_specifiers(self, class_name: str) -> frozenset[str]:
+        """Returns the specifiers of a class together with those of all its ancestors, memoized per class."""
+        if class_name in self._inherited:
+            return self._inherited[class_name]
+
+        # Resolve ancestors first, with an explicit stack instead of recursion
+        stack, visiting = [class_name], {class_name}
+        while stack:
+            current = stack[-1]
+            pending = [
+                parent for parent in self.parents.get(current, ())
+                if parent not in self._inherited and parent not in visiting
+            ]
+            if pending:
+                visiting.update(pending)
+                stack.extend(pending)
+                continue
+            stack.pop()
+            inherited = set(self.specifiers.get(current, ()))
+            for parent in self.parents.get(current, ()):
+                inherited.update(self._inherited.get(parent, ()))   # Missing only for a parent in a cycle
+            self._inherited[current] = frozenset(inherited)
+        return self._inherited[class_name]
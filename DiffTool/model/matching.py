@@ -0,0 +1,151 @@
+import random
+import hashlib
+from collections.abc import Callable, Hashable, Iterable
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def stable_hash(text: str) -> int:
+    """Hashes a string to 64 bits, the same in every process, unlike the salted built-in `hash`."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Returns the Jaccard similarity of two sets, 0 if both are empty."""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def pair_by_key(removed: dict[Hashable, Hashable], added: dict[Hashable, Hashable]) -> list[tuple[Hashable, Hashable]]:
+    """
+    Pairs removed and added items with the same key, e.g. a hashed signature. Keys shared by several removed or
+    several added items are ambiguous and pair nothing.
+
+    Args:
+        removed: Keys of the removed items, by item
+        added: Keys of the added items, by item
+
+    Returns:
+        list[tuple[Hashable, Hashable]]: The paired removed and added items, in the order of `removed`
+    """
+    added_by_key: dict[Hashable, list[Hashable]] = {}
+    for item, key in added.items():
+        added_by_key.setdefault(key, []).append(item)
+    removed_counts: dict[Hashable, int] = {}
+    for key in removed.values():
+        removed_counts[key] = removed_counts.get(key, 0) + 1
+    return [
+        (item, added_by_key[key][0])
+        for item, key in removed.items()
+        if removed_counts[key] == 1 and len(added_by_key.get(key, ())) == 1
+    ]
+
+
+class MinHashLSH:
+    """
+    Locality-sensitive index of feature sets, which finds the sets likely similar to a query without comparing it to
+    every indexed set.
+
+    Each set is summarized by a MinHash signature of `bands * rows` values, whose agreement estimates the Jaccard
+    similarity of two sets. Signatures are split into bands, and sets sharing any band are candidates. Two sets of
+    similarity s become candidates with probability `1 - (1 - s ** rows) ** bands`, about 0.5 at `(1 / bands) **
+    (1 / rows)`, so candidates must still be scored, e.g. with `jaccard`.
+
+    Args:
+        bands: Number of bands of a signature
+        rows: Number of signature values per band
+        seed: Seed of the hash permutations, so signatures are the same in every run
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 3, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(bands * rows)
+        ]
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[Hashable]] = {}
+
+    def signature(self, features: Iterable[str]) -> tuple[int, ...]:
+        """Returns the MinHash signature of a non-empty feature set."""
+        hashes = [stable_hash(feature) for feature in features]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._permutations)
+
+    def _bands(self, signature: tuple[int, ...]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, item: Hashable, features: Iterable[str]) -> None:
+        """Indexes the feature set of an item."""
+        for bucket in self._bands(self.signature(features)):
+            self._buckets.setdefault(bucket, []).append(item)
+
+    def candidates(self, features: Iterable[str]) -> set[Hashable]:
+        """Returns the indexed items sharing at least one band with a feature set."""
+        found = set()
+        for bucket in self._bands(self.signature(features)):
+            found.update(self._buckets.get(bucket, ()))
+        return found
+
+
+def match_similar(
+    removed: dict[Hashable, frozenset[str]],
+    added: dict[Hashable, frozenset[str]],
+    threshold: float = 0.5,
+    bands: int = 32,
+    rows: int = 3,
+    related: Callable[[Hashable, Hashable], bool] | None = None,
+) -> list[tuple[Hashable, Hashable, float]]:
+    """
+    Pairs removed and added items with similar feature sets, e.g. a renamed class with the signatures of its functions.
+
+    Items with the same feature set are paired by their hash first. The others are compared only to the candidates
+    found by a `MinHashLSH` index of the added items, rather than to every added item, and pairs are made greedily,
+    most similar first, so each item is paired at most once.
+
+    Args:
+        removed: Feature sets of the removed items, by item. Empty sets are never paired
+        added: Feature sets of the added items, by item
+        threshold: Minimum Jaccard similarity of a pair
+        bands: Number of bands of the LSH index
+        rows: Number of signature values per band of the LSH index
+        related: Optional predicate of a removed and an added item, which similar items must also satisfy to pair,
+            e.g. sharing enough of the features that identify them
+
+    Returns:
+        list[tuple[Hashable, Hashable, float]]: The paired removed and added items with their similarity, most similar
+            first
+    """
+    removed = {item: features for item, features in removed.items() if features}
+    added = {item: features for item, features in added.items() if features}
+    pairs = [
+        (prev, cur, 1.0)
+        for prev, cur in pair_by_key(
+            {item: hash(features) for item, features in removed.items()},
+            {item: hash(features) for item, features in added.items()},
+        )
+        if removed[prev] == added[cur] and (related is None or related(prev, cur))  # Rules out hash collisions
+    ]
+    paired_removed = {prev for prev, _, _ in pairs}
+    paired_added = {cur for _, cur, _ in pairs}
+
+    index = MinHashLSH(bands, rows)
+    for item, features in added.items():
+        if item not in paired_added:
+            index.add(item, features)
+    scored = []
+    for prev, features in removed.items():
+        if prev in paired_removed:
+            continue
+        for cur in index.candidates(features):
+            similarity = jaccard(features, added[cur])
+            if similarity >= threshold and (related is None or related(prev, cur)):
+                scored.append((similarity, str(prev), str(cur), prev, cur))
+
+    for similarity, _, _, prev, cur in sorted(scored, key=lambda score: (-score[0], score[1], score[2])):
+        if prev not in paired_removed and cur not in paired_added:
+            paired_removed.add(prev)
+            paired_added.add(cur)
+            pairs.append((prev, cur, similarity))
+    return pairs
@@ -0,0 +1,59 @@
+import sys
+from dataclasses import dataclass, field
+
+
+def intern_all(strings) -> tuple[str, ...]:
+    """Interns strings so that repeated names and specifiers share one object across classes and trees."""
+    return tuple(sys.intern(string) for string in strings)
+
+
+@dataclass(slots=True)
+class BaseRef:
+    """A base class in a class declaration."""
+    access: str
+    name: str
+
+    def __post_init__(self):
+        self.access = sys.intern(self.access)
+        self.name = sys.intern(self.name)
+
+    def __reduce__(self):
+        # Unpickling goes through __init__, so results sent back by worker processes are interned too
+        return BaseRef, (self.access, self.name)
+
+
+@dataclass(slots=True)
+class UFunctionRecord:
+    """
+    A UFUNCTION, its specifiers, e.g. `BlueprintCallable` or `Category="Tools"`, and its declaration without macros,
+    e.g. `bool Foo(int32 X) const`, empty if unknown.
+    """
+    name: str
+    ufunc_params: tuple[str, ...] = ()
+    declaration: str = ""
+
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
+        self.ufunc_params = intern_all(self.ufunc_params)
+
+    def __reduce__(self):
+        return UFunctionRecord, (self.name, self.ufunc_params, self.declaration)
+
+
+@dataclass(slots=True)
+class UClassRecord:
+    """A UCLASS with its header path relative to the engine root, specifiers, bases and UFUNCTIONs."""
+    name: str
+    relpath: str
+    uclass_params: tuple[str, ...] = ()
+    inheritance_list: tuple[BaseRef, ...] = ()
+    ufunctions: list[UFunctionRecord] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
+        self.relpath = sys.intern(self.relpath)
+        self.uclass_params = intern_all(self.uclass_params)
+        self.inheritance_list = tuple(self.inheritance_list)
+
+    def __reduce__(self):
+        return UClassRecord, (self.name, self.relpath, self.uclass_params, self.inheritance_list, self.ufunctions)
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+from DiffTool.model.records import BaseRef, UFunctionRecord, UClassRecord
+
+
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_SUFFIX = ".uesnap"
+
+# Lists are packed with ASCII separator characters, which never occur in C++ headers and split much faster than JSON
+_UNIT, _RECORD, _GROUP = "\x1f", "\x1e", "\x1d"
+
+
+def _pack_list(items: list[str]) -> str:
+    return _UNIT.join(items)
+
+
+def _unpack_list(packed: str) -> list[str]:
+    return packed.split(_UNIT) if packed else []
+
+
+def save_snapshot(u_classes: dict[str, UClassRecord], path: str, **meta: str) -> None:
+    """
+    Saves parsed UE classes as a versioned snapshot, so a tree can later be diffed without being present or parsed.
+
+    The snapshot is a SQLite database holding one row per class in parse order, indexed by class name and relpath.
+
+    Args:
+        u_classes: Classes as returned by `parse_ue_classes`
+        path: Snapshot file to write, replaced if it exists
+        **meta: Descriptive metadata stored alongside, e.g. `engine_version="5.5"`
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    db = sqlite3.connect(tmp_path)
+    try:
+        db.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE classes (
+                id INTEGER PRIMARY KEY, name TEXT NOT NULL, relpath TEXT NOT NULL,
+                uclass_params TEXT NOT NULL, inheritance_list TEXT NOT NULL, ufunctions TEXT NOT NULL
+            );
+        """)
+        db.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("format_version", str(SNAPSHOT_FORMAT_VERSION)), *((key, str(value)) for key, value in meta.items())],
+        )
+        db.executemany(
+            "INSERT INTO classes VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    class_id,
+                    class_name,
+                    class_info.relpath,
+                    _pack_list(class_info.uclass_params),
+                    _pack_list([f"{base.access}{_RECORD}{base.name}" for base in class_info.inheritance_list]),
+                    _GROUP.join(
+                        _RECORD.join([function.name, _pack_list(function.ufunc_params), function.declaration])
+                        for function in class_info.ufunctions
+                    ),
+                )
+                for class_id, (class_name, class_info) in enumerate(u_classes.items())
+            ),
+        )
+        db.execute("CREATE UNIQUE INDEX classes_by_name ON classes (name)")
+        db.execute("CREATE INDEX classes_by_relpath ON classes (relpath)")
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> tuple[dict[str, UClassRecord], dict[str, str]]:
+    """
+    Loads a snapshot written by `save_snapshot`.
+
+    Returns:
+        tuple[dict[str, UClassRecord], dict[str, str]]: The classes, in the same structure and order as returned
+            by `parse_ue_classes`, and the snapshot metadata
+
+    Raises:
+        ValueError: If the file is not a snapshot or was written in another format version
+    """
+    if not os.path.isfile(path):
+        raise ValueError(f"Snapshot not found: {path}")
+
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        try:
+            meta = dict(db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Not a snapshot file: {path}") from e
+        if meta.get("format_version") != str(SNAPSHOT_FORMAT_VERSION):
+            raise ValueError(
+                f"Snapshot format version {meta.get('format_version')} is not supported, "
+                f"expected {SNAPSHOT_FORMAT_VERSION}: {path}"
+            )
+
+        u_classes: dict[str, UClassRecord] = {}
+        for name, relpath, uclass_params, inheritance_list, ufunctions in db.execute(
+            "SELECT name, relpath, uclass_params, inheritance_list, ufunctions FROM classes ORDER BY id"
+        ):
+            bases = []
+            for base in _unpack_list(inheritance_list):
+                access, base_name = base.split(_RECORD)
+                bases.append(BaseRef(access, base_name))
+            functions = []
+            for function in ufunctions.split(_GROUP) if ufunctions else []:
+                function_name, ufunc_params, declaration = function.split(_RECORD)
+                functions.append(UFunctionRecord(function_name, _unpack_list(ufunc_params), declaration))
+
+            u_classes[name] = UClassRecord(name, relpath, _unpack_list(uclass_params), bases, functions)
+    finally:
+        db.close()
+
+    meta.pop("format_version")
+    return u_classes, meta
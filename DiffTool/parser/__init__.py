@@ -1 +1,5 @@
-from DiffTool.parser.parser import *
\ No newline at end of file
+from DiffTool.parser.parser import *
+from DiffTool.parser.backends import *
+from DiffTool.parser.macros import *
+from DiffTool.parser.deprecations import *
+from DiffTool.parser.scopes import *
\ No newline at end of file
@@ -0,0 +1,165 @@
+import re
+import hashlib
+from DiffTool.utils.counters import count, run_counters
+
+
+class ClassDeclarationBackend:
+    """
+    Interface of the class declaration parsers tried by `TieredClassDeclarationParser`.
+
+    `parse` takes a declaration formed as `class NAME : BASES {};` and returns the same dictionary as
+    `parse_class_declaration`, returns None to decline it and pass it to the next tier, or raises ValueError when
+    the declaration is invalid.
+    """
+    name = "backend"
+
+    def parse(self, class_decl: str) -> dict[str, any] | None:
+        raise NotImplementedError
+
+
+class FastClassDeclarationBackend(ClassDeclarationBackend):
+    """
+    Linear token scanner for the common `class NAME [final] : [virtual] access Base, ... {};` shapes.
+
+    Declines templates, attributes and anything else it does not recognize.
+    """
+    name = "fast"
+
+    _TOKEN = re.compile(r'\s*(::|[A-Za-z_][A-Za-z0-9_]*|\S)')
+    _KEYWORDS = {'class', 'struct', 'final', 'virtual', 'public', 'protected', 'private'}
+    _ACCESS = {'public', 'protected', 'private'}
+
+    def parse(self, class_decl: str) -> dict[str, any] | None:
+        tokens = self._tokenize(class_decl)
+        if len(tokens) < 5 or tokens[-3:] != ['{', '}', ';']:
+            return None
+        tokens = tokens[:-3]
+
+        class_key = tokens[0]
+        if class_key not in ('class', 'struct'):
+            return None
+        default_access = 'private' if class_key == 'class' else 'public'
+
+        name, i = self._read_qualified_name(tokens, 1)
+        if name is None:
+            return None
+        if i < len(tokens) and tokens[i] == 'final':
+            i += 1
+
+        bases = []
+        if i < len(tokens):
+            if tokens[i] != ':':
+                return None
+            i += 1
+            while True:
+                access = None
+                while i < len(tokens) and (tokens[i] in self._ACCESS or tokens[i] == 'virtual'):
+                    if tokens[i] in self._ACCESS:
+                        if access is not None:
+                            return None
+                        access = tokens[i]
+                    i += 1
+                base_name, i = self._read_qualified_name(tokens, i)
+                if base_name is None:
+                    return None
+                bases.append({'access': access or default_access, 'name': base_name})
+                if i == len(tokens):
+                    break
+                if tokens[i] != ',':
+                    return None
+                i += 1
+
+        return {'name': name, 'bases': bases}
+
+    def _tokenize(self, class_decl: str) -> list[str]:
+        tokens = []
+        pos = 0
+        end = len(class_decl.rstrip())
+        while pos < end:
+            match = self._TOKEN.match(class_decl, pos)
+            tokens.append(match.group(1))
+            pos = match.end()
+        return tokens
+
+    def _read_qualified_name(self, tokens: list[str], i: int) -> tuple[str | None, int]:
+        """Reads `[::]A::B::C` starting at token `i`, returning the name and the index after it."""
+        segments = []
+        if i < len(tokens) and tokens[i] == '::':
+            segments.append('')
+            i += 1
+        while True:
+            if i >= len(tokens) or not self._is_identifier(tokens[i]):
+                return None, i
+            segments.append(tokens[i])
+            i += 1
+            if i < len(tokens) and tokens[i] == '::':
+                i += 1
+            else:
+                return '::'.join(segments), i
+
+    def _is_identifier(self, token: str) -> bool:
+        return (token[0].isalpha() or token[0] == '_') and token not in self._KEYWORDS
+
+
+class TieredClassDeclarationParser:
+    """
+    Parses class declarations with a list of backends, falling through to the next one whenever a backend declines.
+
+    Tier hits are recorded in the run counters as `class_decl.<backend name>`.
+
+    Args:
+        backends: The tiers to try in order. The last one should never decline, e.g. `CxxHeaderParserBackend`
+        cross_check_rate: Fraction of declarations accepted by an earlier tier that are also parsed by the last tier
+            and compared; on a mismatch the last tier's result is used and the difference is printed
+        seed: Salt of the sampling. Whether a declaration is cross-checked is decided by hashing it, so every worker
+            process samples the same declarations, and a declaration is sampled or not the same way in every run
+    """
+
+    def __init__(
+        self,
+        backends: list[ClassDeclarationBackend],
+        cross_check_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.backends = backends
+        self.cross_check_rate = cross_check_rate
+        self.seed = seed
+
+    def parse(self, class_decl: str) -> dict[str, any]:
+        for backend in self.backends:
+            result = backend.parse(class_decl)
+            if result is None:
+                continue
+            count(f"class_decl.{backend.name}")
+
+            reference_backend = self.backends[-1]
+            if backend is not reference_backend and self._sampled(class_decl):
+                count("class_decl.cross_checked")
+                reference = reference_backend.parse(class_decl)
+                if reference != result:
+                    count("class_decl.mismatches")
+                    print(f"Class declaration mismatch ({backend.name} vs {reference_backend.name}): {class_decl}")
+                    return reference
+            return result
+
+        raise ValueError(f"No backend could parse class declaration: {class_decl}")
+
+    def _sampled(self, class_decl: str) -> bool:
+        """Whether a declaration is among the `cross_check_rate` of declarations that are cross-checked."""
+        if self.cross_check_rate <= 0.0:
+            return False
+        digest = hashlib.blake2b(f"{self.seed}:{class_decl}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") < self.cross_check_rate * (1 << 64)
+
+    def summary(self) -> str:
+        """Formats the per-tier hit rates recorded in the run counters."""
+        hits = {backend.name: run_counters[f"class_decl.{backend.name}"] for backend in self.backends}
+        total = sum(hits.values()) or 1
+        tiers = ", ".join(f"{name} {n} ({n / total:.1%})" for name, n in hits.items())
+        summary = f"Class declarations: {tiers}"
+        if self.cross_check_rate:
+            summary += (
+                f", cross-checked {run_counters['class_decl.cross_checked']}"
+                f" with {run_counters['class_decl.mismatches']} mismatches"
+            )
+        return summary
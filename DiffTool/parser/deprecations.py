@@ -0,0 +1,57 @@
+import re
+
+
+DEPRECATION_MACROS = ("UE_DEPRECATED", "UE_DEPRECATED_FORGAME", "UE_DEPRECATED_FORENGINE")
+
+
+def _compile_deprecation_pattern(macros: tuple[str, ...]) -> re.Pattern:
+    # Longest names first, so a macro is never matched as the prefix of another
+    alternatives = "|".join(re.escape(macro) for macro in sorted(macros, key=len, reverse=True))
+    return re.compile(
+        rf'^\s*({alternatives})\s*\(\s*(\d+\.\d+)\s*,\s*"(.*?)"\s*\)\s*?\n\s*(.*?)\s*?(?=\n|$)',
+        re.MULTILINE | re.DOTALL
+    )
+
+
+_DEPRECATION_PATTERN = _compile_deprecation_pattern(DEPRECATION_MACROS)
+
+
+def find_deprecations(content: str, macros: tuple[str, ...] = DEPRECATION_MACROS) -> list[dict[str, any]]:
+    """
+    Finds every deprecation macro placed on its own line before a declaration, whatever its version.
+
+    Args:
+        content: Preprocessed source code
+        macros: The deprecation macros to match, all in the same pass
+
+    Returns:
+        list[dict[str, any]]: One record per deprecation, in source order, with
+            - `macro`: the matched macro, e.g. `UE_DEPRECATED_FORGAME`
+            - `version`: the engine version the declaration was deprecated in
+            - `name`: the name of the deprecated function
+            - `reason`: the deprecation message
+            - `declaration`: the line following the macro
+            - `span`: the `(start, end)` span from the macro to the end of the declaration line
+
+    Raises:
+        ValueError: If the line following a macro is not a declaration
+    """
+    pattern = _DEPRECATION_PATTERN if macros == DEPRECATION_MACROS else _compile_deprecation_pattern(macros)
+
+    deprecations: list[dict[str, any]] = []
+    for match in pattern.finditer(content):
+        macro, version, reason, declaration = match.groups()
+        declaration = declaration.strip()
+        name = declaration[:declaration.find('(')].strip().split()
+        if not name:
+            raise ValueError(f"Malformed deprecated declaration: {declaration[:50]}...")
+
+        deprecations.append({
+            "macro": macro,
+            "version": version,
+            "name": name[-1],
+            "reason": reason,
+            "declaration": declaration,
+            "span": (match.start(1), match.end()),
+        })
+    return deprecations
@@ -0,0 +1,195 @@
+import re
+from DiffTool.utils import *
+
+
+_UFUNCTION_TOKEN = re.compile(r'\b(UFUNCTION|UE_DEPRECATED)\s*\(')
+_DEPRECATION = re.compile(r'\s*UE_DEPRECATED\s*\(')
+_DECL_DELIMITER = re.compile(r'[;{(]')
+_DECL_END = re.compile(r'[;{]')
+_DECLARATION_MACRO = re.compile(r'\b(?:UPARAM|UE_DEPRECATED(?:_FORGAME|_FORENGINE)?)\s*\(')
+_DECLARATION_KEYWORD = re.compile(r'\b(?:\w+_API|FORCEINLINE|FORCENOINLINE|UE_NODISCARD)\b')
+_TRAILING_CONST = re.compile(r'\s*const\b')
+_LOOSE_SPACE = re.compile(r'(?<=[(<]) | (?=[),>])')
+_UCLASS_TOKEN = re.compile(r'^[^\S\n]*(UCLASS)\s*\(', re.MULTILINE)
+_CLASS_KEYWORD = re.compile(r'\s*class\s+')
+_CLASS_DECL_DELIMITER = re.compile(r'[;{(]')
+
+
+def _read_macro(code: str, open_pos: int, end: int, bracket_index: BracketIndex | None) -> int:
+    """Returns the position of the `)` closing the macro arguments opened at `open_pos`."""
+    close = find_matching_bracket(code, open_pos, bracket_index)
+    if close is None or close >= end:
+        raise ValueError(f"Unbalanced parentheses in string: {code[open_pos:open_pos+50]}...")
+    return close
+
+
+def _deprecated_version(code: str, open_pos: int, close: int) -> str:
+    """Returns the version argument of the `UE_DEPRECATED(...)` whose arguments span `open_pos` to `close`."""
+    return split_arguments(code[open_pos + 1:close])[0].strip('"\'')
+
+
+def _function_declaration(code: str, decl_start: int, params_close: int, decl_end: int) -> str:
+    """
+    Returns a function declaration up to its parameter list and `const` qualifier, on one line and without export,
+    inlining, UPARAM and deprecation macros, e.g. `virtual bool Trailing(int32 X) const`.
+    """
+    declaration = code[decl_start:params_close + 1]
+    if _TRAILING_CONST.match(code, params_close + 1, decl_end):
+        declaration += " const"
+    while (macro := _DECLARATION_MACRO.search(declaration)) is not None:
+        close = find_matching_bracket(declaration, macro.end() - 1)
+        declaration = declaration[:macro.start()] + (declaration[close + 1:] if close is not None else "")
+    return _LOOSE_SPACE.sub("", " ".join(_DECLARATION_KEYWORD.sub(" ", declaration).split()))
+
+
+def extract_ufunctions(
+    code: str, start: int = 0, end: int | None = None, bracket_index: BracketIndex | None = None
+) -> list[dict[str, any]]:
+    """
+    Extracts every UFUNCTION declared in `code[start:end]` in a single left-to-right pass.
+
+    A `UE_DEPRECATED(...)` placed directly before the UFUNCTION macro, or between the macro and the declaration,
+    is attached to the function.
+
+    Args:
+        code: Preprocessed source code, typically a whole header
+        start: Start of the region to scan, e.g. the start of a class body
+        end: End of the region to scan, defaults to the end of `code`
+        bracket_index: Index prebuilt for `code`, used to match macro and parameter parentheses
+
+    Returns:
+        list[dict[str, any]]: One record per UFUNCTION, in declaration order, with
+            - `name`: the function name
+            - `args`: the raw UFUNCTION macro arguments
+            - `deprecated_version`: the attached UE_DEPRECATED version, or None
+            - `span`: the `(start, end)` span from the macro to the end of the declaration
+            - `decl_span`: the `(start, end)` span of the declaration, up to its `;` or `{`
+            - `declaration`: the declaration without macros or body, on one line, e.g. `bool Foo(int32 X) const`
+
+    Raises:
+        ValueError: If a macro or declaration is malformed
+    """
+    end = len(code) if end is None else end
+    records: list[dict[str, any]] = []
+    deprecation: tuple[str, int] | None = None   # Version and end of the last UE_DEPRECATED seen
+    resume = start
+
+    for token in _UFUNCTION_TOKEN.finditer(code, start, end):
+        if token.start() < resume:
+            continue
+        open_pos = token.end() - 1
+        close = _read_macro(code, open_pos, end, bracket_index)
+        resume = close + 1
+
+        if token.group(1) == 'UE_DEPRECATED':
+            deprecation = (_deprecated_version(code, open_pos, close), close + 1)
+            continue
+
+        # A deprecation applies only when nothing but whitespace separates it from the UFUNCTION
+        deprecated_version = None
+        if deprecation is not None and not code[deprecation[1]:token.start()].strip():
+            deprecated_version = deprecation[0]
+        deprecation = None
+
+        decl_start = close + 1
+        trailing = _DEPRECATION.match(code, decl_start, end)
+        if trailing:
+            deprecated_close = _read_macro(code, trailing.end() - 1, end, bracket_index)
+            deprecated_version = _deprecated_version(code, trailing.end() - 1, deprecated_close)
+            decl_start = deprecated_close + 1
+        while decl_start < end and code[decl_start].isspace():
+            decl_start += 1
+
+        # The declaration ends at the first `;` or `{` after its parameter list
+        delimiter = _DECL_DELIMITER.search(code, decl_start, end)
+        if delimiter is None or delimiter.group() != '(':
+            raise ValueError(f"Malformed UFUNCTION declaration: {code[decl_start:decl_start+50]}...")
+        params_close = _read_macro(code, delimiter.start(), end, bracket_index)
+        decl_end_match = _DECL_END.search(code, params_close + 1, end)
+        decl_end = decl_end_match.start() if decl_end_match else end
+
+        name = code[decl_start:delimiter.start()].split()
+        if not name:
+            raise ValueError(f"Malformed UFUNCTION declaration: {code[decl_start:decl_start+50]}...")
+
+        records.append({
+            'name': name[-1],
+            'args': code[open_pos + 1:close].strip(),
+            'deprecated_version': deprecated_version,
+            'span': (token.start(), decl_end),
+            'decl_span': (decl_start, decl_end),
+            'declaration': _function_declaration(code, decl_start, params_close, decl_end),
+        })
+        resume = decl_end
+
+    return records
+
+
+def _class_declaration_end(code: str, start: int, end: int, bracket_index: BracketIndex) -> int | None:
+    """Returns the position of the `;` or `{` ending the class declaration at `start`, skipping macro arguments."""
+    pos = start
+    while (delimiter := _CLASS_DECL_DELIMITER.search(code, pos, end)) is not None:
+        if delimiter.group() != '(':
+            return delimiter.start()
+        close = bracket_index.match(delimiter.start())
+        if close is None or close >= end:
+            return None
+        pos = close + 1
+    return None
+
+
+def extract_uclasses(
+    code: str, start: int = 0, end: int | None = None, bracket_index: BracketIndex | None = None
+) -> list[dict[str, any]]:
+    """
+    Extracts every UCLASS declared in `code[start:end]` in a single left-to-right pass, in time linear in its length.
+
+    `UCLASS(` anchors at the start of a line are found by search, their arguments by matching the parentheses, and
+    the declaration by a scan for the first `;` or `{` outside of parentheses, so nested `meta=(...)` specifiers and
+    UE_DEPRECATED messages are read whole. A UCLASS with unbalanced arguments or not followed by `class` is skipped.
+
+    Args:
+        code: Preprocessed source code, typically a whole header
+        start: Start of the region to scan
+        end: End of the region to scan, defaults to the end of `code`
+        bracket_index: Index prebuilt for `code`, used to match parentheses. Without one, it is built first
+
+    Returns:
+        list[dict[str, any]]: One record per UCLASS, in declaration order, with
+            - `args`: the raw UCLASS macro arguments
+            - `decl`: the declaration after the `class` keyword, e.g. `ENGINE_API UFoo : public UObject`
+            - `span`: the `(start, end)` span from the macro to the `;` or `{` ending the declaration
+            - `decl_span`: the `(start, end)` span of `decl`
+    """
+    end = len(code) if end is None else end
+    bracket_index = bracket_index if bracket_index is not None else BracketIndex(code)
+    records: list[dict[str, any]] = []
+    resume = start
+
+    for token in _UCLASS_TOKEN.finditer(code, start, end):
+        if token.start() < resume:
+            continue
+        open_pos = token.end() - 1
+        close = bracket_index.match(open_pos)
+        if close is None or close >= end:
+            continue
+        resume = close + 1
+
+        keyword = _CLASS_KEYWORD.match(code, close + 1, end)
+        if keyword is None:
+            continue
+        decl_end = _class_declaration_end(code, keyword.end(), end, bracket_index)
+        if decl_end is None:
+            # No later declaration can end either
+            break
+
+        decl_start, decl_stop = strip_span(code, keyword.end(), decl_end)
+        records.append({
+            'args': code[open_pos + 1:close].strip(),
+            'decl': code[decl_start:decl_stop],
+            'span': (token.start(1), decl_end + 1),
+            'decl_span': (decl_start, decl_stop),
+        })
+        resume = decl_end + 1
+
+    return records
\ No newline at end of file
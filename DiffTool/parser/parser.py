@@ -1,6 +1,10 @@
+import re
+from collections.abc import Sequence
 from cxxheaderparser.types import *
+from cxxheaderparser.errors import CxxParseError
 from cxxheaderparser.simple import parse_string
 from DiffTool.utils import *
+from DiffTool.parser.backends import *
 
 def incomplete(func):
     def wrapper(*args, **kwargs):
@@ -25,8 +29,7 @@ def parse_type_specifier(type_specifier: FundamentalSpecifier | NameSpecifier) -
             if isinstance(template_argument.arg, DecoratedType):
                 template_args.append(parse_type(template_argument.arg))
             elif isinstance(template_argument.arg, FunctionType):
-                # TODO: Handle function pointers
-                pass
+                template_args.append(parse_function_type(template_argument.arg))
             elif isinstance(template_argument.arg, Value):
                 template_args.append("".join(t.value for t in template_argument.arg.tokens))
             else:
@@ -43,7 +46,18 @@ def parse_typename(typename: PQName) -> str:
     return '::'.join([parse_type_specifier(segment) for segment in typename.segments])
 
 
-def parse_type(type: DecoratedType) -> str:
+def parse_function_type(function_type: FunctionType, declarator: str = "") -> str:
+    """
+    Parses a function type into its string representation, e.g. `void(int32, const FString&)` for the argument of a
+    `TFunction`, or `void(*)(int32)` with the `(*)` declarator of a function pointer.
+    """
+    params = [parse_type(param.type) for param in function_type.parameters]
+    if function_type.vararg:
+        params.append("...")
+    return f"{parse_type(function_type.return_type)}{declarator}({', '.join(params)})"
+
+
+def parse_type(type: DecoratedType | FunctionType) -> str:
     """Parses a decorated type into its string representation."""
     # Handle nested type modifiers recursively
     type_str = ""
@@ -54,12 +68,16 @@ def parse_type(type: DecoratedType) -> str:
     elif isinstance(type, MoveReference):
         # Handle move reference first, then process underlying type
         type_str = parse_type(type.moveref_to) + "&&"
+    elif isinstance(type, Pointer) and isinstance(type.ptr_to, FunctionType):
+        type_str = parse_function_type(type.ptr_to, "(*)")
     elif isinstance(type, Pointer):
         # Handle pointer, then process underlying type
         type_str = parse_type(type.ptr_to) + "*"
     elif isinstance(type, Array):
         # Handle array (keep base type first)
         type_str = parse_type(type.array_of) + "[]"
+    elif isinstance(type, FunctionType):
+        type_str = parse_function_type(type)
     elif isinstance(type, Type):
         # Base case: parse the actual typename
         type_str = parse_typename(type.typename)
@@ -73,6 +91,47 @@ def parse_type(type: DecoratedType) -> str:
     return type_str
 
 
+class CxxHeaderParserBackend(ClassDeclarationBackend):
+    """Full C++ parse of the declaration with cxxheaderparser. Never declines."""
+    name = "cxxheaderparser"
+
+    def parse(self, class_decl: str) -> dict[str, any] | None:
+        try:
+            parsed = parse_string(class_decl)
+        except Exception as e:
+            print(f"Error parsing class declaration: {class_decl}")
+            raise ValueError(f"Failed to parse class declaration: {e}")
+
+        if not parsed.namespace.classes:
+            raise ValueError("No classes found in the provided declaration")
+        elif len(parsed.namespace.classes) > 1:
+            raise ValueError("Multiple classes found in the provided declaration")
+
+        parsed = parsed.namespace.classes[0].class_decl
+
+        return {
+            'name': parse_typename(parsed.typename),
+            'bases': [
+                {
+                    'access': base.access,
+                    'name': parse_typename(base.typename)
+                } for base in parsed.bases
+            ]
+        }
+
+
+def make_class_declaration_parser(cross_check_rate: float = 0.0, seed: int = 0) -> TieredClassDeclarationParser:
+    """Creates the default tiers: the fast scanner, falling back to cxxheaderparser."""
+    return TieredClassDeclarationParser(
+        [FastClassDeclarationBackend(), CxxHeaderParserBackend()],
+        cross_check_rate=cross_check_rate,
+        seed=seed,
+    )
+
+
+default_class_declaration_parser = make_class_declaration_parser()
+
+
 def parse_class_declaration(class_decl: str) -> dict[str, any]:
     """
     Parses a C++ class declaration into its components.
@@ -85,33 +144,7 @@ def parse_class_declaration(class_decl: str) -> dict[str, any]:
     Returns:
         dict[str, any]: A dictionary containing the parsed components, including the class name and its base classes
     """
-    try:
-        parsed = parse_string(class_decl)
-    except Exception as e:
-        print(f"Error parsing class declaration: {class_decl}")
-        raise ValueError(f"Failed to parse class declaration: {e}")
-
-    if not parsed.namespace.classes:
-        raise ValueError("No classes found in the provided declaration")
-    elif len(parsed.namespace.classes) > 1:
-        raise ValueError("Multiple classes found in the provided declaration")
-
-    parsed = parsed.namespace.classes[0].class_decl
-
-    result = {
-        'name': parse_typename(parsed.typename),
-        'bases': [
-            {
-                'access': base.access,
-                'name': parse_typename(base.typename)
-            } for base in parsed.bases
-        ]
-    }
-
-    # import json
-    # print(json.dumps(result, indent=4))
-    
-    return result
+    return default_class_declaration_parser.parse(class_decl)
 
 
 @incomplete
@@ -165,3 +198,80 @@ def parse_function_declaration(func_decl: str) -> dict[str, any]:
     # print(json.dumps(result, indent=4))
 
     return result
+
+
+# Declarations parsed together are laid out one per line as the methods of a class opened on the first two lines, so
+# the line of a parse error tells which declaration caused it
+_SIGNATURE_BATCH_HEADER = "struct UEDiffSignatures\n{\n"
+_SIGNATURE_BATCH_FIRST_LINE = 3
+_PARSE_ERROR_LINE = re.compile(r":(\d+):")
+
+
+def _method_signature(method: Method) -> dict[str, any]:
+    return {
+        'name': parse_typename(method.name),
+        'type': parse_type(method.return_type) if method.return_type is not None else '',
+        'params': [{'type': parse_type(param.type), 'name': param.name} for param in method.parameters],
+        'const': method.const,
+        'static': method.static,
+    }
+
+
+def parse_function_signatures(declarations: Sequence[str]) -> list[dict[str, any] | None]:
+    """
+    Parses function declarations, e.g. the UFUNCTIONs of a class, with a single cxxheaderparser call.
+
+    The declarations are parsed as the methods of one synthesized class, one per line, and the parsed methods are
+    mapped back to them by position. A declaration that fails to parse is found from the line of the error and left
+    out of another attempt, so one bad declaration does not cost the signatures of the others.
+
+    Args:
+        declarations: Declarations without macros or body, e.g. `bool Foo(int32 X) const`, as found by
+            `extract_ufunctions`
+
+    Returns:
+        list[dict[str, any] | None]: For each declaration, its `name`, return `type` and `params` as returned by
+            `parse_function_declaration`, with its `const` and `static` qualifiers, or None if it failed to parse
+    """
+    signatures: list[dict[str, any] | None] = [None] * len(declarations)
+    pending = [i for i, declaration in enumerate(declarations) if declaration]
+    while pending:
+        source = _SIGNATURE_BATCH_HEADER + "".join(f"{declarations[i]};\n" for i in pending) + "};\n"
+        try:
+            parsed = parse_string(source)
+        except CxxParseError as e:
+            line = _PARSE_ERROR_LINE.search(str(e))
+            failed = int(line.group(1)) - _SIGNATURE_BATCH_FIRST_LINE if line else -1
+            if 0 <= failed < len(pending) and len(pending) > 1:
+                del pending[failed]
+                continue
+            if len(pending) > 1:
+                # The error cannot be traced to one declaration, parse them one by one
+                for i in pending:
+                    signatures[i] = parse_function_signatures([declarations[i]])[0]
+            return signatures
+
+        methods = parsed.namespace.classes[0].methods if parsed.namespace.classes else []
+        if len(methods) == len(pending):
+            for i, method in zip(pending, methods):
+                signatures[i] = _method_signature(method)
+        elif len(pending) > 1:
+            # Some declaration was not read as a method, e.g. a field, so positions cannot be trusted
+            for i in pending:
+                signatures[i] = parse_function_signatures([declarations[i]])[0]
+        return signatures
+    return signatures
+
+
+def format_function_signature(signature: dict[str, any]) -> str:
+    """
+    Formats a signature returned by `parse_function_signatures` without parameter names or default values, e.g.
+    `static bool Foo(int32, const FString&) const`, so equal signatures format equally.
+    """
+    params = ", ".join(param['type'] for param in signature['params'])
+    text = f"{signature['type']} {signature['name']}({params})".lstrip()
+    if signature['static']:
+        text = "static " + text
+    if signature['const']:
+        text += " const"
+    return text
@@ -0,0 +1,94 @@
+import re
+from bisect import bisect_right
+from DiffTool.utils.lexer import _STRING, _CHAR
+
+
+_SCOPE_TOKEN = re.compile(rf'(?<!\\)(?:{_STRING}|{_CHAR})|[{{}};]')
+_SCOPE_KEYWORD = re.compile(r'\b(?:enum\s+)?(?:class|struct|union|namespace)\b')
+_NAMESPACE_HEAD = re.compile(r'namespace(?:\s+((?:\w+\s*::\s*)*\w+))?\s*')
+_CLASS_HEAD = re.compile(
+    r'(class|struct|union)'
+    r'(?:\s+(?:[A-Z][A-Z0-9_]*|alignas)(?:\s*\([^()]*\))?)*'    # API, deprecation and alignment macros
+    r'\s+((?:\w+::)*\w+)\s*(?:final\s*)?(?::[^;{}]*)?'
+)
+
+
+class ScopeMap:
+    """
+    Maps positions in a source file to the namespace, class or struct enclosing them.
+
+    Built in a single forward pass tracking brace depth, after which any position is resolved with a binary search.
+    Anonymous namespaces, enums and function bodies do not add to the qualified name.
+
+    Args:
+        code: Preprocessed source code, without comments
+    """
+
+    def __init__(self, code: str):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.names: list[str] = []
+        self.kinds: list[str] = []
+        self.parents: list[int] = []
+
+        stack: list[int | None] = []    # Scope of each open brace, None for braces that do not open one
+        enclosing = -1                  # Innermost open scope
+        head_start = 0                  # Start of the text preceding the next brace
+        for token in _SCOPE_TOKEN.finditer(code):
+            char = token.group()
+            if char == '{':
+                scope = self._open_scope(code, head_start, token.start(), enclosing)
+                stack.append(scope)
+                if scope is not None:
+                    enclosing = scope
+            elif char == '}':
+                if stack:
+                    scope = stack.pop()
+                    if scope is not None:
+                        self.ends[scope] = token.end()
+                        enclosing = self.parents[scope]
+            elif char != ';':
+                continue
+            head_start = token.end()
+
+    def _open_scope(self, code: str, head_start: int, brace: int, enclosing: int) -> int | None:
+        """Records the scope opened by the brace at `brace` if its head declares one, returning its index."""
+        for keyword in _SCOPE_KEYWORD.finditer(code, head_start, brace):
+            if keyword.group().startswith('enum'):
+                continue
+            if keyword.group() == 'namespace':
+                head = _NAMESPACE_HEAD.fullmatch(code, keyword.start(), brace)
+                if head is None:
+                    continue
+                if head.group(1) is None:
+                    return None
+                kind, name = 'namespace', re.sub(r'\s+', '', head.group(1))
+            else:
+                head = _CLASS_HEAD.fullmatch(code, keyword.start(), brace)
+                if head is None:
+                    continue
+                kind, name = head.group(1), head.group(2)
+
+            self.starts.append(brace)
+            self.ends.append(len(code))     # Until its closing brace is found
+            self.names.append(f"{self.names[enclosing]}::{name}" if enclosing >= 0 else name)
+            self.kinds.append(kind)
+            self.parents.append(enclosing)
+            return len(self.starts) - 1
+        return None
+
+    def resolve(self, index: int) -> str | None:
+        """
+        Returns the fully qualified name of the innermost scope containing `index`, e.g. `UE::Foo::UBar`.
+
+        Returns None at global scope.
+        """
+        scope = self.scope_at(index)
+        return self.names[scope] if scope >= 0 else None
+
+    def scope_at(self, index: int) -> int:
+        """Returns the index of the innermost scope containing `index` in the recorded scopes, or -1."""
+        scope = bisect_right(self.starts, index) - 1
+        while scope >= 0 and index >= self.ends[scope]:
+            scope = self.parents[scope]
+        return scope
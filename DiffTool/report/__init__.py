@@ -0,0 +1 @@
+from DiffTool.report.writers import *
\ No newline at end of file
@@ -0,0 +1,182 @@
+import os
+import csv
+import json
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+import xlsxwriter
+
+
+class ReportWriter:
+    """
+    Writes report rows to a file one at a time, so a report never has to be held in memory as a whole.
+
+    Rows are mappings keyed by column name, or sequences in column order. Missing values are written empty.
+
+    Args:
+        path: The report file, created along with its directory
+        columns: The column names, in output order
+        title: Optional title of the report, used by formats that can store one
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], title: str | None = None):
+        self.path = path
+        self.columns = list(columns)
+        self.title = title
+        self.rows_written = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _values(self, row: Mapping[str, Any] | Sequence[Any]) -> list[Any]:
+        if isinstance(row, Mapping):
+            return [row.get(column) for column in self.columns]
+        return list(row)
+
+    def write_row(self, row: Mapping[str, Any] | Sequence[Any]) -> None:
+        self._write_values(self._values(row))
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Mapping[str, Any] | Sequence[Any]]) -> None:
+        for row in rows:
+            self.write_row(row)
+
+    def _write_values(self, values: list[Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class CsvReportWriter(ReportWriter):
+    """Writes a UTF-8 CSV report, quoting values only when needed."""
+
+    def __init__(self, path: str, columns: Sequence[str], title: str | None = None):
+        super().__init__(path, columns, title)
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file, lineterminator=os.linesep)
+        self._writer.writerow(self.columns)
+
+    def _write_values(self, values: list[Any]) -> None:
+        self._writer.writerow(values)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonlReportWriter(ReportWriter):
+    """Writes a JSON Lines report, one object keyed by column name per row."""
+
+    def __init__(self, path: str, columns: Sequence[str], title: str | None = None):
+        super().__init__(path, columns, title)
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _write_values(self, values: list[Any]) -> None:
+        self._file.write(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class XlsxReportWriter(ReportWriter):
+    """
+    Writes an Excel report in xlsxwriter's constant memory mode, which flushes every row to disk once written.
+
+    Column widths are tracked while rows are written and fitted to the longest value when the report is closed. The
+    title names the worksheet.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], title: str | None = None):
+        super().__init__(path, columns, title)
+        self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._worksheet = self._workbook.add_worksheet(title)
+        self._widths = [len(column) for column in self.columns]
+
+        header_format = self._workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        for col, column in enumerate(self.columns):
+            self._worksheet.write_string(0, col, column, header_format)
+
+    def _write_values(self, values: list[Any]) -> None:
+        row = self.rows_written + 1
+        for col, value in enumerate(values):
+            if value is None:
+                continue
+            text = str(value)
+            self._worksheet.write_string(row, col, text)
+            if len(text) > self._widths[col]:
+                self._widths[col] = len(text)
+
+    def close(self) -> None:
+        for col, width in enumerate(self._widths):
+            self._worksheet.set_column(col, col, width + 2)
+        self._workbook.close()
+
+
+class ParquetReportWriter(ReportWriter):
+    """
+    Writes a Parquet report of string columns, in row groups of `batch_size` rows. Requires `pyarrow`.
+
+    Args:
+        path: The report file
+        columns: The column names, in output order
+        title: Optional title of the report, unused
+        batch_size: Number of rows buffered before a row group is written
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], title: str | None = None, batch_size: int = 65536):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet reports require pyarrow, install it with `pip install pyarrow`") from e
+
+        super().__init__(path, columns, title)
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for column in self.columns])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._batch: list[list[str | None]] = [[] for _ in self.columns]
+
+    def _write_values(self, values: list[Any]) -> None:
+        for column, value in zip(self._batch, values):
+            column.append(None if value is None else str(value))
+        if len(self._batch[0]) >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._batch and self._batch[0]:
+            self._writer.write_table(self._pyarrow.Table.from_arrays(self._batch, schema=self._schema))
+            self._batch = [[] for _ in self.columns]
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+REPORT_WRITERS: dict[str, type[ReportWriter]] = {
+    ".csv": CsvReportWriter,
+    ".jsonl": JsonlReportWriter,
+    ".xlsx": XlsxReportWriter,
+    ".parquet": ParquetReportWriter,
+}
+
+
+def open_report_writer(path: str, columns: Sequence[str], title: str | None = None) -> ReportWriter:
+    """
+    Opens the report writer matching the extension of `path`: `.csv`, `.jsonl`, `.xlsx` or `.parquet`.
+
+    Args:
+        path: The report file
+        columns: The column names, in output order
+        title: Optional title of the report, e.g. the worksheet name of an Excel report
+
+    Raises:
+        ValueError: If the extension has no writer
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in REPORT_WRITERS:
+        raise ValueError(f"Unsupported report format '{extension}', expected one of {', '.join(REPORT_WRITERS)}")
+    return REPORT_WRITERS[extension](path, columns, title)
@@ -0,0 +1,9 @@
+from DiffTool.scan.watchdog import *
+from DiffTool.scan.pool import *
+from DiffTool.scan.cache import *
+from DiffTool.scan.quarantine import *
+from DiffTool.scan.prefilter import *
+from DiffTool.scan.discovery import *
+from DiffTool.scan.engine import *
+from DiffTool.scan.gitsource import *
+from DiffTool.scan.fingerprint import *
\ No newline at end of file
@@ -0,0 +1,210 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CACHE_COMMIT_INTERVAL = 5.0    # Seconds between commits of the stored results
+
+
+def content_digest(data: bytes) -> str:
+    """Returns a content hash of loaded bytes, equal to the `file_digest` of the file they were read from."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_digest(file_path: str) -> str:
+    """Returns a content hash of the given file."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def files_stamp(files: Iterable[str], root: str) -> str:
+    """
+    Returns a hash of the relative paths, sizes and modification times of files, which changes whenever one of them
+    is added, removed or modified, without reading them.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for file_path in sorted(files):
+        try:
+            st = os.stat(file_path)
+            stamp = f"{st.st_size} {st.st_mtime_ns}"
+        except OSError:
+            stamp = "missing"
+        hasher.update(f"{os.path.relpath(file_path, root)}\0{stamp}\n".encode("utf-8", errors="surrogateescape"))
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    """
+    Persistent cache of per-file parse results, stored in a SQLite database.
+
+    Entries are keyed by file path and a caller-defined variant (e.g. the engine version a header was parsed for),
+    and are only reused while the file's size, modification time and content hash still match. A file whose size
+    and modification time are unchanged is served without being opened; a touched file is re-hashed and reused when
+    its content is unchanged.
+
+    Args:
+        db_path: Path to the cache database, created if missing
+        tool_version: Version of the extraction logic; opening a cache written by another version drops all entries
+        max_bytes: Upper bound on the total size of stored results, enforced by evicting least recently used entries
+        commit_interval: Seconds between commits of the stored results, so an interrupted scan keeps most of them
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        tool_version: str,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        commit_interval: float = DEFAULT_CACHE_COMMIT_INTERVAL,
+    ):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.tool_version = str(tool_version)
+        self.max_bytes = max_bytes
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+        self.digests: dict[str, str] = {}   # Content hashes of the files served from the cache, by path
+
+        self._fingerprints: dict[tuple[str, str], tuple[int, int]] = {}
+        self._touched: dict[tuple[str, str], float] = {}
+        self._last_commit = time.monotonic()
+
+        self._db = sqlite3.connect(db_path)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT, variant TEXT,
+                size INTEGER, mtime_ns INTEGER, digest TEXT,
+                value BLOB, nbytes INTEGER, last_used REAL,
+                PRIMARY KEY (path, variant)
+            );
+        """)
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'tool_version'").fetchone()
+        if row is None or row[0] != self.tool_version:
+            self.invalidate()
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('tool_version', ?)", (self.tool_version,))
+            self._db.commit()
+
+    def get(self, file_path: str, variant: str = "") -> tuple[bool, Any]:
+        """
+        Looks up the cached result for a file.
+
+        Returns:
+            tuple[bool, Any]: Whether the lookup hit, and the cached result (None on a miss, or if the file cannot be
+                read)
+        """
+        key = (file_path, variant)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self.misses += 1
+            return False, None
+        row = self._db.execute(
+            "SELECT size, mtime_ns, digest, value FROM entries WHERE path = ? AND variant = ?", key
+        ).fetchone()
+
+        digest = None
+        if row is not None and row[0] == st.st_size:
+            if row[1] == st.st_mtime_ns:
+                self.digests[file_path] = row[2]
+                return self._hit(key, row[3])
+
+            # Touched but possibly unchanged, compare contents before re-parsing
+            try:
+                digest = file_digest(file_path)
+            except OSError:
+                digest = None
+            if digest == row[2]:
+                self._db.execute(
+                    "UPDATE entries SET mtime_ns = ? WHERE path = ? AND variant = ?", (st.st_mtime_ns, *key)
+                )
+                self.digests[file_path] = digest
+                return self._hit(key, row[3])
+
+        # Remember the fingerprint taken before reading, so edits made while parsing invalidate the entry
+        self._fingerprints[key] = (st.st_size, st.st_mtime_ns)
+        self.misses += 1
+        return False, None
+
+    def put(self, file_path: str, value: Any, variant: str = "", digest: str | None = None) -> None:
+        """
+        Stores the result parsed from a file.
+
+        Args:
+            file_path: The parsed file
+            value: The result to store
+            variant: The variant the result was parsed for
+            digest: The `content_digest` of the bytes the result was parsed from. None hashes the file as it is now,
+                which is only correct if it did not change since it was parsed
+        """
+        key = (file_path, variant)
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            st = os.stat(file_path)
+            fingerprint = (st.st_size, st.st_mtime_ns)
+        size, mtime_ns = fingerprint
+        if digest is None:
+            digest = file_digest(file_path)
+
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, size, mtime_ns, digest, blob, len(blob), time.time()),
+        )
+        if time.monotonic() - self._last_commit >= self.commit_interval:
+            self._db.commit()
+            self._last_commit = time.monotonic()
+
+    def invalidate(self, file_path: str | None = None) -> None:
+        """Drops the entries of a single file, or every entry when no file is given."""
+        if file_path is None:
+            self._db.execute("DELETE FROM entries")
+        else:
+            self._db.execute("DELETE FROM entries WHERE path = ?", (file_path,))
+        self._db.commit()
+
+    def evict(self) -> int:
+        """Evicts least recently used entries until the cache fits in `max_bytes`. Returns the number evicted."""
+        total = self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = []
+        for path, variant, nbytes in self._db.execute(
+            "SELECT path, variant, nbytes FROM entries ORDER BY last_used ASC, rowid ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((path, variant))
+            total -= nbytes
+        self._db.executemany("DELETE FROM entries WHERE path = ? AND variant = ?", evicted)
+        return len(evicted)
+
+    def close(self) -> None:
+        """Records entry usage, enforces the size bound and closes the database."""
+        self._db.executemany(
+            "UPDATE entries SET last_used = ? WHERE path = ? AND variant = ?",
+            [(used, *key) for key, used in self._touched.items()],
+        )
+        self.evict()
+        self._db.commit()
+        self._db.close()
+
+    def _hit(self, key: tuple[str, str], blob: bytes) -> tuple[bool, Any]:
+        self.hits += 1
+        self._touched[key] = time.time()
+        return True, pickle.loads(blob)
+
+    def __enter__(self) -> "ParseCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
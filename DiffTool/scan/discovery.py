@@ -0,0 +1,178 @@
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from DiffTool.scan.cache import content_digest
+from DiffTool.scan.prefilter import PrefilterStats, read_if_contains
+
+
+DEFAULT_IO_WORKERS = 8
+DEFAULT_READ_AHEAD = 64
+
+
+def _scan_directory(path: str, suffix: str) -> tuple[list[str], list[str]]:
+    """Lists the matching files and the subdirectories to descend into, in directory order."""
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk, symlinked directories are not followed
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    files.append(entry.path)
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def discover_files(target_dirs: list[str], suffix: str = ".h", workers: int = DEFAULT_IO_WORKERS) -> list[str]:
+    """
+    Lists the files with the given suffix under the target directories, scanning directories concurrently.
+
+    Args:
+        target_dirs: Root directories to search; missing ones are ignored
+        suffix: File name suffix to keep
+        workers: Number of threads listing directories
+
+    Returns:
+        list[str]: The matching files, in the same order as a top-down `os.walk` of each root in turn
+    """
+    listings: dict[str, tuple[list[str], list[str]]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_directory, root, suffix): root for root in dict.fromkeys(target_dirs)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                listings[path] = future.result()
+                for subdir in listings[path][1]:
+                    pending[executor.submit(_scan_directory, subdir, suffix)] = subdir
+
+    # Reassemble the walk order from the listings
+    all_files = []
+    for root in target_dirs:
+        stack = [root]
+        while stack:
+            files, subdirs = listings[stack.pop()]
+            all_files.extend(files)
+            stack.extend(reversed(subdirs))
+    return all_files
+
+
+@dataclass
+class LoadStats:
+    """Time the consumer of `load_files` spent waiting for reads versus processing the loaded files."""
+    files_loaded: int = 0
+    bytes_loaded: int = 0
+    io_wait: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def compute(self) -> float:
+        return max(self.elapsed - self.io_wait, 0.0)
+
+    def summary(self) -> str:
+        return (
+            f"Loading: {self.files_loaded} files, {self.bytes_loaded / (1 << 20):.1f} MB, "
+            f"I/O wait {self.io_wait:.2f}s, compute {self.compute:.2f}s"
+        )
+
+
+def _load_file(
+    file_path: str, keywords: tuple[bytes, ...] | None, hash_contents: bool
+) -> tuple[bytes | None, int, str | None, str | None]:
+    """
+    Reads a file in a loader thread, returning its bytes (None if prefiltered out), size, content hash (None unless
+    requested) and read error.
+    """
+    try:
+        if keywords:
+            data, size, digest = read_if_contains(file_path, keywords, hash_contents)
+        else:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            size = len(data)
+            digest = content_digest(data) if hash_contents else None
+        return data, size, digest, None
+    except OSError as e:
+        return None, 0, None, str(e)
+
+
+def load_files(
+    files: list[str],
+    keywords: tuple[bytes, ...] | None = None,
+    workers: int = DEFAULT_IO_WORKERS,
+    read_ahead: int = DEFAULT_READ_AHEAD,
+    stats: LoadStats | None = None,
+    prefilter_stats: PrefilterStats | None = None,
+    digests: dict[str, str] | None = None,
+) -> Iterator[tuple[str, bytes | None, str | None]]:
+    """
+    Reads files on a thread pool, keeping up to `read_ahead` reads in flight ahead of the consumer.
+
+    Args:
+        files: The files to read
+        keywords: Optional prefilter; files whose raw bytes contain none of these are not loaded
+        workers: Number of reader threads
+        read_ahead: Maximum number of files read ahead of the consumer, bounding memory use
+        stats: Optional I/O wait and compute timings, updated as files are consumed
+        prefilter_stats: Optional counters of the files skipped by the prefilter
+        digests: Optional dict the `content_digest` of every file read is added to, by path, before the file is
+            yielded, e.g. to store parse results with the contents they were parsed from
+
+    Yields:
+        tuple[str, bytes | None, str | None]: The file path, its raw bytes (None if skipped or unreadable) and the
+            read error, if any, in the order of `files`
+    """
+    stats = stats if stats is not None else LoadStats()
+    started = time.perf_counter()
+    queue = deque()
+    remaining = iter(files)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for file_path in remaining:
+                queue.append((file_path, executor.submit(_load_file, file_path, keywords, digests is not None)))
+                if len(queue) >= read_ahead:
+                    break
+
+            while queue:
+                file_path, future = queue.popleft()
+                waited = time.perf_counter()
+                data, size, digest, error = future.result()
+                stats.io_wait += time.perf_counter() - waited
+
+                next_file = next(remaining, None)
+                if next_file is not None:
+                    queue.append((next_file, executor.submit(_load_file, next_file, keywords, digests is not None)))
+
+                if error is None:
+                    if digests is not None:
+                        digests[file_path] = digest
+                    if prefilter_stats is not None and keywords:
+                        prefilter_stats.files_scanned += 1
+                        prefilter_stats.bytes_scanned += size
+                        if data is None:
+                            prefilter_stats.files_skipped += 1
+                            prefilter_stats.bytes_skipped += size
+                    if data is not None:
+                        stats.files_loaded += 1
+                        stats.bytes_loaded += size
+                yield file_path, data, error
+        finally:
+            for _, future in queue:
+                future.cancel()
+            stats.elapsed += time.perf_counter() - started
+
+
+def decode_source(data: bytes, errors: str = "strict") -> str:
+    """Decodes a loaded UTF-8 file, translating line endings like a text-mode `open`."""
+    return data.decode("utf-8", errors=errors).replace("\r\n", "\n").replace("\r", "\n")
@@ -0,0 +1,361 @@
+import os
+from functools import partial
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any
+from DiffTool.scan.cache import ParseCache
+from DiffTool.scan.discovery import DEFAULT_IO_WORKERS, DEFAULT_READ_AHEAD, LoadStats, decode_source, load_files
+from DiffTool.scan.pool import map_files
+from DiffTool.scan.prefilter import PrefilterStats
+from DiffTool.scan.quarantine import Quarantine
+from DiffTool.scan.watchdog import FileBudget
+from DiffTool.utils.brackets import BracketIndex
+from DiffTool.utils.lexer import preprocess_source, strip_macro_lines
+from DiffTool.utils.profiling import profiler
+
+
+ENGINE_SOURCE_DIRS = ("Developer", "Editor", "Runtime")
+
+
+def engine_target_dirs(UEpath: str, part: str | None = None) -> list[str]:
+    """
+    Returns the directories of an engine tree holding its headers.
+
+    Args:
+        UEpath: The root directory of the engine tree
+        part: "Source" for the Developer, Editor and Runtime sources, "Plugins" for the plugins, None for both
+    """
+    source_dirs = [os.path.join(UEpath, "Engine\\Source", name) for name in ENGINE_SOURCE_DIRS]
+    plugins_dirs = [os.path.join(UEpath, "Engine\\Plugins")]
+    if part is None:
+        return source_dirs + plugins_dirs
+    return source_dirs if part == "Source" else plugins_dirs if part == "Plugins" else []
+
+
+def engine_pathspecs(part: str | None = None) -> list[str]:
+    """Returns the git pathspecs of the header directories of an engine repository, as `engine_target_dirs`."""
+    source_dirs = [f"Engine/Source/{name}" for name in ENGINE_SOURCE_DIRS]
+    plugins_dirs = ["Engine/Plugins"]
+    if part is None:
+        return source_dirs + plugins_dirs
+    return source_dirs if part == "Source" else plugins_dirs if part == "Plugins" else []
+
+
+class SourceFile:
+    """
+    A loaded header shared by every analyzer of a scan. It is decoded, preprocessed and bracket-matched once, on
+    first use.
+
+    Args:
+        path: Path of the file
+        root: Root directory the relative path is computed from, None if `path` is already relative
+        data: Raw bytes of the file
+    """
+
+    def __init__(self, path: str, root: str | None, data: bytes):
+        self.path = path
+        self.root = root
+        self.data = data
+        self._decode_error: UnicodeDecodeError | None = None
+        self._text: str | None = None
+        self._code: str | None = None
+        self._brackets: BracketIndex | None = None
+        self._without_macro_lines: dict[tuple[str, ...], str] = {}
+
+    @property
+    def relpath(self) -> str:
+        return os.path.relpath(self.path, self.root) if self.root is not None else self.path
+
+    @property
+    def text(self) -> str:
+        """The decoded text. Invalid UTF-8 is dropped, and the error kept in `decode_error` for strict analyzers."""
+        if self._text is None:
+            with profiler.stage("decode"):
+                try:
+                    self._text = decode_source(self.data)
+                except UnicodeDecodeError as e:
+                    self._decode_error = e
+                    self._text = decode_source(self.data, errors="ignore")
+        return self._text
+
+    @property
+    def decode_error(self) -> UnicodeDecodeError | None:
+        """The error hit decoding the file as strict UTF-8, if any."""
+        if self._text is None:
+            self.text
+        return self._decode_error
+
+    @property
+    def code(self) -> str:
+        """The text without comments, preprocessor directives and TEXT literal bodies."""
+        if self._code is None:
+            text = self.text
+            with profiler.stage("preprocess"):
+                self._code = preprocess_source(text)
+        return self._code
+
+    @property
+    def brackets(self) -> BracketIndex:
+        """The bracket index of `code`."""
+        if self._brackets is None:
+            code = self.code
+            with profiler.stage("bracket index"):
+                self._brackets = BracketIndex(code)
+        return self._brackets
+
+    def code_without_macro_lines(self, macro_lines: Sequence[str]) -> str:
+        """Returns `code` without the lines starting with the given macros."""
+        key = tuple(macro_lines)
+        if key not in self._without_macro_lines:
+            code = self.code
+            with profiler.stage("strip macro lines"):
+                self._without_macro_lines[key] = strip_macro_lines(code, key)
+        return self._without_macro_lines[key]
+
+
+class Analyzer:
+    """
+    An analysis run on every file of a scan by `scan_files`, alongside the other analyzers of the scan.
+
+    Analyzers are pickled to worker processes, so they should only hold plain settings. Subclasses set:
+        - `name`: Key of the analyzer's results
+        - `keywords`: Byte strings of which a file must contain one to be analyzed, None to analyze every file
+        - `cache_variant`: Key of the analyzer's settings in a parse cache, None to never cache its results
+    and implement `analyze`.
+    """
+
+    name: str = "analyzer"
+    keywords: tuple[bytes, ...] | None = None
+    cache_variant: str | None = None
+
+    def new_result(self) -> Any:
+        """Returns the empty result of a file, also used for files the analyzer skips."""
+        return []
+
+    def analyze(self, source: SourceFile, result: Any) -> None:
+        """
+        Analyzes a file, adding what it finds to `result`. An exception is reported as the file's error for this
+        analyzer, with whatever was added to `result` before it was raised.
+        """
+        raise NotImplementedError
+
+    def accepts(self, data: bytes) -> bool:
+        return self.keywords is None or any(keyword in data for keyword in self.keywords)
+
+
+def _analyze_file(
+    loaded: tuple[tuple[str, bytes | None, str | None], tuple[str, ...]],
+    root: str | None,
+    analyzers: tuple[Analyzer, ...],
+) -> tuple[str, dict[str, tuple[Any, str | None]]]:
+    """Runs the named analyzers on a loaded file, returning its path with the result and error of each by name."""
+    (file_path, data, read_error), names = loaded
+    selected = [analyzer for analyzer in analyzers if analyzer.name in names]
+    if read_error is not None:
+        profiler.error("read")
+        return file_path, {analyzer.name: (analyzer.new_result(), read_error) for analyzer in selected}
+    if data is None:    # Skipped by the prefilter
+        return file_path, {analyzer.name: (analyzer.new_result(), None) for analyzer in selected}
+
+    outcomes = {}
+    source = SourceFile(file_path, root, data)
+    with profiler.file(file_path, len(data)):
+        for analyzer in selected:
+            result, error = analyzer.new_result(), None
+            if analyzer.accepts(data):
+                try:
+                    analyzer.analyze(source, result)
+                except Exception as e:
+                    profiler.error(type(e).__name__)
+                    error = str(e)
+            outcomes[analyzer.name] = (result, error)
+    return file_path, outcomes
+
+
+def _exceeded_outcomes(
+    analyzers: tuple[Analyzer, ...],
+    quarantine: Quarantine | None,
+    exceeded_files: set[str],
+    loaded: tuple[tuple[str, bytes | None, str | None], tuple[str, ...]],
+    reason: str,
+) -> tuple[str, dict[str, tuple[Any, str | None]]]:
+    """Reports a file whose worker was killed for exceeding its budget as failed for every analyzer, quarantining it."""
+    (file_path, data, _), names = loaded
+    exceeded_files.add(file_path)
+    if quarantine is not None:
+        quarantine.add(file_path, reason, data, names)
+    return file_path, {
+        analyzer.name: (analyzer.new_result(), reason) for analyzer in analyzers if analyzer.name in names
+    }
+
+
+def analyze_files(
+    loaded_files: Iterable[tuple[str, bytes | None, str | None]],
+    root: str | None,
+    analyzers: Sequence[Analyzer],
+    workers: int | None = None,
+    total: int | None = None,
+    desc: str = "Processing UE headers",
+    budget: FileBudget | None = None,
+    read_ahead: int = DEFAULT_READ_AHEAD,
+) -> Iterator[tuple[str, dict[str, tuple[Any, str | None]]]]:
+    """
+    Runs several analyzers over files loaded by the caller, e.g. by `load_git_files`, preprocessing each file once.
+
+    Args:
+        loaded_files: The path, raw bytes (None if skipped) and read error of every file
+        root: Root directory relative paths are computed from, None if the paths are already relative
+        analyzers: The analyzers to run, with distinct names
+        workers: Number of analysis processes, defaults to the number of usable CPUs. `1` runs in-process
+        total: Number of files, required for progress reporting when `loaded_files` has no length
+        desc: Description shown on the progress bar
+        budget: Optional time and memory budget of every file, over which it is reported as failed
+        read_ahead: Maximum number of loaded files taken from `loaded_files` and not yet analyzed
+
+    Yields:
+        tuple[str, dict[str, tuple[Any, str | None]]]: Each file with the result and error of every analyzer by
+            name, in the order of `loaded_files`
+    """
+    analyzers = tuple(analyzers)
+    names = tuple(analyzer.name for analyzer in analyzers)
+    total = len(loaded_files) if total is None else total
+    yield from map_files(
+        _analyze_file, ((loaded, names) for loaded in loaded_files), root, analyzers,
+        workers=workers, total=total, desc=desc,
+        budget=budget, on_exceeded=partial(_exceeded_outcomes, analyzers, None, set()), max_in_flight=read_ahead,
+    )
+
+
+def scan_files(
+    files: list[str],
+    root: str,
+    analyzers: Sequence[Analyzer],
+    workers: int | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    read_ahead: int = DEFAULT_READ_AHEAD,
+    cache: ParseCache | None = None,
+    load_stats: LoadStats | None = None,
+    prefilter_stats: PrefilterStats | None = None,
+    desc: str = "Processing UE headers",
+    budget: FileBudget | None = None,
+    quarantine: Quarantine | None = None,
+    digests: dict[str, str] | None = None,
+    unchanged: Callable[[str, bytes | None, str], bool] | None = None,
+) -> Iterator[tuple[str, dict[str, tuple[Any, str | None]] | None]]:
+    """
+    Runs several analyzers over files in a single pass: every file is read, decoded and preprocessed once, then
+    handed to each analyzer in turn.
+
+    Results of analyzers with a `cache_variant` are served from `cache` while the file is unchanged, and files every
+    analyzer has cached results for are not read at all. Files containing none of the analyzers' keywords are skipped
+    before being decoded.
+
+    A file whose worker exceeds `budget` is killed, reported as failed and added to `quarantine` for the analyzers it
+    was run with, and files in `quarantine` for all the analyzers they still need are reported as failed without
+    being read.
+
+    Files are hashed as they are read, so `unchanged` can tell from its digest whether a file needs analyzing, e.g.
+    when its contents equal those of a file already analyzed, without reading it a second time.
+
+    Args:
+        files: The files to analyze, e.g. as listed by `discover_files`
+        root: Root directory of the engine tree, which relative paths and cache entries are keyed by
+        analyzers: The analyzers to run, with distinct names
+        workers: Number of analysis processes, defaults to the number of usable CPUs. `1` runs in-process
+        io_workers: Number of reader threads
+        read_ahead: Maximum number of files read ahead of the analyzers, counting both the reads in flight and the
+            files waiting for or being analyzed
+        cache: Optional parse cache for the analyzers with a `cache_variant`
+        load_stats: Optional I/O wait and compute timings
+        prefilter_stats: Optional counters of the files skipped by the keyword prefilter
+        desc: Description shown on the progress bar
+        budget: Optional time and memory budget of every file
+        quarantine: Optional list of the files to skip, which the files over budget are added to
+        digests: Optional dict the `content_digest` of every file read or served from `cache` is added to, by path
+        unchanged: Optional predicate of a read file's path, raw bytes (None if skipped by the keywords) and content
+            digest. Files it accepts are not analyzed, and are yielded with None instead of their outcomes
+
+    Yields:
+        tuple[str, dict[str, tuple[Any, str | None]] | None]: Each file with the result and error of every analyzer
+            by name, None if `unchanged` accepted it, in the order of `files`
+    """
+    analyzers = tuple(analyzers)
+    variants = {
+        analyzer.name: f"{root}|{analyzer.name}|{analyzer.cache_variant}"
+        for analyzer in analyzers if cache is not None and analyzer.cache_variant is not None
+    }
+    keywords = None
+    if all(analyzer.keywords is not None for analyzer in analyzers):
+        keywords = tuple(dict.fromkeys(keyword for analyzer in analyzers for keyword in analyzer.keywords))
+
+    # Serve cached results first, and only read the files some analyzer still needs
+    cached: dict[str, dict[str, tuple[Any, str | None]]] = {}
+    pending: dict[str, tuple[str, ...]] = {}
+    with profiler.stage("cache lookup"):
+        for file_path in files:
+            hits = {}
+            for name, variant in variants.items():
+                hit, outcome = cache.get(file_path, variant)
+                if hit:
+                    hits[name] = outcome
+            cached[file_path] = hits
+            if len(hits) == len(analyzers):
+                continue
+            names = tuple(analyzer.name for analyzer in analyzers if analyzer.name not in hits)
+            reason = quarantine.reason(file_path, names) if quarantine is not None else None
+            if reason is not None:
+                cached[file_path] = {
+                    analyzer.name: hits.get(analyzer.name, (analyzer.new_result(), f"Quarantined: {reason}"))
+                    for analyzer in analyzers
+                }
+            else:
+                pending[file_path] = names
+
+    pending_files = list(pending)
+    exceeded_files: set[str] = set()
+    hash_files = variants or digests is not None or unchanged is not None
+    loaded_digests: dict[str, str] | None = {} if hash_files else None  # Of the bytes each file was read as
+    skipped_files: set[str] = set()
+    load_stats = load_stats if load_stats is not None else LoadStats()
+    # The readers keep enough reads in flight to stay busy, and the analyzers take the rest of the read-ahead
+    reads_ahead = max(1, min(io_workers, read_ahead // 2))
+    loaded_files = load_files(
+        pending_files, keywords, io_workers, reads_ahead, load_stats, prefilter_stats, loaded_digests
+    )
+
+    def to_analyze() -> Iterator[tuple[tuple[str, bytes | None, str | None], tuple[str, ...]]]:
+        for file_path, data, error in loaded_files:
+            if error is None and unchanged is not None and unchanged(file_path, data, loaded_digests[file_path]):
+                skipped_files.add(file_path)
+                yield (file_path, None, None), ()    # Sent through the pool to keep results in order
+            else:
+                yield (file_path, data, error), pending[file_path]
+
+    analyzed = map_files(
+        _analyze_file, to_analyze(), root, analyzers,
+        workers=workers, total=len(pending_files), desc=desc,
+        budget=budget, on_exceeded=partial(_exceeded_outcomes, analyzers, quarantine, exceeded_files),
+        max_in_flight=read_ahead - reads_ahead,
+    )
+
+    for file_path in files:
+        outcomes = cached[file_path]
+        if file_path not in pending:
+            if digests is not None and cache is not None and file_path in cache.digests:
+                digests[file_path] = cache.digests[file_path]
+        else:
+            _, fresh = next(analyzed)
+            digest = loaded_digests.pop(file_path, None) if loaded_digests is not None else None
+            if digests is not None and digest is not None:
+                digests[file_path] = digest
+            if file_path in skipped_files:
+                skipped_files.discard(file_path)
+                yield file_path, None
+                continue
+            # Files that could not be read, or whose worker was killed, are retried on the next scan
+            if variants and digest is not None and file_path not in exceeded_files:
+                for name, outcome in fresh.items():
+                    if name in variants:
+                        cache.put(file_path, outcome, variants[name], digest)
+            outcomes = {**outcomes, **fresh}
+        yield file_path, {analyzer.name: outcomes[analyzer.name] for analyzer in analyzers}
+    profiler.add("read wait", load_stats.io_wait)
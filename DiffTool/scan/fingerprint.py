@@ -0,0 +1,132 @@
+import re
+import hashlib
+from dataclasses import dataclass, field
+
+
+_SEPARATORS = re.compile(r"[\\/]")
+
+
+def path_parts(relpath: str) -> tuple[str, ...]:
+    """Splits a relative path on both slashes and backslashes, as engine paths may mix them."""
+    return tuple(part for part in _SEPARATORS.split(relpath) if part)
+
+
+def engine_module_parts(parts: tuple[str, ...]) -> tuple[tuple[str, ...] | None, tuple[str, ...] | None]:
+    """
+    Returns the directories of the module and plugin holding a header of an engine tree.
+
+    Engine modules sit two levels below `Engine/Source` (e.g. `Engine/Source/Runtime/Core`), and plugin modules
+    right below the `Source` directory of their plugin (e.g. `Engine/Plugins/FX/Niagara/Source/Niagara`).
+
+    Args:
+        parts: The path of the header relative to the engine root, as split by `path_parts`
+
+    Returns:
+        tuple[tuple[str, ...] | None, tuple[str, ...] | None]: The module and plugin directories, None when the
+            header is not in one
+    """
+    directories = parts[:-1]
+    if directories[:2] == ("Engine", "Source"):
+        return (directories[:4] if len(directories) >= 4 else None), None
+    for i in range(len(directories) - 2, 1, -1):
+        if directories[i] == "Source":
+            return directories[:i + 2], directories[:i]
+    return None, None
+
+
+@dataclass
+class FingerprintComparison:
+    """Files, engine modules and plugins with the same contents in two trees, as found by `FingerprintTree.compare`."""
+    files: int = 0
+    unchanged: set[str] = field(default_factory=set)
+    directories_compared: int = 0
+    modules: int = 0
+    modules_unchanged: int = 0
+    plugins: int = 0
+    plugins_unchanged: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Fingerprints: {len(self.unchanged)}/{self.files} headers, {self.modules_unchanged}/{self.modules} "
+            f"modules and {self.plugins_unchanged}/{self.plugins} plugins unchanged, "
+            f"{self.directories_compared} directories compared"
+        )
+
+
+class FingerprintTree:
+    """
+    Content fingerprints of the files under a root directory, combined Merkle-style into a fingerprint per directory:
+    two directories have the same fingerprint exactly when they hold the same files with the same contents.
+
+    Args:
+        file_digests: The content digest of every file, e.g. as collected by `scan_files`, by path relative to the root
+    """
+
+    def __init__(self, file_digests: dict[str, str]):
+        self.file_digests = file_digests
+        self.directories: dict[tuple[str, ...], str] = {}
+        self._files: dict[tuple[str, ...], str] = {}     # Path parts -> relative path
+        self._subdirectories: dict[tuple[str, ...], set[tuple[str, ...]]] = {(): set()}
+        self._files_in: dict[tuple[str, ...], list[tuple[str, ...]]] = {}
+
+        for relpath in file_digests:
+            parts = path_parts(relpath)
+            self._files[parts] = relpath
+            self._files_in.setdefault(parts[:-1], []).append(parts)
+            for depth in range(1, len(parts)):
+                self._subdirectories.setdefault(parts[:depth], set())
+                self._subdirectories[parts[:depth - 1]].add(parts[:depth])
+
+        # Children are hashed before their parents, deepest directories first
+        for directory in sorted(self._subdirectories, key=len, reverse=True):
+            entries = [f"f {parts[-1]} {self.file_digest(parts)}" for parts in self._files_in.get(directory, ())]
+            entries += [f"d {child[-1]} {self.directories[child]}" for child in self._subdirectories[directory]]
+            digest = hashlib.blake2b("\n".join(sorted(entries)).encode(), digest_size=16)
+            self.directories[directory] = digest.hexdigest()
+
+    def file_digest(self, parts: tuple[str, ...]) -> str | None:
+        relpath = self._files.get(parts)
+        return self.file_digests[relpath] if relpath is not None else None
+
+    def files_under(self, directory: tuple[str, ...]) -> list[str]:
+        """Returns the relative paths of the files under a directory, given as path parts."""
+        relpaths = []
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            relpaths.extend(self._files[parts] for parts in self._files_in.get(current, ()))
+            pending.extend(self._subdirectories.get(current, ()))
+        return relpaths
+
+    def compare(self, other: "FingerprintTree") -> FingerprintComparison:
+        """
+        Finds the files with the same contents in both trees, descending only into directories whose fingerprints
+        differ, and counts the engine modules and plugins left unchanged.
+
+        Args:
+            other: The fingerprints of the tree to compare against, e.g. of the previous engine version
+        """
+        comparison = FingerprintComparison(files=len(self.file_digests))
+        pending = [()]
+        while pending:
+            directory = pending.pop()
+            comparison.directories_compared += 1
+            if other.directories.get(directory) == self.directories[directory]:
+                comparison.unchanged.update(self.files_under(directory))
+                continue
+            pending.extend(self._subdirectories[directory])
+            for parts in self._files_in.get(directory, ()):
+                if other.file_digest(parts) == self.file_digest(parts):
+                    comparison.unchanged.add(self._files[parts])
+
+        modules: dict[tuple[str, ...], bool] = {}
+        plugins: dict[tuple[str, ...], bool] = {}
+        for parts in self._files:
+            module, plugin = engine_module_parts(parts)
+            if module is not None and module not in modules:
+                modules[module] = other.directories.get(module) == self.directories[module]
+            if plugin is not None and plugin not in plugins:
+                plugins[plugin] = other.directories.get(plugin) == self.directories[plugin]
+        comparison.modules, comparison.modules_unchanged = len(modules), sum(modules.values())
+        comparison.plugins, comparison.plugins_unchanged = len(plugins), sum(plugins.values())
+        return comparison
@@ -0,0 +1,155 @@
+import subprocess
+from collections.abc import Iterable, Iterator, Sequence
+from DiffTool.scan.discovery import LoadStats
+from DiffTool.scan.prefilter import PrefilterStats
+
+
+def _git(repo: str, *args: str) -> bytes:
+    """Runs a git command in `repo` and returns its output, raising RuntimeError with git's message on failure."""
+    try:
+        completed = subprocess.run(["git", "-C", repo, *args], capture_output=True, check=True)
+    except FileNotFoundError as e:
+        raise RuntimeError("git is not installed or not on the PATH") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"git {args[0]} failed: {e.stderr.decode(errors='replace').strip()}") from e
+    return completed.stdout
+
+
+def _split_z(output: bytes) -> list[str]:
+    return [item.decode("utf-8", errors="surrogateescape") for item in output.split(b"\0") if item]
+
+
+def git_rev_parse(repo: str, ref: str) -> str:
+    """Returns the commit hash a ref points to."""
+    return _git(repo, "rev-parse", "--verify", f"{ref}^{{commit}}").decode().strip()
+
+
+def git_list_files(repo: str, ref: str, pathspecs: Sequence[str] = (), suffix: str = ".h") -> list[str]:
+    """Lists the files with the given suffix at a ref, as paths relative to the repository root."""
+    output = _git(repo, "ls-tree", "-r", "-z", "--name-only", ref, "--", *pathspecs)
+    return [path for path in _split_z(output) if path.endswith(suffix)]
+
+
+def git_changed_files(
+    repo: str, old_ref: str, new_ref: str, pathspecs: Sequence[str] = (), suffix: str = ".h"
+) -> dict[str, str]:
+    """
+    Lists the files with the given suffix that differ between two refs, compared by object hash in git's object
+    store, without checking either ref out.
+
+    Returns:
+        dict[str, str]: The status of each changed path: "A" (added), "D" (deleted), "M" (modified) or "T" (type
+            changed). Renames are reported as a deletion and an addition
+    """
+    output = _git(repo, "diff", "--name-status", "--no-renames", "-z", old_ref, new_ref, "--", *pathspecs)
+    fields = _split_z(output)
+    return {path: status for status, path in zip(fields[::2], fields[1::2]) if path.endswith(suffix)}
+
+
+def git_grep_files(repo: str, ref: str, text: str, pathspecs: Sequence[str] = (), suffix: str = ".h") -> set[str]:
+    """Returns the files with the given suffix containing `text` at a ref, searched in the object store."""
+    try:
+        output = _git(repo, "grep", "-l", "-z", "-F", "-I", "-e", text, ref, "--", *pathspecs)
+    except RuntimeError as e:
+        if isinstance(e.__cause__, subprocess.CalledProcessError) and e.__cause__.returncode == 1:
+            return set()    # No match
+        raise
+    prefix = f"{ref}:"
+    return {
+        path[len(prefix):] if path.startswith(prefix) else path
+        for path in _split_z(output) if path.endswith(suffix)
+    }
+
+
+_CLOSE_TIMEOUT = 10    # Seconds to wait for `git cat-file` to exit once terminated, before killing it
+
+
+class GitBlobReader:
+    """
+    Reads file contents at any ref straight from a repository's object store, through one long-running
+    `git cat-file --batch` process.
+
+    Args:
+        repo: The repository
+    """
+
+    def __init__(self, repo: str):
+        try:
+            self._process = subprocess.Popen(
+                ["git", "-C", repo, "cat-file", "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("git is not installed or not on the PATH") from e
+
+    def read(self, ref: str, path: str) -> bytes | None:
+        """Returns the content of `path` at `ref`, or None if it does not exist there."""
+        self._process.stdin.write(f"{ref}:{path}\n".encode("utf-8", errors="surrogateescape"))
+        self._process.stdin.flush()
+        header = self._process.stdout.readline()
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        _, object_type, size = header.split()
+        data = self._process.stdout.read(int(size))
+        self._process.stdout.read(1)    # Trailing line break
+        return data if object_type == b"blob" else None
+
+    def close(self) -> None:
+        # Processes forked while the reader was open, e.g. parsing workers, inherit git's stdin and keep it from
+        # seeing EOF, so git is stopped rather than waited for
+        self._process.terminate()
+        try:
+            self._process.communicate(timeout=_CLOSE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.communicate()
+
+    def __enter__(self) -> "GitBlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_git_files(
+    repo: str,
+    ref: str,
+    paths: Iterable[str],
+    keywords: tuple[bytes, ...] | None = None,
+    stats: LoadStats | None = None,
+    prefilter_stats: PrefilterStats | None = None,
+) -> Iterator[tuple[str, bytes | None, str | None]]:
+    """
+    Reads files at a ref from the object store, in the same form as `load_files` reads them from disk.
+
+    Args:
+        repo: The repository
+        ref: The commit, tag or branch to read the files at
+        paths: Paths relative to the repository root
+        keywords: Optional prefilter; files whose raw bytes contain none of these are yielded without content
+        stats: Optional counters of the files and bytes loaded
+        prefilter_stats: Optional counters of the files skipped by the prefilter
+
+    Yields:
+        tuple[str, bytes | None, str | None]: The path, its raw bytes (None if skipped) and an error if the file
+            does not exist at `ref`
+    """
+    with GitBlobReader(repo) as reader:
+        for path in paths:
+            data = reader.read(ref, path)
+            if data is None:
+                yield path, None, f"{path} does not exist at {ref}"
+                continue
+            if keywords:
+                if prefilter_stats is not None:
+                    prefilter_stats.files_scanned += 1
+                    prefilter_stats.bytes_scanned += len(data)
+                if not any(keyword in data for keyword in keywords):
+                    if prefilter_stats is not None:
+                        prefilter_stats.files_skipped += 1
+                        prefilter_stats.bytes_skipped += len(data)
+                    yield path, None, None
+                    continue
+            if stats is not None:
+                stats.files_loaded += 1
+                stats.bytes_loaded += len(data)
+            yield path, data, None
@@ -0,0 +1,229 @@
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice, repeat
+from typing import Any
+from tqdm import tqdm
+from DiffTool.utils.counters import run_counters
+from DiffTool.utils.profiling import profiler
+from DiffTool.scan.watchdog import FileBudget, FileBudgetExceeded, Watchdog, WorkerSlots, init_worker_slot, publish_file
+
+
+def usable_cpu_count() -> int:
+    """Returns the number of CPUs the current process is allowed to run on."""
+    if hasattr(os, "process_cpu_count"):
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def map_files(
+    func: Callable[..., Any],
+    files: Iterable[Any],
+    *args: Any,
+    workers: int | None = None,
+    total: int | None = None,
+    desc: str = "Processing files",
+    unit: str = "files",
+    budget: FileBudget | None = None,
+    on_exceeded: Callable[[Any, str], Any] | None = None,
+    max_in_flight: int | None = None,
+) -> Iterator[Any]:
+    """
+    Applies `func(file, *args)` to every file and yields the results in the order of `files`.
+
+    `files` is consumed lazily, with a bounded number of files in flight, so it can be fed by a read-ahead stage
+    without holding more loaded files than it reads ahead.
+
+    With a `budget`, files are always processed in worker processes, watched by a thread of the calling process. A
+    worker exceeding the budget on a file is killed, the other files in flight are resubmitted to a new pool, and the
+    file's result is replaced by `on_exceeded(file, reason)`.
+
+    Args:
+        func: A module-level (picklable) function taking a file, e.g. a path or a loaded file, followed by `args`
+        files: The files to process
+        *args: Extra arguments passed unchanged to every call
+        workers: Number of worker processes, defaults to the number of usable CPUs. `1` runs in-process
+        total: Number of files, required for progress reporting when `files` has no length
+        desc: Description shown on the progress bar
+        unit: Unit shown on the progress bar
+        budget: Optional time and memory budget of every file
+        on_exceeded: Returns the result of a file over budget from the file and the reason. Without one,
+            `FileBudgetExceeded` is raised
+        max_in_flight: Maximum number of files taken from `files` whose result was not yielded yet. Defaults to two
+            chunks per worker
+
+    Yields:
+        The result of each call, in input order regardless of completion order
+    """
+    workers = workers or usable_cpu_count()
+    total = len(files) if total is None else total
+
+    with tqdm(total=total, desc=desc, unit=unit) as progress:
+        if budget is None and (workers <= 1 or total <= 1):
+            for result in map(func, files, *(repeat(arg) for arg in args)):
+                progress.update()
+                yield result
+            return
+
+        chunksize = max(1, min(64, total // (workers * 8)))
+        if max_in_flight is None:
+            max_in_flight = workers * 2 * chunksize
+        else:
+            # Smaller chunks keep every worker busy within the bound
+            max_in_flight = max(1, max_in_flight)
+            chunksize = max(1, min(chunksize, max_in_flight // (workers * 2)))
+        if budget is None:
+            results = _map_pool(func, files, args, workers, chunksize, max_in_flight)
+        else:
+            results = _map_supervised(func, files, args, workers, chunksize, max_in_flight, budget, on_exceeded)
+        for result in results:
+            progress.update()
+            yield result
+
+
+def _merge_chunk_state(counts: dict[str, int | float], profile: tuple | None) -> None:
+    """Adds the run counters and profile of a chunk processed in a worker to those of the current process."""
+    run_counters.update(counts)
+    if profile is not None:
+        profiler.merge(profile)
+
+
+def _map_pool(
+    func: Callable[..., Any], files: Iterable[Any], args: tuple, workers: int, chunksize: int, max_in_flight: int
+) -> Iterator[Any]:
+    """Yields the results of `map_files` computed by a process pool, in input order."""
+    items = iter(files)
+    in_flight: deque[tuple[Future, int]] = deque()
+    files_in_flight = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(in_flight) < workers * 2 and files_in_flight < max_in_flight:
+                chunk = list(islice(items, min(chunksize, max_in_flight - files_in_flight)))
+                if not chunk:
+                    break
+                in_flight.append((executor.submit(_call_chunk, func, chunk, args, profiler.options()), len(chunk)))
+                files_in_flight += len(chunk)
+            if not in_flight:
+                break
+
+            future, size = in_flight.popleft()
+            results, counts, profile = future.result()
+            files_in_flight -= size
+            _merge_chunk_state(counts, profile)
+            yield from results
+
+
+class _Chunk:
+    """Files submitted together to a worker, with their sequence numbers and the future of their results."""
+
+    def __init__(self, files: list[tuple[int, Any]]):
+        self.files = files
+        self.submitted: list[int] = []
+        self.future: Future | None = None
+
+    def submit(self, executor: ProcessPoolExecutor, func: Callable[..., Any], args: tuple, exceeded: dict) -> None:
+        """Submits the files not over budget."""
+        self.submitted = [seq for seq, _ in self.files if seq not in exceeded]
+        files = [file for seq, file in self.files if seq not in exceeded]
+        self.future = None
+        if files:
+            self.future = executor.submit(_call_chunk, func, files, args, profiler.options(), self.submitted)
+
+    def lost(self) -> bool:
+        """Whether the chunk was in flight in a pool that broke, and must be resubmitted."""
+        future = self.future
+        return future is not None and (
+            not future.done() or future.cancelled() or isinstance(future.exception(), BrokenProcessPool)
+        )
+
+
+def _map_supervised(
+    func: Callable[..., Any],
+    files: Iterable[Any],
+    args: tuple,
+    workers: int,
+    chunksize: int,
+    max_in_flight: int,
+    budget: FileBudget,
+    on_exceeded: Callable[[Any, str], Any] | None,
+) -> Iterator[Any]:
+    """
+    Yields the results of `map_files` computed by a process pool whose workers are killed on files over `budget`,
+    in input order. The pool is replaced after every kill.
+    """
+    items = enumerate(files)
+    exceeded: dict[int, str] = {}   # Reasons of the files over budget by sequence number
+    in_flight: deque[_Chunk] = deque()
+    files_in_flight = 0
+    while True:
+        slots = WorkerSlots(workers)
+        watchdog = Watchdog(slots, budget, exceeded)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker_slot, initargs=slots.initargs)
+        watchdog.start()
+        try:
+            for chunk in in_flight:
+                if chunk.lost():
+                    chunk.submit(executor, func, args, exceeded)
+            while True:
+                while len(in_flight) < workers * 2 and files_in_flight < max_in_flight:
+                    chunk = _Chunk(list(islice(items, min(chunksize, max_in_flight - files_in_flight))))
+                    if not chunk.files:
+                        break
+                    chunk.submit(executor, func, args, exceeded)
+                    in_flight.append(chunk)
+                    files_in_flight += len(chunk.files)
+                if not in_flight:
+                    return
+
+                chunk = in_flight[0]
+                try:
+                    results, counts, profile = chunk.future.result() if chunk.future else ([], {}, None)
+                except BrokenProcessPool:
+                    if not watchdog.killed:
+                        raise
+                    break
+                in_flight.popleft()
+                files_in_flight -= len(chunk.files)
+                _merge_chunk_state(counts, profile)
+                results = dict(zip(chunk.submitted, results))
+                for seq, file in chunk.files:
+                    if seq in results:
+                        yield results[seq]
+                        continue
+                    profiler.error("budget exceeded")
+                    if on_exceeded is None:
+                        raise FileBudgetExceeded(file, exceeded[seq])
+                    yield on_exceeded(file, exceeded[seq])
+        finally:
+            # The watchdog keeps killing workers over budget until the pool has shut down
+            executor.shutdown(wait=True, cancel_futures=True)
+            watchdog.stop()
+
+
+def _call_chunk(
+    func: Callable[..., Any],
+    chunk: list[Any],
+    args: tuple,
+    profiling: tuple[bool, bool],
+    seqs: list[int] | None = None,
+) -> tuple[list[Any], dict[str, int | float], tuple | None]:
+    """
+    Runs `func` over a chunk in a worker process and returns the results with the run counters they added, and what
+    the profiler recorded if the parent has it enabled. With `seqs`, the sequence number of each file is published
+    to the pool's watchdog while it is processed.
+    """
+    run_counters.clear()
+    profiler.reset(*profiling)
+    if seqs is None:
+        results = [func(file, *args) for file in chunk]
+    else:
+        results = []
+        for seq, file in zip(seqs, chunk):
+            publish_file(seq)
+            results.append(func(file, *args))
+        publish_file(None)
+    return results, dict(run_counters), profiler.state() if profiler.enabled else None
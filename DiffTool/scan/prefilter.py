@@ -0,0 +1,45 @@
+import os
+import mmap
+from dataclasses import dataclass
+from DiffTool.scan.cache import content_digest
+
+
+@dataclass
+class PrefilterStats:
+    """Counts of the files and bytes a prefilter let through or skipped."""
+    files_scanned: int = 0
+    files_skipped: int = 0
+    bytes_scanned: int = 0
+    bytes_skipped: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Prefilter: skipped {self.files_skipped}/{self.files_scanned} files, "
+            f"{self.bytes_skipped / (1 << 20):.1f}/{self.bytes_scanned / (1 << 20):.1f} MB not decoded"
+        )
+
+
+def read_if_contains(
+    file_path: str, keywords: tuple[bytes, ...], hash_contents: bool = False
+) -> tuple[bytes | None, int, str | None]:
+    """
+    Reads the raw bytes of a file only if they contain any of the given keywords.
+
+    Args:
+        file_path: The file to read
+        keywords: Byte strings to search for
+        hash_contents: Whether to also return the `content_digest` of the file, whether or not it is read
+
+    Returns:
+        tuple[bytes | None, int, str | None]: The file content (None if no keyword occurs), the file size and its
+            content hash (None unless requested)
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return None, 0, content_digest(b"") if hash_contents else None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            digest = content_digest(mm) if hash_contents else None
+            if any(mm.find(keyword) != -1 for keyword in keywords):
+                return mm[:], size, digest
+    return None, size, digest
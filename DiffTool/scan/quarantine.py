@@ -0,0 +1,91 @@
+import os
+import json
+from datetime import datetime, timezone
+from DiffTool.scan.cache import content_digest, file_digest
+
+
+QUARANTINE_FORMAT_VERSION = 1
+
+
+class Quarantine:
+    """
+    Persistent list of the files whose worker was killed for exceeding its budget, saved as JSON to be inspected by
+    hand.
+
+    Each file is listed with the reason it was quarantined, the analyzers it was quarantined for and a hash of its
+    contents. Later scans with only those analyzers skip a listed file while its contents are unchanged, and retry it
+    once they change, so a file quarantined by one analysis is still scanned by another sharing the list.
+
+    Args:
+        path: Path of the JSON file, written by `save`. None keeps the list in memory only
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.entries: dict[str, dict[str, str | None]] = {}
+        self.added = 0
+        self.skipped = 0
+        if path is not None and os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("format_version") == QUARANTINE_FORMAT_VERSION:
+                self.entries = saved["files"]
+
+    def add(self, file_path: str, reason: str, data: bytes | None = None, analyzers: tuple[str, ...] = ()) -> None:
+        """
+        Quarantines a file.
+
+        Args:
+            file_path: Path of the file
+            reason: Why the file was quarantined, e.g. the budget it exceeded
+            data: Contents of the file, to only skip it while they are unchanged. None skips it regardless
+            analyzers: Names of the analyzers the file was quarantined for, none to skip it for every analyzer
+        """
+        self.entries[file_path] = {
+            "reason": reason,
+            "analyzers": sorted(analyzers),
+            "digest": content_digest(data) if data is not None else None,
+            "quarantined_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.added += 1
+
+    def reason(self, file_path: str, analyzers: tuple[str, ...] = ()) -> str | None:
+        """
+        Returns why a file is quarantined for the given analyzers, None if it is not quarantined for all of them. A
+        file whose contents changed since it was quarantined is released.
+        """
+        entry = self.entries.get(file_path)
+        if entry is None or (entry.get("analyzers") and not set(analyzers) <= set(entry["analyzers"])):
+            return None
+        if entry["digest"] is not None:
+            try:
+                unchanged = file_digest(file_path) == entry["digest"]
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                del self.entries[file_path]
+                return None
+        self.skipped += 1
+        return entry["reason"]
+
+    def save(self) -> None:
+        """Writes the list to `path`, if any."""
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"format_version": QUARANTINE_FORMAT_VERSION, "files": dict(sorted(self.entries.items()))}, f, indent=2
+            )
+
+    def summary(self) -> str:
+        return (
+            f"Quarantine: {self.added} headers added, {self.skipped} skipped, {len(self.entries)} listed"
+            + (f" in {self.path}" if self.path is not None else "")
+        )
+
+    def __enter__(self) -> "Quarantine":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.save()
@@ -0,0 +1,150 @@
+import os
+import time
+import signal
+import threading
+import multiprocessing
+from dataclasses import dataclass
+from typing import Any
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_KILL = getattr(signal, "SIGKILL", signal.SIGTERM)
+_IDLE = -1
+
+
+@dataclass(frozen=True)
+class FileBudget:
+    """
+    Time and memory a worker process may spend on a single file before the pool kills it.
+
+    Args:
+        seconds: Wall time allowed per file, None for no limit
+        memory_mb: Resident memory allowed to the worker processing a file, in MB, None for no limit. Only enforced
+            where the memory of a process can be measured: on Linux, or with `psutil` installed
+        poll_interval: Seconds between two checks of the workers
+    """
+    seconds: float | None = None
+    memory_mb: float | None = None
+    poll_interval: float = 0.1
+
+    def exceeded(self, elapsed: float, memory: int | None) -> str | None:
+        """Returns why a file processed for `elapsed` seconds by a worker using `memory` bytes is over budget."""
+        if self.seconds is not None and elapsed > self.seconds:
+            return f"Exceeded the time budget of {self.seconds:g} s"
+        if self.memory_mb is not None and memory is not None and memory > self.memory_mb * (1 << 20):
+            return f"Exceeded the memory budget of {self.memory_mb:g} MB ({memory / (1 << 20):.0f} MB used)"
+        return None
+
+
+class FileBudgetExceeded(RuntimeError):
+    """Raised by `map_files` for a file whose worker was killed, when no `on_exceeded` handler is given."""
+
+    def __init__(self, file: Any, reason: str):
+        super().__init__(f"{reason}: {file}")
+        self.file = file
+        self.reason = reason
+
+
+def process_memory(pid: int) -> int | None:
+    """Returns the resident memory of a process in bytes, None where it cannot be measured."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return psutil.Process(pid).memory_info().rss
+    except psutil.Error:
+        return None
+
+
+class WorkerSlots:
+    """
+    A table shared with the worker processes of a pool, in which each worker publishes its pid and the sequence
+    number of the file it is processing.
+
+    Args:
+        workers: Number of worker processes of the pool
+    """
+
+    def __init__(self, workers: int):
+        self.values = multiprocessing.Array("q", [_IDLE] * (2 * workers))
+        self.next_slot = multiprocessing.Value("i", 0)
+
+    @property
+    def initargs(self) -> tuple:
+        """The arguments of `init_worker_slot`, to be passed as a pool initializer."""
+        return self.values, self.next_slot
+
+    def busy(self) -> list[tuple[int, int]]:
+        """Returns the pid of every busy worker with the sequence number of its file."""
+        values = self.values[:]
+        return [(values[i], values[i + 1]) for i in range(0, len(values), 2) if values[i] > 0 and values[i + 1] >= 0]
+
+
+_slot: tuple[Any, int] | None = None    # Shared values and slot index of the current worker process
+
+
+def init_worker_slot(values: Any, next_slot: Any) -> None:
+    """Claims a slot of a `WorkerSlots` table for the current worker process."""
+    global _slot
+    with next_slot.get_lock():
+        index = next_slot.value
+        next_slot.value += 1
+    values[2 * index] = os.getpid()
+    _slot = (values, index)
+
+
+def publish_file(seq: int | None) -> None:
+    """Publishes the sequence number of the file the current worker starts processing, None once it is idle."""
+    if _slot is not None:
+        values, index = _slot
+        values[2 * index + 1] = _IDLE if seq is None else seq
+
+
+class Watchdog(threading.Thread):
+    """
+    Watches the files processed by the workers of a pool, and kills the first worker whose file exceeds the budget.
+
+    A file's time is counted from when the watchdog first sees a worker processing it. After a kill the pool is
+    broken, so the watchdog stops and a new one watches the pool replacing it.
+
+    Args:
+        slots: The table the workers publish their files in
+        budget: The budget of every file
+        exceeded: Reasons of the files over budget by sequence number, which the watchdog adds to
+    """
+
+    def __init__(self, slots: WorkerSlots, budget: FileBudget, exceeded: dict[int, str]):
+        super().__init__(name="FileBudgetWatchdog", daemon=True)
+        self.slots = slots
+        self.budget = budget
+        self.exceeded = exceeded
+        self.killed = False
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        started: dict[int, tuple[int, float]] = {}  # Pid -> file sequence number and when it was first seen
+        while not self._stopped.wait(self.budget.poll_interval):
+            now = time.monotonic()
+            for pid, seq in self.slots.busy():
+                if started.get(pid, (None,))[0] != seq:
+                    started[pid] = (seq, now)
+                memory = process_memory(pid) if self.budget.memory_mb is not None else None
+                reason = self.budget.exceeded(now - started[pid][1], memory)
+                if reason is not None:
+                    self.exceeded[seq] = reason
+                    self.killed = True
+                    try:
+                        os.kill(pid, _KILL)
+                    except OSError:
+                        pass
+                    return
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
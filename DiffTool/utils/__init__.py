@@ -1 +1,5 @@
-from DiffTool.utils.utils import *
\ No newline at end of file
+from DiffTool.utils.utils import *
+from DiffTool.utils.lexer import *
+from DiffTool.utils.brackets import *
+from DiffTool.utils.counters import *
+from DiffTool.utils.profiling import *
\ No newline at end of file
@@ -0,0 +1,148 @@
+import re
+from DiffTool.utils.lexer import _STRING, _CHAR
+
+
+# Brackets and string literals are found by the regex engine, so Python only runs per bracket instead of per character.
+# A quote preceded by a backslash outside of a literal does not open one.
+_BRACKET_TOKEN = re.compile(rf'(?<!\\)(?:{_STRING}|{_CHAR})|[(){{}}]')
+_CLOSING = {'(': ')', '{': '}'}
+
+
+class BracketIndex:
+    """
+    Maps every `(` and `{` of a text to the position of its matching close, skipping string literals.
+
+    Built once per file in a single scan, after which matching any bracket is a dictionary lookup. Parentheses and
+    braces are matched independently of each other.
+
+    Args:
+        text: The text to index
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.matches: dict[int, int] = {}
+
+        stacks: dict[str, list[int]] = {'(': [], '{': []}
+        for token in _BRACKET_TOKEN.finditer(text):
+            char = token.group()
+            if char in stacks:
+                stacks[char].append(token.start())
+            elif char == ')' or char == '}':
+                stack = stacks['(' if char == ')' else '{']
+                if stack:
+                    self.matches[stack.pop()] = token.start()
+
+    def match(self, index: int) -> int | None:
+        """Returns the position of the bracket closing the one at `index`, or None if it is never closed."""
+        return self.matches.get(index)
+
+
+def find_matching_bracket(s: str, index: int, bracket_index: BracketIndex | None = None) -> int | None:
+    """
+    Finds the bracket closing the `(` or `{` at `index`, skipping string literals.
+
+    Args:
+        s: The input string
+        index: Position of the opening bracket
+        bracket_index: Index prebuilt for `s`; without one only the span of the brackets is scanned
+
+    Returns:
+        The position of the closing bracket, or None if it is never closed
+    """
+    if bracket_index is not None:
+        return bracket_index.match(index)
+
+    opening = s[index]
+    closing = _CLOSING[opening]
+    nesting = 1
+    for token in _BRACKET_TOKEN.finditer(s, index + 1):
+        char = token.group()
+        if char == opening:
+            nesting += 1
+        elif char == closing:
+            nesting -= 1
+            if nesting == 0:
+                return token.start()
+    return None
+
+
+def strip_span(s: str, start: int, end: int) -> tuple[int, int]:
+    """Narrows the span `s[start:end]` to exclude leading and trailing whitespace."""
+    while start < end and s[start].isspace():
+        start += 1
+    while end > start and s[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def read_arguments_span(s: str, index: int, bracket_index: BracketIndex | None = None) -> tuple[int, int]:
+    """
+    Locates the content between the parentheses opening at `index`, like `read_arguments` without copying it.
+
+    Args:
+        s: The input string containing parentheses
+        index: Start position (must point to '(' character)
+        bracket_index: Index prebuilt for `s`
+
+    Returns:
+        The `(start, end)` span of the stripped content, so `s[start:end] == read_arguments(s, index)`
+
+    Raises:
+        ValueError: If invalid index or unbalanced parentheses
+    """
+    if index >= len(s) or s[index] != '(':
+        raise ValueError("Index must point to '(' character")
+
+    close = find_matching_bracket(s, index, bracket_index)
+    if close is None:
+        raise ValueError(f"Unbalanced parentheses in string: {s[index:index+50]}...")
+    return strip_span(s, index + 1, close)
+
+
+def read_class_body_span(s: str, index: int, bracket_index: BracketIndex | None = None) -> tuple[int, int]:
+    """
+    Locates the content between the braces opening at `index`, like `read_class_body` without copying it.
+
+    Args:
+        s: The input string containing braces
+        index: Start position (must point to '{' character)
+        bracket_index: Index prebuilt for `s`
+
+    Returns:
+        The `(start, end)` span of the stripped content, so `s[start:end] == read_class_body(s, index)`
+
+    Raises:
+        ValueError: If invalid index or unbalanced braces
+    """
+    if index >= len(s) or s[index] != '{':
+        raise ValueError("Index must point to '{' character")
+
+    close = find_matching_bracket(s, index, bracket_index)
+    if close is None:
+        raise ValueError(f"Unbalanced braces in string: {s[index:]}...")
+    return strip_span(s, index + 1, close)
+
+
+def extract_arguments_span(
+    sentence: str, keyword: str, bracket_index: BracketIndex | None = None
+) -> tuple[int, int] | None:
+    """
+    Locates the arguments of the first `keyword(...)` in a string, like `extract_arguments` without copying them.
+
+    Args:
+        sentence: The string containing the assigned keyword and its corresponding arguments
+        keyword: The name of the keyword
+        bracket_index: Index prebuilt for `sentence`
+
+    Returns:
+        The `(start, end)` span of the stripped arguments, or None if the keyword is not found
+    """
+    match = re.compile(rf"{re.escape(keyword)}\s*\(").search(sentence)
+    if not match:
+        return None
+
+    close = find_matching_bracket(sentence, match.end() - 1, bracket_index)
+    if close is None:
+        raise ValueError(f"Unbalanced parentheses in macro string '{sentence}'")
+    return strip_span(sentence, match.end(), close)
@@ -0,0 +1,11 @@
+from collections import Counter
+
+
+# Process-wide run counters (e.g. parser tier hits). `map_files` ships the counts collected in worker processes back
+# to the parent, so reports read the totals of the whole run whether or not it ran in parallel.
+run_counters: Counter = Counter()
+
+
+def count(name: str, amount: int | float = 1) -> None:
+    """Adds `amount` to the named run counter."""
+    run_counters[name] += amount
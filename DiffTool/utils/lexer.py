@@ -0,0 +1,92 @@
+import re
+from functools import lru_cache
+from collections.abc import Iterable
+
+
+# Building blocks of the preprocessing scanner. Every alternative starts with a distinct literal character, which
+# lets the regex engine skip straight to candidate positions, and never needs to backtrack into a previous
+# repetition, so the scan is linear in the length of the input.
+_STRING = r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"?'          # Unterminated strings end at the line break
+_CHAR = r"'(?<![0-9]')[^'\\\n]*(?:\\.[^'\\\n]*)*'?"  # Skip C++14 digit separators such as 1'000
+_RAW_STRING = r'R(?:(?<!\wR)|(?<=\Wu8R)|(?<=\W[uUL]R))"([^()\\\s"]{0,16})\((?s:.*?)\)\1"'
+_TEXT_STRING = rf'T(?<!\wT)EXT\s*\(\s*{_STRING}'
+_BLOCK_COMMENT = r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/\*[\s\S]*'   # Unterminated comments run to the end
+_LINE_BODY = rf'''(?:[^\n\\/"']+|\\[\s\S]|{_BLOCK_COMMENT}|/(?!\*)|{_STRING}|{_CHAR})*'''
+
+
+@lru_cache(maxsize=None)
+def _compile_scanner(macro_lines: tuple[str, ...]) -> re.Pattern:
+    # Line-anchored alternatives match the preceding line break instead of `^`, to keep a literal first character
+    alternatives = [r'//[^\n]*', _BLOCK_COMMENT, rf'\n[ \t]*\#{_LINE_BODY}']
+    if macro_lines:
+        names = '|'.join(re.escape(name) for name in macro_lines)
+        alternatives.append(rf'\n[ \t]*(?:{names})\b{_LINE_BODY}')
+    alternatives += [_TEXT_STRING, _RAW_STRING, _STRING, _CHAR]
+    return re.compile('|'.join(alternatives))
+
+
+def preprocess_source(code: str, strip_strings: bool = False, strip_macro_lines: Iterable[str] = ()) -> str:
+    """
+    Strips comments, preprocessor directives and TEXT literal bodies from C++ source in a single linear pass.
+
+    Comment markers inside string literals and quotes inside comments are handled correctly, and line breaks inside
+    removed comments and directives are kept, so line numbers of the cleaned text match the original.
+
+    Args:
+        code: The C++ source code
+        strip_strings: Also empty the bodies of all other string literals, not only `TEXT("...")`
+        strip_macro_lines: Names of macros (e.g. `UPROPERTY`) whose whole line is removed when it starts with them
+
+    Returns:
+        The cleaned source code
+    """
+    scanner = _compile_scanner(tuple(strip_macro_lines))
+
+    def replace(match: re.Match) -> str:
+        token = match.group()
+        first = token[0]
+        if first == '/':
+            if token[1] == '/':
+                return ''
+            newlines = token.count('\n')
+            return '\n' * newlines if newlines else ' '
+        if first == '\n':
+            return '\n' * token.count('\n')
+        if first == 'T':
+            return token[:token.index('"')] + '""'
+        if not strip_strings:
+            return token
+        return "''" if first == "'" else '""'
+
+    # Prepend a line break so directives on the first line are matched like any other
+    return scanner.sub(replace, '\n' + code)[1:]
+
+
+@lru_cache(maxsize=None)
+def _compile_macro_line_scanner(macro_lines: tuple[str, ...]) -> re.Pattern:
+    names = '|'.join(re.escape(name) for name in macro_lines)
+    return re.compile(rf'\n[ \t]*(?:{names})\b{_LINE_BODY}|{_RAW_STRING}')
+
+
+def strip_macro_lines(code: str, macro_lines: Iterable[str]) -> str:
+    """
+    Removes the lines starting with the given macros from source already cleaned by `preprocess_source`, keeping
+    line breaks, so one cleaned copy of a file can serve analyses with and without macro lines.
+
+    Args:
+        code: Source code returned by `preprocess_source`
+        macro_lines: Names of macros (e.g. `UPROPERTY`) whose whole line is removed when it starts with them
+
+    Returns:
+        The source code without the macro lines
+    """
+    macro_lines = tuple(macro_lines)
+    if not macro_lines:
+        return code
+    scanner = _compile_macro_line_scanner(macro_lines)
+
+    def replace(match: re.Match) -> str:
+        token = match.group()
+        return '\n' * token.count('\n') if token[0] == '\n' else token
+
+    return scanner.sub(replace, '\n' + code)[1:]
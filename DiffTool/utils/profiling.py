@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import threading
+from collections import Counter
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any
+
+
+_DISABLED = nullcontext()
+
+
+@dataclass(slots=True)
+class FileCost:
+    """Time spent on one file, in total and per stage, with the error it hit, if any."""
+    path: str
+    bytes: int = 0
+    seconds: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+
+class _StageTimer:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler._add_stage(self.name, self.started, time.perf_counter() - self.started)
+
+
+class _FileTimer:
+    __slots__ = ("profiler", "cost", "started")
+
+    def __init__(self, profiler: "Profiler", path: str, size: int):
+        self.profiler = profiler
+        self.cost = FileCost(path, size)
+
+    def __enter__(self) -> FileCost:
+        self.profiler._current = self.cost
+        self.started = time.perf_counter()
+        return self.cost
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.cost.seconds = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.profiler.error(exc_type.__name__)
+        self.profiler._current = None
+        self.profiler.files.append(self.cost)
+        if self.profiler.trace:
+            self.profiler._add_event(
+                os.path.basename(self.cost.path), "file", self.started, self.cost.seconds,
+                {"path": self.cost.path, "bytes": self.cost.bytes},
+            )
+
+
+class Profiler:
+    """
+    Stage timers, per-file costs and error counts of a run, with an optional timeline of every timed span.
+
+    While disabled, `stage` and `file` return a shared no-op context manager and nothing is recorded, so the
+    instrumentation can stay in place at negligible cost. Times of the same stage are summed across calls and
+    processes; `map_files` ships what its worker processes record back to the parent.
+
+    Args:
+        enabled: Whether to record anything
+        trace: Whether to also keep a timeline event per timed span, for `export_chrome_trace`
+    """
+
+    def __init__(self, enabled: bool = False, trace: bool = False):
+        self.reset(enabled, trace)
+
+    def reset(self, enabled: bool = False, trace: bool = False) -> None:
+        """Drops everything recorded and sets whether to record from now on."""
+        self.enabled = enabled
+        self.trace = enabled and trace
+        self.stages: dict[str, list[float]] = {}    # Stage name -> [total seconds, calls]
+        self.files: list[FileCost] = []
+        self.errors: Counter = Counter()
+        self.events: list[dict[str, Any]] = []
+        self._current: FileCost | None = None
+
+    def options(self) -> tuple[bool, bool]:
+        """Returns the `reset` arguments that make another process record the same way."""
+        return self.enabled, self.trace
+
+    def stage(self, name: str):
+        """Returns a context manager adding the time spent in it to the named stage, and to the current file."""
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, name)
+
+    def file(self, path: str, size: int = 0):
+        """
+        Returns a context manager recording the cost of processing a file. Stages timed inside it are also attributed
+        to the file, and an exception escaping it is counted as an error.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return _FileTimer(self, path, size)
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Adds time measured elsewhere, e.g. the I/O wait of a loader, to the named stage."""
+        if self.enabled:
+            totals = self.stages.setdefault(name, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+
+    def error(self, kind: str) -> None:
+        """Counts an error of the given kind, and marks the current file as failed."""
+        if self.enabled:
+            self.errors[kind] += 1
+            if self._current is not None:
+                self._current.error = kind
+
+    def _add_stage(self, name: str, started: float, seconds: float) -> None:
+        totals = self.stages.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+        if self._current is not None:
+            self._current.stages[name] = self._current.stages.get(name, 0.0) + seconds
+        if self.trace:
+            self._add_event(name, "stage", started, seconds)
+
+    def _add_event(self, name: str, category: str, started: float, seconds: float, args: dict | None = None) -> None:
+        event = {
+            "name": name, "cat": category, "ph": "X", "ts": started * 1e6, "dur": seconds * 1e6,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def state(self) -> tuple:
+        """Returns everything recorded, in a picklable form accepted by `merge`."""
+        return self.stages, self.files, dict(self.errors), self.events
+
+    def merge(self, state: tuple) -> None:
+        """Adds what another profiler recorded, e.g. in a worker process."""
+        stages, files, errors, events = state
+        for name, (seconds, calls) in stages.items():
+            self.add(name, seconds, calls)
+        self.files.extend(files)
+        self.errors.update(errors)
+        self.events.extend(events)
+
+    def slowest_files(self, top: int = 10) -> list[FileCost]:
+        return sorted(self.files, key=lambda cost: cost.seconds, reverse=True)[:top]
+
+    def summary(self, top: int = 10) -> str:
+        """Returns a stage breakdown, the `top` slowest files, and the bytes processed and errors hit."""
+        total_bytes = sum(cost.bytes for cost in self.files)
+        errors = ", ".join(f"{kind} {amount}" for kind, amount in self.errors.most_common())
+        lines = [
+            f"Profile: {len(self.files)} files, {total_bytes / (1 << 20):.1f} MB, "
+            f"{sum(self.errors.values())} errors" + (f" ({errors})" if errors else ""),
+            f"  {'Stage':<28} {'Seconds':>10} {'Calls':>9}",
+        ]
+        for name, (seconds, calls) in sorted(self.stages.items(), key=lambda item: item[1][0], reverse=True):
+            lines.append(f"  {name:<28} {seconds:>10.3f} {calls:>9}")
+
+        slowest = self.slowest_files(top)
+        if slowest:
+            lines.append(f"  Slowest {len(slowest)} files:")
+        for cost in slowest:
+            stages = ", ".join(
+                f"{name} {seconds:.3f}s"
+                for name, seconds in sorted(cost.stages.items(), key=lambda item: item[1], reverse=True)[:3]
+            )
+            lines.append(
+                f"  {cost.seconds:>8.3f}s {cost.bytes / 1024:>9.1f} KB  {cost.path}"
+                + (f"  ({stages})" if stages else "") + (f"  [{cost.error}]" if cost.error else "")
+            )
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Writes the timeline in the Chrome trace event format, viewable in chrome://tracing or Perfetto."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+# Process-wide profiler, disabled unless a script enables it
+profiler = Profiler()
@@ -1,8 +1,28 @@
 import re
+from DiffTool.utils.brackets import *
+
+
+# Start of a string literal, with its optional prefix, by the quotes it may open with, and the end of a literal: the
+# first closing quote not preceded by a backslash. A literal is found in two searches, so no pattern ever backtracks
+# into a literal's content.
+_STRING_START = {
+    quotes: re.compile(rf'''(?:TEXT\s*\(|fr|rf|[ruf])?([{quotes}])''') for quotes in ("\"'", '"', "'")
+}
+_STRING_END = {quote: re.compile(rf'''(?<!\\){quote}''') for quote in ('"', "'", '"""', "'''")}
+# Tokens of an argument list: whole string literals, runs of the same bracket and commas. A literal ends at the first
+# quote not preceded by a backslash, or at the end of the input, so its content never needs backtracking either.
+_ARGUMENT_TOKEN = re.compile(
+    r'''(?<!\\)"[^"]*(?:(?<=\\)"[^"]*)*(?:"|\Z)|(?<!\\)'[^']*(?:(?<=\\)'[^']*)*(?:'|\Z)|\(+|\)+|<+|>+|,'''
+)
+_NESTING = re.compile(r'''["'()<>]''')
 
 
 def remove_string_literals(code: str) -> str:
     """Remove all string literals from code while preserving other content.
+
+    Literals may be single, double or triple quoted, span lines, contain escaped quotes and carry a raw, f-string or
+    TEXT macro prefix. Unterminated literals are left in place. Runs in linear time, however many literals are left
+    unterminated.
     
     Args:
         code: Input source code string
@@ -10,35 +30,28 @@ def remove_string_literals(code: str) -> str:
     Returns:
         Code with all string literals removed
     """
-    # Match all string literals with handling for:
-    # - Single/double/triple quotes
-    # - Escaped quotes
-    # - Raw/f-strings prefixes
-    # - Multiline strings
-    pattern = re.compile(r'''
-        (                           # Capture group for entire string
-            (?:                     # Non-capturing group for prefixes
-                (?:r|u|f|fr|rf|TEXT\s*\()  # String prefixes (including TEXT macro)
-            )?
-            (                       # String content group
-                (?:                 # Triple quoted strings
-                    "{3}            # Triple double quotes
-                    (?:\\"|.)*?     # Content (allow escaped quotes)
-                    (?<!\\)"{3}     # Closing quotes (not escaped)
-                    | '{3}          # Triple single quotes
-                    (?:\\'|.)*?     # Content
-                    (?<!\\)'{3}     # Closing quotes
-                )
-                |                   # Single line strings
-                "(?:\\"|[^"])*?     # Double quoted
-                (?<!\\)"            # Closing quote (not escaped)
-                | '(?:\\'|[^'])*?   # Single quoted
-                (?<!\\)'            # Closing quote (not escaped)
-            )
-        )
-    ''', re.VERBOSE | re.DOTALL)
-    
-    return pattern.sub("\"\"", code)
+    pieces = []
+    last = pos = 0
+    quotes = "\"'"
+    unterminated = set()    # Triple quotes with no closing quote after the current position
+    while quotes and (match := _STRING_START[quotes].search(code, pos)) is not None:
+        quote, opening = match.group(1), match.start(1)
+        closing = None
+        if code.startswith(quote * 3, opening) and quote * 3 not in unterminated:
+            closing = _STRING_END[quote * 3].search(code, opening + 3)
+            if closing is None:
+                unterminated.add(quote * 3)
+        if closing is None:
+            closing = _STRING_END[quote].search(code, opening + 1)
+            if closing is None:
+                # No literal can open with this quote anymore
+                quotes = quotes.replace(quote, '')
+                pos = opening + 1
+                continue
+        pieces += (code[last:match.start()], '""')
+        last = pos = closing.end()
+    pieces.append(code[last:])
+    return ''.join(pieces)
 
 
 def extract_arguments(sentence: str, keyword: str) -> str:
@@ -52,53 +65,10 @@ def extract_arguments(sentence: str, keyword: str) -> str:
     Returns:
         str: The extracted arguments between parentheses, excluding outer brackets
     """
-    pattern = re.compile(rf"{re.escape(keyword)}\s*\(")
-    match = pattern.search(sentence)
-    if not match:
+    span = extract_arguments_span(sentence, keyword)
+    if span is None:
         return ''
-
-    start = match.end()
-    nesting = 1
-    chars = []
-    i = start
-    in_string = False   # Track string literals
-    quote_char = None   # Track which quote started the string
-    prev_char = None    # Track previous character for escape detection
-
-    while i < len(sentence) and nesting > 0:
-        char = sentence[i]
-        
-        # Handle string literals
-        if char in ('"', "'") and prev_char != '\\':
-            if not in_string:
-                in_string = True
-                quote_char = char
-            elif char == quote_char:
-                in_string = False
-                quote_char = None
-        elif in_string:
-            # Skip bracket counting inside strings
-            prev_char = char
-            chars.append(char)
-            i += 1
-            continue
-
-        # Update bracket counters only when not in string
-        if not in_string:
-            if char == '(':
-                nesting += 1
-            elif char == ')':
-                nesting -= 1
-
-        if nesting > 0:
-            chars.append(char)
-            
-        prev_char = char
-        i += 1
-
-    if nesting != 0:
-        raise ValueError(f"Unbalanced parentheses in macro string '{sentence}'")
-    return ''.join(chars).strip()
+    return sentence[span[0]:span[1]]
 
 
 def read_arguments(s: str, index: int) -> str:
@@ -115,109 +85,51 @@ def read_arguments(s: str, index: int) -> str:
     Raises:
         ValueError: If invalid index or unbalanced parentheses
     """
-    if index >= len(s) or s[index] != '(':
-        raise ValueError("Index must point to '(' character")
-    
-    nesting = 1
-    chars = []
-    i = index + 1   # Start after initial '('
-    in_string = False
-    quote_char = None
-    prev_char = None
-    
-    while i < len(s) and nesting > 0:
-        char = s[i]
-        
-        # Handle string literals
-        if char in ('"', "'") and prev_char != '\\':
-            if not in_string:
-                in_string = True
-                quote_char = char
-            elif char == quote_char:
-                in_string = False
-                quote_char = None
-        elif in_string:
-            # Skip bracket counting inside strings
-            prev_char = char
-            chars.append(char)
-            i += 1
-            continue
-
-        # Update bracket counters when not in string
-        if not in_string:
-            if char == '(':
-                nesting += 1
-            elif char == ')':
-                nesting -= 1
-
-        if nesting > 0:  # Only collect until final closing bracket
-            chars.append(char)
-            
-        prev_char = char
-        i += 1
-
-    if nesting != 0:
-        raise ValueError(f"Unbalanced parentheses in string: {s[index:index+50]}...")
-    
-    return ''.join(chars).strip()
+    start, end = read_arguments_span(s, index)
+    return s[start:end]
 
 
 def split_arguments(arg_str: str) -> list[str]:
     """
     Splits an arg string into a list of arguments by commas, handling nested parentheses and angle brackets.
 
+    Runs in linear time: the string is scanned once for string literal, bracket and comma tokens, and each argument
+    is sliced out of it once.
+
     Args:
         args (str): The string containing the arguments separated by commas
 
     Returns:
         list[str]: A list of arguments
     """
+    if _NESTING.search(arg_str) is None:
+        # Neither strings nor brackets: every comma splits
+        return [arg.strip() for arg in arg_str.split(',') if arg]
+
     args = []
-    current = []
+    start = 0
     paren_nesting = 0   # Track parentheses ()
     angle_nesting = 0   # Track angle brackets <>
-    in_string = False   # Track string literals
-    quote_char = None   # Track which quote started the string
-    prev_char = None    # Track previous character for escape detection
-
-    for char in arg_str:
-        # Handle string literals
-        if char in ('"', "'") and prev_char != '\\':
-            if not in_string:
-                in_string = True
-                quote_char = char
-            elif char == quote_char:
-                in_string = False
-                quote_char = None
-        elif in_string:
-            # Skip bracket counting inside strings
-            prev_char = char
-            current.append(char)
-            continue
-
-        # Update bracket counters only when not in string
-        if not in_string:
-            if char == '(':
-                paren_nesting += 1
-            elif char == ')':
-                paren_nesting -= 1
-            elif char == '<':
-                angle_nesting += 1
-            elif char == '>':
-                angle_nesting -= 1
-
-        # Split on commas only when not nested and not in string
-        if char == ',' and paren_nesting == 0 and angle_nesting == 0 and not in_string:
-            if current:
-                args.append(''.join(current).strip())
-                current = []
-        else:
-            current.append(char)
-
-        prev_char = char
 
-    if current:
-        args.append(''.join(current).strip())
+    for match in _ARGUMENT_TOKEN.finditer(arg_str):
+        index, end = match.span()
+        char = arg_str[index]
+        if char == '(':
+            paren_nesting += end - index
+        elif char == ')':
+            paren_nesting -= end - index
+        elif char == '<':
+            angle_nesting += end - index
+        elif char == '>':
+            angle_nesting -= end - index
+        elif char == ',' and paren_nesting == 0 and angle_nesting == 0:
+            # Split on commas only when not nested
+            if index > start:
+                args.append(arg_str[start:index].strip())
+            start = index + 1
+
+    if len(arg_str) > start:
+        args.append(arg_str[start:].strip())
     if paren_nesting != 0 or angle_nesting != 0:
         raise ValueError(f"Unbalanced parentheses or brackets in argument string '{arg_str}'")
     return args
@@ -237,48 +149,5 @@ def read_class_body(s: str, index: int) -> str:
     Raises:
         ValueError: If invalid index or unbalanced braces
     """
-    if index >= len(s) or s[index] != '{':
-        raise ValueError("Index must point to '{' character")
-    
-    nesting = 1
-    chars = []
-    i = index + 1   # Start after initial '{'
-    in_string = False
-    quote_char = None
-    prev_char = None
-    
-    while i < len(s) and nesting > 0:
-        char = s[i]
-        
-        # Handle string literals
-        if char in ('"', "'") and prev_char != '\\':
-            if not in_string:
-                in_string = True
-                quote_char = char
-            elif char == quote_char:
-                in_string = False
-                quote_char = None
-        elif in_string:
-            # Skip brace counting inside strings
-            prev_char = char
-            chars.append(char)
-            i += 1
-            continue
-
-        # Update brace counters when not in string
-        if not in_string:
-            if char == '{':
-                nesting += 1
-            elif char == '}':
-                nesting -= 1
-
-        if nesting > 0:  # Only collect until final closing brace
-            chars.append(char)
-            
-        prev_char = char
-        i += 1
-
-    if nesting != 0:
-        raise ValueError(f"Unbalanced braces in string: {s[index:]}...")
-    
-    return ''.join(chars).strip()
\ No newline at end of file
+    start, end = read_class_body_span(s, index)
+    return s[start:end]
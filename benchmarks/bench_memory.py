@@ -0,0 +1,46 @@
+"""Measures the memory held by two parsed engine trees and their Blueprint filters, as in a full `blueprint_diff` run."""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blueprint_diff import parse_ue_classes, filter_blueprinttype_classes, filter_blueprintable_classes
+from corpus import write_corpus
+
+try:
+    import resource
+except ImportError:     # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+if __name__ == "__main__":
+    headers = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = [os.path.join(tmp, "Prev"), os.path.join(tmp, "Cur")]
+        for seed, root in enumerate(roots):
+            write_corpus(root, headers, seed)
+
+        tracemalloc.start()
+        trees = []
+        for root in roots:
+            u_classes = parse_ue_classes(root, "5.6", None, workers=1, cache_path=None)
+            trees.append((u_classes, filter_blueprinttype_classes(u_classes), filter_blueprintable_classes(u_classes)))
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    classes = sum(len(u_classes) for u_classes, _, _ in trees)
+    print(f"Classes parsed:        {classes}")
+    print(f"Retained Python heap:  {retained / (1 << 20):8.1f} MB")
+    print(f"Peak Python heap:      {peak / (1 << 20):8.1f} MB")
+    rss = peak_rss_mb()
+    print(f"Peak RSS:              {rss:8.1f} MB" if rss is not None else "Peak RSS:              n/a")
@@ -0,0 +1,198 @@
+"""Deterministic generator of UE-style header trees for benchmarks."""
+import os
+import random
+from dataclasses import dataclass
+
+
+CLASS_SPECIFIERS = [
+    "Blueprintable", "BlueprintType", "Abstract", "NotBlueprintable", "MinimalAPI", "Transient", "Config=Game",
+    'meta=(ShortTooltip="A (short) tooltip", DisplayName="Display, Name")', 'ClassGroup=(Custom)',
+]
+FUNCTION_SPECIFIERS = [
+    "BlueprintCallable", "BlueprintPure", 'Category="Tools|Diff"', "BlueprintAuthorityOnly", "Exec",
+    'meta=(DisplayName="Run (Fast)", Keywords="diff, compare")', "BlueprintNativeEvent",
+]
+RETURN_TYPES = ["void", "int32", "bool", "const TArray<FString>&", "TMap<FName, TArray<int32>>", "UObject*", "FVector"]
+PARAMETERS = [
+    "", "int32 Count", "const FString& Path = TEXT(\"C:/Temp//x\")", "UObject* Context, float Scale = 1.0f",
+    "const TMap<FName, TArray<int32>>& Lookup", "TFunction<void(int32, const FString&)> Callback",
+]
+AREAS = ["Runtime", "Editor", "Developer", "Plugins"]
+VERSIONS = ["5.3", "5.4", "5.5", "5.6", "5.7"]
+
+
+@dataclass
+class CorpusStats:
+    """Size of a generated corpus."""
+    files: int = 0
+    bytes: int = 0
+    classes: int = 0
+    functions: int = 0
+    deprecations: int = 0
+
+
+class HeaderGenerator:
+    """
+    Generates UE-style headers: UCLASS and UFUNCTION macros, nested braces, TEXT literals, comments, preprocessor
+    blocks and deprecations. The same seed always generates the same headers.
+
+    Args:
+        seed: Seed of the random generator
+    """
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.class_names = ["UObject", "AActor", "UActorComponent", "UBlueprintFunctionLibrary"]
+        self.stats = CorpusStats()
+
+    def _specifiers(self, choices: list[str], most: int) -> str:
+        return ", ".join(self.rng.sample(choices, self.rng.randint(0, most)))
+
+    def _deprecation(self, macro: str = "UE_DEPRECATED") -> str:
+        self.stats.deprecations += 1
+        return f'{macro}({self.rng.choice(VERSIONS)}, "Use the (new) API instead, see \\"docs\\"")'
+
+    def _function(self, lines: list[str], index: int) -> None:
+        rng = self.rng
+        if rng.random() < 0.1:
+            lines.append(f"\t{self._deprecation()}")
+        if rng.random() < 0.3:
+            lines.append("\t/** Documentation with a { brace, a \"quote\" and // slashes */")
+        lines.append(f"\tUFUNCTION({self._specifiers(FUNCTION_SPECIFIERS, 3)})")
+        declaration = f"\t{rng.choice(RETURN_TYPES)} Function{index}({rng.choice(PARAMETERS)})"
+        if rng.random() < 0.3:
+            lines += [
+                declaration,
+                "\t{",
+                "\t\tif (bEnabled) { Log(TEXT(\"} closing brace in a literal {\")); }",
+                "\t\tfor (int32 I = 0; I < 3; ++I) { { Nested(); } }",
+                "\t}",
+            ]
+        else:
+            lines.append(declaration + (" const;" if rng.random() < 0.5 else ";"))
+        self.stats.functions += 1
+
+    def _class(self, lines: list[str], header: int) -> None:
+        rng = self.rng
+        name = f"U{header}Class{len(self.class_names)}"
+        bases = [f"public {rng.choice(self.class_names)}"]
+        if rng.random() < 0.3:
+            bases.append(f"public IInterface{rng.randint(0, 9)}")
+        deprecation = f"{self._deprecation()} " if rng.random() < 0.05 else ""
+
+        lines += [
+            f"UCLASS({self._specifiers(CLASS_SPECIFIERS, 3)})",
+            f"class {deprecation}ENGINE_API {name} : {', '.join(bases)}",
+            "{",
+            "\tGENERATED_BODY()",
+            "public:",
+            '\tUPROPERTY(EditAnywhere, meta = (DisplayName = "Value (cm)"))',
+            "\tfloat Value = 1.0f; // trailing comment with UFUNCTION() inside",
+        ]
+        for index in range(rng.randint(0, 10)):
+            self._function(lines, index)
+        if rng.random() < 0.3:
+            lines += ["#if WITH_EDITOR", "\tvirtual void PostEditChangeProperty() override;", "#endif"]
+        if rng.random() < 0.2:
+            lines += ["\tstruct FNested", "\t{", "\t\tint32 X = 0;", "\t};"]
+        lines.append("};")
+        self.class_names.append(name)
+        self.stats.classes += 1
+
+    def header(self, index: int) -> str:
+        """Generates a regular header with a few classes and deprecated free functions."""
+        rng = self.rng
+        lines = ["#pragma once", "", '#include "CoreMinimal.h"', f'#include "Header{index}.generated.h"', ""]
+        lines.append("/* Block comment with UCLASS(Blueprintable) class UFake : public UObject { */")
+        namespaced = rng.random() < 0.3
+        if namespaced:
+            lines += [f"namespace UE::Module{index % 13}", "{"]
+        for _ in range(rng.randint(0, 4)):
+            self._class(lines, index)
+        for function in range(rng.randint(0, 2)):
+            lines.append(self._deprecation(rng.choice(["UE_DEPRECATED", "UE_DEPRECATED_FORGAME"])))
+            lines.append(f"void FreeFunction{index}_{function}({rng.choice(PARAMETERS)});")
+        if namespaced:
+            lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def pathological_header(self, index: int, size: int) -> str:
+        """Generates a header of about `size` characters, with very long classes, lines and literals."""
+        rng = self.rng
+        lines = ["#pragma once", '#include "CoreMinimal.h"']
+        length = 0
+        while length < size:
+            part: list[str] = []
+            kind = rng.random()
+            if kind < 0.6:
+                self._class(part, index)
+            elif kind < 0.8:
+                part.append('static const TCHAR* Table = TEXT("' + "x\\\"{}" * rng.randint(100, 2000) + '");')
+            else:
+                part.append("/*" + " long comment UCLASS() {" * rng.randint(100, 2000) + " */")
+            lines += part
+            length += sum(len(line) + 1 for line in part)
+        return "\n".join(lines) + "\n"
+
+
+def adversarial_inputs(size: int) -> dict[str, tuple[str, str]]:
+    """
+    Returns inputs of about `size` characters built to make backtracking scanners of string literals and argument
+    lists take quadratic time, by name, each with the utility it targets. Inputs that take exponential time, such as
+    an unterminated triple-quoted literal full of escaped quotes, are left out so baselines of earlier commits finish.
+    """
+    repeat = max(size // 8, 1)
+    return {
+        "unterminated_escaped_quotes": ("remove_string_literals", '"' + '\\"' * (size // 2)),
+        "unterminated_mixed_quotes": ("remove_string_literals", "'\\'\"\\\"" * (size // 6)),
+        "prefixed_literals": ("remove_string_literals", 'TEXT(rf"' * repeat),
+        "long_specifier_list": ("split_arguments", 'BlueprintCallable, Category="A, (B)", ' * (size // 38)),
+        "deep_nesting": ("split_arguments", "meta=" + "(" * (size // 2) + "x, y" + ")" * (size // 2)),
+        "unterminated_specifier": ("split_arguments", 'Category="' + '\\", (' * (size // 5)),
+    }
+
+
+def engine_file_path(root: str, area: str, *parts: str) -> str:
+    """
+    Returns the path of a file in the engine tree at `root`, joined the way the scripts join their target directories.
+
+    Below the target directory the parts are joined with backslashes, which nest directories on Windows and keep the
+    module in the relative path elsewhere.
+    """
+    target = os.path.join(root, "Engine\\Plugins") if area == "Plugins" else os.path.join(root, "Engine\\Source", area)
+    return os.path.join(target, "\\".join(parts))
+
+
+def write_corpus(
+    root: str, headers: int = 1000, seed: int = 0, pathological: int = 0, pathological_size: int = 2 << 20
+) -> CorpusStats:
+    """
+    Writes a generated engine tree with Source and Plugins directories.
+
+    Args:
+        root: Root directory of the tree
+        headers: Number of regular headers
+        seed: Seed of the generator
+        pathological: Number of additional very large headers
+        pathological_size: Approximate size of each very large header, in characters
+
+    Returns:
+        CorpusStats: The number of files, bytes, classes, functions and deprecations written
+    """
+    generator = HeaderGenerator(seed)
+    for index in range(headers + pathological):
+        area = generator.rng.choice(AREAS)
+        module = f"Module{index % 97}"
+        parts = [f"Plugin{index % 31}", "Source", module] if area == "Plugins" else [module]
+        path = engine_file_path(root, area, *parts, "Public", f"Header{index}.h")
+        if index < headers:
+            content = generator.header(index)
+        else:
+            content = generator.pathological_header(index, pathological_size)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(content)
+        generator.stats.files += 1
+        generator.stats.bytes += len(content.encode("utf-8"))
+    return generator.stats
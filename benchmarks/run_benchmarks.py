@@ -0,0 +1,222 @@
+"""
+Times the DiffTool utilities and the end-to-end scripts on a generated header corpus, and saves the results as JSON.
+
+    python benchmarks/run_benchmarks.py --headers 2000 --baseline benchmarks/results/<previous>.json
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from DiffTool import *
+from corpus import HeaderGenerator, adversarial_inputs, write_corpus
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+UCLASS = re.compile(r'^\s*UCLASS\s*\((.*?)\)\s*class\s+(.*?)\s*\{', re.DOTALL | re.MULTILINE)
+API_MACRO = re.compile(r'\b[a-zA-Z0-9_]+_API\s*')
+
+
+def measure(func, repeat: int) -> list[float]:
+    """Returns the duration of each of `repeat` calls of `func`, in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def record(durations: list[float], items: int | None = None, size: int | None = None) -> dict[str, float | int]:
+    """Summarizes the durations of a benchmark by their minimum, with its item and byte throughput."""
+    best = min(durations)
+    result = {"seconds": best, "repeats": durations}
+    if items is not None:
+        result.update(items=items, items_per_s=items / best if best else None)
+    if size is not None:
+        result.update(bytes=size, mb_per_s=size / (1 << 20) / best if best else None)
+    return result
+
+
+def micro_benchmarks(headers: int, seed: int, repeat: int) -> dict[str, dict]:
+    """Times each utility on the concatenated text of generated headers."""
+    generator = HeaderGenerator(seed)
+    raw = "".join(generator.header(index) for index in range(headers))
+    raw += generator.pathological_header(headers, 1 << 20)
+    size = len(raw.encode("utf-8"))
+    code = preprocess_source(raw)
+    index = BracketIndex(code)
+
+    classes = list(UCLASS.finditer(code))
+    bodies = [match.end() - 1 for match in classes]
+    macros = [f"UCLASS({match.group(1)})" for match in classes]
+    declarations = [f"class {API_MACRO.sub('', match.group(2))} {{}};" for match in classes]
+    declarations = [decl for decl in declarations if "UE_DEPRECATED" not in decl]
+    ufunctions = [
+        ufunction["args"] for start in bodies for ufunction in extract_ufunctions(code, start, index.match(start), index)
+    ]
+    class_signatures = [
+        [ufunction["declaration"] for ufunction in extract_ufunctions(code, start, index.match(start), index)]
+        for start in bodies
+    ]
+    class_signatures = [signatures for signatures in class_signatures if signatures]
+    signature_count = sum(len(signatures) for signatures in class_signatures)
+    # Every class renamed, with one function replaced, among as many unrelated added classes
+    removed_classes = {f"UOld{i}": frozenset(signatures) for i, signatures in enumerate(class_signatures)}
+    added_classes = {
+        f"UNew{i}": frozenset(signatures[1:] + [f"void Renamed{i}()"]) for i, signatures in enumerate(class_signatures)
+    }
+    added_classes.update({f"UAdded{i}": frozenset([f"void Added{i}()"]) for i in range(len(class_signatures))})
+    cxx_backend = CxxHeaderParserBackend()
+    fast_backend = FastClassDeclarationBackend()
+
+    benchmarks = {
+        "preprocess_source": (lambda: preprocess_source(raw), None, size),
+        "preprocess_source.macro_lines": (
+            lambda: preprocess_source(raw, strip_macro_lines=("UCLASS", "USTRUCT", "UFUNCTION", "UPROPERTY")), None, size
+        ),
+        "remove_string_literals": (lambda: remove_string_literals(raw), None, size),
+        "BracketIndex": (lambda: BracketIndex(code), None, size),
+        "find_matching_bracket": (lambda: [find_matching_bracket(code, start) for start in bodies], len(bodies), None),
+        "read_class_body": (lambda: [read_class_body(code, start) for start in bodies], len(bodies), None),
+        "read_class_body_span.indexed": (
+            lambda: [read_class_body_span(code, start, index) for start in bodies], len(bodies), None
+        ),
+        "extract_arguments": (lambda: [extract_arguments(macro, "UCLASS") for macro in macros], len(macros), None),
+        "read_arguments": (lambda: [read_arguments(macro, macro.index("(")) for macro in macros], len(macros), None),
+        "split_arguments": (lambda: [split_arguments(args) for args in ufunctions], len(ufunctions), None),
+        "extract_uclasses": (lambda: extract_uclasses(code, bracket_index=index), len(classes), size),
+        "extract_ufunctions": (
+            lambda: [extract_ufunctions(code, start, index.match(start), index) for start in bodies], len(bodies), None
+        ),
+        "parse_class_declaration": (
+            lambda: [parse_class_declaration(decl) for decl in declarations], len(declarations), None
+        ),
+        "parse_class_declaration.fast": (lambda: [fast_backend.parse(decl) for decl in declarations], len(declarations), None),
+        "parse_class_declaration.cxxheaderparser": (
+            lambda: [cxx_backend.parse(decl) for decl in declarations], len(declarations), None
+        ),
+        "parse_function_signatures.batched": (
+            lambda: [parse_function_signatures(signatures) for signatures in class_signatures], signature_count, None
+        ),
+        "parse_function_signatures.per_call": (
+            lambda: [parse_function_signatures([decl]) for signatures in class_signatures for decl in signatures],
+            signature_count, None
+        ),
+        "match_similar": (lambda: match_similar(removed_classes, added_classes), len(removed_classes), None),
+        "match_similar.all_pairs": (
+            lambda: [
+                jaccard(prev, cur) for prev in removed_classes.values() for cur in added_classes.values()
+            ], len(removed_classes), None
+        ),
+    }
+    return {name: record(measure(func, repeat), items, size) for name, (func, items, size) in benchmarks.items()}
+
+
+def adversarial_benchmarks(size: int, repeat: int) -> dict[str, dict]:
+    """Times the string literal and argument list scanners on inputs built to make them backtrack."""
+    utilities = {"remove_string_literals": remove_string_literals, "split_arguments": split_arguments}
+    results = {}
+    for name, (utility, text) in adversarial_inputs(size).items():
+        durations = measure(lambda: utilities[utility](text), repeat)
+        results[f"{utility}.adversarial.{name}"] = record(durations, None, len(text.encode("utf-8")))
+    return results
+
+
+def end_to_end_benchmarks(headers: int, seed: int, repeat: int, pathological: int) -> tuple[dict[str, dict], dict]:
+    """Times the scripts on a generated engine tree, without caches, serially and with all CPUs."""
+    import blueprint_diff
+    import deprecations
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        stats = write_corpus(root, headers, seed, pathological)
+        runs = {
+            "parse_ue_classes.serial": lambda: blueprint_diff.parse_ue_classes(root, "5.6", None, 1, None),
+            "parse_ue_classes.parallel": lambda: blueprint_diff.parse_ue_classes(root, "5.6", None, None, None),
+            "parse_deprecated_functions": lambda: deprecations.parse_deprecated_functions(root, "5.6", None, None, None),
+        }
+        for name, run in runs.items():
+            # The scripts report progress and statistics, which would drown the benchmark output
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                durations = measure(run, repeat)
+            results[name] = record(durations, stats.files, stats.bytes)
+    return results, vars(stats)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: dict, baseline: dict | None) -> None:
+    print(f"{'benchmark':<42} {'seconds':>10} {'MB/s':>9} {'items/s':>11}" + (f" {'speedup':>8}" if baseline else ""))
+    for name, result in results["benchmarks"].items():
+        line = (
+            f"{name:<42} {result['seconds']:>10.4f} {result.get('mb_per_s') or 0:>9.2f} "
+            f"{result.get('items_per_s') or 0:>11.0f}"
+        )
+        previous = (baseline or {}).get("benchmarks", {}).get(name)
+        if previous:
+            line += f" {previous['seconds'] / result['seconds']:>7.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--headers", type=int, default=2000, help="number of generated headers")
+    parser.add_argument("--pathological", type=int, default=2, help="number of additional 2 MB headers")
+    parser.add_argument("--adversarial-size", type=int, default=1 << 13, help="size of the adversarial inputs")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus generator")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest is reported")
+    parser.add_argument("--skip-e2e", action="store_true", help="only time the utilities")
+    parser.add_argument("--output", help="result file, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--baseline", help="result file of an earlier run to compare with")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": usable_cpu_count(),
+            "headers": args.headers,
+            "pathological": args.pathological,
+            "adversarial_size": args.adversarial_size,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "benchmarks": micro_benchmarks(args.headers, args.seed, args.repeat),
+    }
+    results["benchmarks"].update(adversarial_benchmarks(args.adversarial_size, args.repeat))
+    if not args.skip_e2e:
+        end_to_end, corpus_stats = end_to_end_benchmarks(args.headers, args.seed, args.repeat, args.pathological)
+        results["benchmarks"].update(end_to_end)
+        results["meta"]["corpus"] = corpus_stats
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(commit or 'results')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f"Results saved to: {output}")
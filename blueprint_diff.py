@@ -3,10 +3,10 @@ import re
 import json
 import warnings
 from typing import Any
+from collections.abc import Callable, Iterator
+from functools import partial
 from enum import Enum
-from tqdm import tqdm
 from pathlib import Path
-import pandas as pd
 from DiffTool import *
 
 class Choice(Enum):
@@ -14,291 +14,694 @@ class Choice(Enum):
     SOURCE = "Source"
 
 
-UE_PREV_ROOT_DIR = Path("E:\\Program Files\\Epic Games\\UE_5.5")
-UE_CUR_ROOT_DIR = Path("E:\\Program Files\\Epic Games\\UE_5.6")
+UE_PREV_ROOT_DIR = Path("E:\\Program Files\\Epic Games\\UE_5.5")   # An engine tree or a .uesnap snapshot
+UE_CUR_ROOT_DIR = Path("E:\\Program Files\\Epic Games\\UE_5.6")    # An engine tree or a .uesnap snapshot
 UE_PREV_VERSION = "5.5"
 UE_CUR_VERSION = "5.6"
 DIFF_CHOICE = Choice.PLUGINS
+PARSE_WORKERS = None     # Number of parsing processes, None for all usable CPUs
+IO_WORKERS = DEFAULT_IO_WORKERS     # Number of threads listing directories and reading headers
+READ_AHEAD = DEFAULT_READ_AHEAD     # Maximum number of headers read ahead of the parser
+PARSE_CACHE_PATH = "outputs/cache/blueprint_diff.sqlite"    # Persistent parse cache, None to disable
+PARSE_CACHE_VERSION = 8  # Bump whenever the output of parse_ue_header changes to invalidate cached results
+PREFILTER_KEYWORDS = (b"UCLASS",)   # Headers without any of these are skipped before decoding
+FILE_TIME_BUDGET = 120  # Seconds a parsing process may spend on one header before it is killed, None for no limit
+FILE_MEMORY_BUDGET = 4096   # MB a parsing process may use on one header before it is killed, None for no limit
+QUARANTINE_PATH = "outputs/cache/blueprint_diff.quarantine.json"    # Headers killed for exceeding a budget, skipped while unchanged. None to disable
+SNAPSHOT_DIR = "outputs/snapshots"  # Where parsed trees are saved as snapshots, None to disable
+PRUNE_UNCHANGED = True  # Only parse the current tree's headers whose contents differ from the previous tree's
+GIT_REPO = None     # Set to a git repository of the engine to diff two of its refs incrementally, without checkouts
+GIT_PREV_REF = "5.5.4-release"  # Tag, branch or commit of UE_PREV_VERSION in GIT_REPO
+GIT_CUR_REF = "5.6.0-release"   # Tag, branch or commit of UE_CUR_VERSION in GIT_REPO
+REPORT_FORMAT = "xlsx"  # One of xlsx, csv, jsonl or parquet (requires pyarrow)
+DIFF_REPORT_COLUMNS = ['module', 'relpath', 'class_name', 'function', 'signature', 'change_type']
+SIGNATURE_DIFF = True    # Report changed return and parameter types of Blueprint functions, not only added or removed names
+RENAME_SIMILARITY = 0.5  # Minimum similarity of the functions, bases and specifiers of a removed and an added class to report a rename, None to disable
+RENAME_MIN_FUNCTIONS = 2    # Classes with fewer UFUNCTIONs are too alike to be matched as renamed
+CLASS_DECL_CROSS_CHECK_RATE = 0.0   # Fraction of fast-path class declarations re-parsed with cxxheaderparser to compare
+PROFILE = False     # Print a stage breakdown and the slowest headers at the end of the run
+PROFILE_TOP_FILES = 10  # Number of slowest headers listed in the profile
+PROFILE_TRACE_PATH = None   # Set to e.g. "outputs/blueprint_diff.trace.json" to export a Chrome trace of the run
+
+CLASS_DECL_PARSER = make_class_declaration_parser(CLASS_DECL_CROSS_CHECK_RATE)
+FILE_BUDGET = FileBudget(FILE_TIME_BUDGET, FILE_MEMORY_BUDGET) if FILE_TIME_BUDGET or FILE_MEMORY_BUDGET else None
+
+
+class UClassAnalyzer(Analyzer):
+    """
+    Extracts the UCLASS and UFUNCTION declarations of a header, skipping those deprecated in or before `UEversion`.
+
+    The result of a header maps its class names to their records.
+    """
+
+    name = "uclasses"
+    keywords = PREFILTER_KEYWORDS   # Headers without any UCLASS are skipped before decoding them
+
+    def __init__(self, UEversion: str):
+        self.UEversion = UEversion
+        self.cache_variant = UEversion
+
+    def new_result(self) -> dict[str, UClassRecord]:
+        return {}
+
+    def analyze(self, source: SourceFile, header_classes: dict[str, UClassRecord]) -> None:
+        if source.decode_error is not None:
+            raise source.decode_error
+
+        # Preprocessing: empty TEXT("...") literals, remove preprocessor directives and comments. Every bracket of
+        # the file is matched once, so class bodies and macro arguments are located without copying
+        content, brackets = source.code, source.brackets
+
+        # Extract all UCLASS macro definitions
+        with profiler.stage("locate classes"):
+            uclasses = extract_uclasses(content, bracket_index=brackets)
+
+        for uclass in uclasses:
+            with profiler.stage("class declarations"):
+                uclass_params = split_arguments(uclass["args"])
+
+                def process_class_decl(decl):
+                    cleaned_decl = re.sub(r'\b[a-zA-Z0-9_]+_API\s*', '', decl.strip())
+                    return f"class {cleaned_decl} {{}};"
+                class_decl = process_class_decl(uclass["decl"])
+
+                # Skip UE_DEPRECATED macro
+                deprecated_match = re.search(r"UE_DEPRECATED\s*\(\s*(\d+\.\d+)\s*,\s*\"(.*?)\"\s*\)", class_decl, re.DOTALL)
+                if deprecated_match:
+                    deprecated_version = deprecated_match.group(1)
+                    if float(deprecated_version) <= float(self.UEversion):
+                        continue
+                    class_decl = class_decl[:deprecated_match.start()] + class_decl[deprecated_match.end():]
+
+                class_decl_parsed = CLASS_DECL_PARSER.parse(class_decl)
+
+            class_name = class_decl_parsed["name"]
+            inheritance_list = class_decl_parsed["bases"]
+
+            header_classes[class_name] = UClassRecord(
+                name=class_name,
+                relpath=source.relpath,
+                uclass_params=uclass_params,
+                inheritance_list=[BaseRef(base["access"], base["name"]) for base in inheritance_list],
+            )
+
+            with profiler.stage("class bodies"):
+                # Locate class body
+                body_start, body_end = read_class_body_span(content, uclass["span"][1] - 1, brackets)
+
+                # Parse UFUNCTION declarations inside class body, skipping deprecated functions
+                for ufunction in extract_ufunctions(content, body_start, body_end, brackets):
+                    version = ufunction["deprecated_version"]
+                    if version is not None and (version in {'all', ''} or float(version) <= float(self.UEversion)):
+                        continue
+
+                    header_classes[class_name].ufunctions.append(
+                        UFunctionRecord(ufunction["name"], split_arguments(ufunction["args"]), ufunction["declaration"])
+                    )
+
+
+def parse_ue_classes(
+    UEpath: Path,
+    UEversion: str,
+    choice: Choice,
+    workers: int | None = PARSE_WORKERS,
+    cache_path: str | None = PARSE_CACHE_PATH,
+    files: list[str] | None = None,
+    digests: dict[str, str] | None = None,
+    unchanged: Callable[[str, bytes | None, str], bool] | None = None,
+) -> dict[str, UClassRecord]:
+    u_classes: dict[str, UClassRecord] = {}
+    run_counters.clear()
+
+    if files is None:
+        target_dirs = engine_target_dirs(UEpath, choice.value if choice else None)
+        with profiler.stage("discover"):
+            files = discover_files(target_dirs, ".h", workers=IO_WORKERS)
+    all_files = files
+
+    # Serve unchanged headers from the cache and only parse the rest, reading headers ahead of the parser
+    cache = ParseCache(cache_path, PARSE_CACHE_VERSION) if cache_path else None
+    quarantine = Quarantine(QUARANTINE_PATH) if QUARANTINE_PATH else None
+    prefilter_stats = PrefilterStats()
+    load_stats = LoadStats()
+    failed_files = []
+    try:
+        # Headers are parsed independently and merged back in walk order, so the result matches a serial run
+        with profiler.stage("parse headers (wall)"):
+            for file_path, outcomes in scan_files(
+                all_files, str(UEpath), [UClassAnalyzer(UEversion)], workers, IO_WORKERS, READ_AHEAD,
+                cache, load_stats, prefilter_stats, budget=FILE_BUDGET, quarantine=quarantine,
+                digests=digests, unchanged=unchanged,
+            ):
+                if outcomes is None:    # Accepted by `unchanged`
+                    continue
+                header_classes, error = outcomes[UClassAnalyzer.name]
+                u_classes.update(header_classes)
+                if error is not None:
+                    failed_files.append(file_path)
+    finally:
+        if cache:
+            print(f"Parse cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+        if quarantine:
+            quarantine.save()
+            print(quarantine.summary())
+    print(load_stats.summary())
+    print(prefilter_stats.summary())
+    print(CLASS_DECL_PARSER.summary())
+
+    for file_path in failed_files:
+        print(f"Error processing {file_path}. Please check the file manually.")
+                    
+    return u_classes
 
 
-def parse_ue_classes(UEpath: Path, UEversion: str, choice: Choice) -> dict[str, dict[str, Any]]:
-    u_classes: dict[str, dict[str, Any]] = {}
-
-    UE_SOURCE_DIR = Path("Engine\\Source")
-    UE_DEVELOPER_DIR = os.path.join(UEpath, UE_SOURCE_DIR, "Developer")
-    UE_EDITOR_DIR = os.path.join(UEpath, UE_SOURCE_DIR, "Editor")
-    UE_RUNTIME_DIR = os.path.join(UEpath, UE_SOURCE_DIR, "Runtime")
-    UE_PLUGINS_DIR = Path("Engine\\Plugins")
-    UE_PLUGINS_DIR = os.path.join(UEpath, UE_PLUGINS_DIR)
-
-    all_files = []
-    target_dirs = [
-        *([UE_DEVELOPER_DIR, UE_EDITOR_DIR, UE_RUNTIME_DIR] if choice == Choice.SOURCE else []),
-        *([UE_PLUGINS_DIR] if choice == Choice.PLUGINS else [])
-    ] if choice else [UE_DEVELOPER_DIR, UE_EDITOR_DIR, UE_RUNTIME_DIR, UE_PLUGINS_DIR]
-    for target_dir in target_dirs:
-        for root, _, files in os.walk(target_dir):
-            all_files.extend(
-                os.path.join(root, file) 
-                for file in files 
-                if file.endswith(".h")
+def load_ue_classes(
+    source: Path,
+    UEversion: str,
+    choice: Choice,
+    snapshot_dir: str | None = SNAPSHOT_DIR,
+) -> dict[str, UClassRecord]:
+    """
+    Loads the UE classes of an engine version from a snapshot file, or parses them from an engine tree.
+
+    A parsed tree is saved to `snapshot_dir` as `UE_<version>_<choice>.uesnap`, which can later be passed as
+    `source` in place of the tree.
+
+    Args:
+        source: A snapshot file or the root directory of an engine tree
+        UEversion: The engine version, e.g. "5.5"
+        choice: Which part of the engine to diff
+        snapshot_dir: Where to save the snapshot of a parsed tree, None to not save it
+
+    Returns:
+        dict[str, UClassRecord]: Classes as returned by `parse_ue_classes`
+    """
+    choice_name = choice.value if choice else "All"
+    if os.path.isfile(source):
+        with profiler.stage("load snapshot"):
+            u_classes, meta = load_snapshot(source)
+        if meta.get("engine_version") != UEversion or meta.get("choice") != choice_name:
+            warnings.warn(
+                f"Snapshot {source} was taken from UE {meta.get('engine_version')} ({meta.get('choice')}), "
+                f"not UE {UEversion} ({choice_name})"
             )
+        print(f"Loaded {len(u_classes)} classes from snapshot {source}")
+        return u_classes
 
-    for file_path in tqdm(all_files, desc="Processing UE headers", unit="files"):
-        try:
-            with open(file_path, "r", encoding='utf-8') as f:
-                content = f.read()
-                
-                # Preprocessing
-                content = re.sub(r'TEXT\s*\(\"(.*?)\"\)', 'TEXT("")', content)      # Replace TEXT("...") with empty string
-                content = re.sub(r'^\s*#.*', '', content, flags=re.MULTILINE)       # Remove preprocessor directives
-                content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)        # Remove multi-line comments
-                content = re.sub(r'\s*//.*', '', content, flags=re.MULTILINE)       # Remove C++ comments
-            
-                # Extract all UCLASS macro definitions
-                class_matches = re.finditer(
-                    r'^\s*UCLASS\s*\((.*?)\)\s*'
-                    r'class\s+(.*?)\s*([{;])',
-                    content,
-                    re.DOTALL | re.MULTILINE
-                )
-
-                for class_match in class_matches:
-                    uclass_params = split_arguments(extract_arguments(f"UCLASS({class_match.group(1)})", 'UCLASS'))
-
-                    def process_class_decl(decl):
-                        cleaned_decl = re.sub(r'\b[a-zA-Z0-9_]+_API\s*', '', decl.strip())
-                        return f"class {cleaned_decl} {{}};"
-                    class_decl = process_class_decl(class_match.group(2))
-
-                    # Skip UE_DEPRECATED macro
-                    deprecated_match = re.search(r"UE_DEPRECATED\s*\(\s*(\d+\.\d+)\s*,\s*\"(.*?)\"\s*\)", class_decl, re.DOTALL)
-                    if deprecated_match:
-                        deprecated_version = deprecated_match.group(1)
-                        if float(deprecated_version) <= float(UEversion):
-                            continue
-                        class_decl = class_decl[:deprecated_match.start()] + class_decl[deprecated_match.end():]
-
-                    class_decl_parsed = parse_class_declaration(class_decl)
-
-                    class_name = class_decl_parsed["name"]
-                    inheritance_list = class_decl_parsed["bases"]
-
-                    u_classes[class_name] = {
-                        "relpath": os.path.relpath(file_path, UEpath),
-                        "uclass_params": uclass_params,
-                        "inheritance_list": inheritance_list,
-                        "ufunctions": [],
-                    }
-
-                    # Read class body
-                    class_body = read_class_body(content[class_match.end() - 1:], 0)
-                
-                    # Parse UFUNCTION declarations inside class body
-                    pos = 0
-                    while pos < len(class_body):
-                        deprecated_pos = class_body.find("UE_DEPRECATED", pos)
-                        ufunction_pos = class_body.find("UFUNCTION", pos)
-                    
-                        if ufunction_pos == -1:
-                            break
-                    
-                        # Check if there is a UE_DEPRECATION macro beforehand
-                        has_deprecated = (
-                            deprecated_pos != -1 and 
-                            deprecated_pos < ufunction_pos and
-                            class_body[deprecated_pos:ufunction_pos].strip().endswith(")")
-                        )
-                    
-                        ufunction_args = read_arguments(class_body, ufunction_pos + len("UFUNCTION"))
-                        args_end = ufunction_pos + len("UFUNCTION()") + len(ufunction_args)
-                    
-                        func_decl_start = args_end
-                        re_backslash_s = {' ', '\t', '\n', '\r', '\f', '\v'}
-                        while func_decl_start < len(class_body) and class_body[func_decl_start] in re_backslash_s:
-                            func_decl_start += 1
-                    
-                        func_decl_end = func_decl_start
-                        while func_decl_end < len(class_body):
-                            c = class_body[func_decl_end]
-                            if c == ';' or c == '{':
-                                break
-                            func_decl_end += 1
-                        
-                        func_decl = class_body[func_decl_start:func_decl_end].strip()
-                        func_name = func_decl[:func_decl.find('(')].strip().split()[-1]
-                        
-                        # Skip deprecated functions
-                        if has_deprecated:
-                            dep_args = read_arguments(class_body, deprecated_pos + len("UE_DEPRECATED"))
-                            version = split_arguments(dep_args)[0]
-                            if version.strip('"\'') in {'all', ''} or float(version.strip('"\'')) <= float(UEversion):
-                                pos = func_decl_end
-                                continue
-                        
-                        u_classes[class_name]["ufunctions"].append({
-                            "name": func_name,
-                            "ufunc_params": split_arguments(ufunction_args),
-                        })
-                        
-                        pos = func_decl_end
-        except Exception as e:
-            print(f"Error processing {file_path}. Please check the file manually.")
-                    
+    u_classes = parse_ue_classes(source, UEversion, choice)
+    if snapshot_dir:
+        save_ue_snapshot(u_classes, source, UEversion, choice, snapshot_dir)
     return u_classes
 
 
-def filter_blueprinttype_classes(u_classes: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
-    blueprinttype_classes: list[dict[str, Any]] = []
-    for class_name, class_info in u_classes.items():
-        if "BlueprintType" in class_info["uclass_params"]:
-            blueprinttype_classes.append({
-                "name": class_name,
-                "relpath": class_info["relpath"],
-                "ufunctions": filter_blueprint_functions(class_info["ufunctions"])
-            })
-    return blueprinttype_classes
+def load_ue_classes_pruned(
+    prev_root: Path,
+    cur_root: Path,
+    prev_version: str,
+    cur_version: str,
+    choice: Choice,
+    snapshot_dir: str | None = SNAPSHOT_DIR,
+    cache_path: str | None = PARSE_CACHE_PATH,
+) -> tuple[dict[str, UClassRecord], dict[str, UClassRecord]]:
+    """
+    Loads the UE classes of two engine trees, parsing only the headers of the current tree that differ from those of
+    the previous tree.
+
+    Headers are hashed as they are read, so each is read once. The previous tree is parsed in full, which the parse
+    cache makes cheap after the first run, and the current tree's headers with the same content as the previous
+    header at the same relative path are not parsed, their classes being carried over instead. Unchanged headers with
+    deprecations are parsed again when the versions differ, since which of their declarations are skipped depends on
+    the engine version. The digests are then fingerprinted directory by directory to summarize what changed.
+
+    Args:
+        prev_root: The root directory of the previous engine tree
+        cur_root: The root directory of the current engine tree
+        prev_version: The previous engine version, e.g. "5.5"
+        cur_version: The current engine version, e.g. "5.6"
+        choice: Which part of the engine to diff
+        snapshot_dir: Where to save the snapshots of both trees, None to not save them
+        cache_path: The parse cache of both trees, None to disable it
+
+    Returns:
+        tuple[dict[str, UClassRecord], dict[str, UClassRecord]]: The classes of the previous and current trees
+    """
+    part = choice.value if choice else None
+    with profiler.stage("discover"):
+        prev_files = discover_files(engine_target_dirs(prev_root, part), ".h", workers=IO_WORKERS)
+        cur_files = discover_files(engine_target_dirs(cur_root, part), ".h", workers=IO_WORKERS)
+
+    prev_digests: dict[str, str] = {}
+    prev_u_classes = parse_ue_classes(
+        prev_root, prev_version, choice, cache_path=cache_path, files=prev_files, digests=prev_digests
+    )
+    prev_digests = {os.path.relpath(file_path, prev_root): digest for file_path, digest in prev_digests.items()}
+
+    pruned: set[str] = set()
+    check_deprecations = prev_version != cur_version
+
+    def unchanged(file_path: str, data: bytes | None, digest: str) -> bool:
+        relpath = os.path.relpath(file_path, cur_root)
+        if prev_digests.get(relpath) != digest or (check_deprecations and data and b"UE_DEPRECATED" in data):
+            return False
+        pruned.add(relpath)
+        return True
+
+    cur_digests: dict[str, str] = {}
+    parsed_u_classes = parse_ue_classes(
+        cur_root, cur_version, choice, cache_path=cache_path, files=cur_files, digests=cur_digests,
+        unchanged=unchanged,
+    )
+    with profiler.stage("fingerprint"):
+        comparison = FingerprintTree(
+            {os.path.relpath(file_path, cur_root): digest for file_path, digest in cur_digests.items()}
+        ).compare(FingerprintTree(prev_digests))
+
+    # Merge carried-over and parsed classes back in walk order, so the result matches a full parse
+    classes_by_file: dict[str, list[UClassRecord]] = {}
+    for class_info in prev_u_classes.values():
+        if class_info.relpath in pruned:
+            classes_by_file.setdefault(class_info.relpath, []).append(class_info)
+    for class_info in parsed_u_classes.values():
+        classes_by_file.setdefault(class_info.relpath, []).append(class_info)
+    cur_u_classes: dict[str, UClassRecord] = {}
+    for file_path in cur_files:
+        for class_info in classes_by_file.get(os.path.relpath(file_path, cur_root), ()):
+            cur_u_classes[class_info.name] = class_info
+
+    print(comparison.summary())
+    print(f"Pruning: {len(pruned)} unchanged headers carried over, {len(cur_files) - len(pruned)} parsed")
+    if snapshot_dir:
+        save_ue_snapshot(prev_u_classes, prev_root, prev_version, choice, snapshot_dir)
+        save_ue_snapshot(cur_u_classes, cur_root, cur_version, choice, snapshot_dir)
+    return prev_u_classes, cur_u_classes
+
+
+def ue_snapshot_path(snapshot_dir: str, UEversion: str, choice: Choice, commit: str | None = None) -> str:
+    """Returns the snapshot path of an engine version, `UE_<version>_<choice>[_<commit>].uesnap`."""
+    choice_name = choice.value if choice else "All"
+    suffix = f"_{commit[:12]}" if commit else ""
+    return os.path.join(snapshot_dir, f"UE_{UEversion}_{choice_name}{suffix}{SNAPSHOT_SUFFIX}")
+
+
+def save_ue_snapshot(
+    u_classes: dict[str, UClassRecord],
+    source: Path,
+    UEversion: str,
+    choice: Choice,
+    snapshot_dir: str,
+    commit: str | None = None,
+) -> None:
+    """Saves the classes parsed from an engine tree, or from a commit of an engine repository, to `snapshot_dir`."""
+    choice_name = choice.value if choice else "All"
+    snapshot_path = ue_snapshot_path(snapshot_dir, UEversion, choice, commit)
+    with profiler.stage("save snapshot"):
+        save_snapshot(
+            u_classes, snapshot_path, engine_version=UEversion, choice=choice_name, source=str(source),
+            parse_version=str(PARSE_CACHE_VERSION),
+        )
+    print(f"Saved snapshot {snapshot_path}")
+
+
+def parse_ue_classes_at_ref(
+    repo: str, ref: str, UEversion: str, paths: list[str], workers: int | None = PARSE_WORKERS
+) -> dict[str, UClassRecord]:
+    """
+    Parses headers at a ref of an engine repository, reading them from its object store without a checkout.
+
+    Relative paths of the classes use backslashes, like those of an engine tree parsed on Windows.
+
+    Args:
+        repo: The git repository of the engine
+        ref: The tag, branch or commit to parse the headers at
+        UEversion: The engine version of `ref`, e.g. "5.6"
+        paths: The headers to parse, relative to the repository root
+        workers: Number of parsing processes, None for all usable CPUs
+
+    Returns:
+        dict[str, UClassRecord]: Classes as returned by `parse_ue_classes`
+    """
+    u_classes: dict[str, UClassRecord] = {}
+    run_counters.clear()
+
+    prefilter_stats = PrefilterStats()
+    load_stats = LoadStats()
+    loaded_files = (
+        (path.replace("/", "\\"), data, error)
+        for path, data, error in load_git_files(repo, ref, paths, PREFILTER_KEYWORDS, load_stats, prefilter_stats)
+    )
+    failed_files = []
+    with profiler.stage("parse headers (wall)"):
+        for relpath, outcomes in analyze_files(
+            loaded_files, None, [UClassAnalyzer(UEversion)], workers, len(paths), f"Processing UE headers at {ref}",
+            budget=FILE_BUDGET, read_ahead=READ_AHEAD,
+        ):
+            header_classes, error = outcomes[UClassAnalyzer.name]
+            u_classes.update(header_classes)
+            if error is not None:
+                failed_files.append(relpath)
+    print(prefilter_stats.summary())
+    print(CLASS_DECL_PARSER.summary())
+
+    for relpath in failed_files:
+        print(f"Error processing {relpath} at {ref}. Please check the file manually.")
+    return u_classes
 
 
-def filter_blueprintable_classes(u_classes: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+def load_ue_classes_incremental(
+    repo: str,
+    prev_ref: str,
+    cur_ref: str,
+    prev_version: str,
+    cur_version: str,
+    choice: Choice,
+    snapshot_dir: str | None = SNAPSHOT_DIR,
+) -> tuple[dict[str, UClassRecord], dict[str, UClassRecord]]:
+    """
+    Loads the UE classes of two refs of an engine repository, parsing only the headers that differ between them.
+
+    The previous ref is parsed in full once, from the object store, and saved to `snapshot_dir` as a baseline named
+    after its commit, which later runs reuse until `PARSE_CACHE_VERSION` changes. The classes of the current ref are
+    those of the baseline, except for the headers changed between the refs, which are parsed at the current ref.
+    Unchanged headers with deprecations are parsed again too, since which of their declarations are skipped depends
+    on the engine version.
+
+    Args:
+        repo: The git repository of the engine
+        prev_ref: The tag, branch or commit of the previous engine version
+        cur_ref: The tag, branch or commit of the current engine version
+        prev_version: The previous engine version, e.g. "5.5"
+        cur_version: The current engine version, e.g. "5.6"
+        choice: Which part of the engine to diff
+        snapshot_dir: Where baseline snapshots are saved and reused from, None to always parse the previous ref
+
+    Returns:
+        tuple[dict[str, UClassRecord], dict[str, UClassRecord]]: The classes of the previous and current refs
+    """
+    pathspecs = engine_pathspecs(choice.value if choice else None)
+    prev_commit, cur_commit = git_rev_parse(repo, prev_ref), git_rev_parse(repo, cur_ref)
+
+    prev_u_classes = None
+    baseline_path = ue_snapshot_path(snapshot_dir, prev_version, choice, prev_commit) if snapshot_dir else None
+    if baseline_path and os.path.isfile(baseline_path):
+        with profiler.stage("load snapshot"):
+            prev_u_classes, meta = load_snapshot(baseline_path)
+        if meta.get("parse_version") == str(PARSE_CACHE_VERSION):
+            print(f"Loaded {len(prev_u_classes)} classes from baseline snapshot {baseline_path}")
+        else:
+            prev_u_classes = None   # Taken by an older parser
+    if prev_u_classes is None:
+        with profiler.stage("discover"):
+            prev_files = git_list_files(repo, prev_commit, pathspecs)
+        prev_u_classes = parse_ue_classes_at_ref(repo, prev_ref, prev_version, prev_files)
+        if snapshot_dir:
+            save_ue_snapshot(prev_u_classes, f"{repo}@{prev_ref}", prev_version, choice, snapshot_dir, prev_commit)
+
+    with profiler.stage("discover"):
+        changed_files = git_changed_files(repo, prev_commit, cur_commit, pathspecs)
+        parsed_files = {path for path, status in changed_files.items() if status != "D"}
+        if prev_version != cur_version:
+            parsed_files |= git_grep_files(repo, cur_commit, "UE_DEPRECATED", pathspecs)
+    stale_relpaths = {path.replace("/", "\\") for path in parsed_files.union(changed_files)}
+
+    cur_u_classes = {
+        class_name: class_info for class_name, class_info in prev_u_classes.items()
+        if class_info.relpath not in stale_relpaths
+    }
+    cur_u_classes.update(parse_ue_classes_at_ref(repo, cur_ref, cur_version, sorted(parsed_files)))
+    print(
+        f"Incremental diff: {len(changed_files)} headers changed between {prev_ref} and {cur_ref}, "
+        f"{len(parsed_files)} parsed at {cur_ref}"
+    )
+    if snapshot_dir:
+        save_ue_snapshot(cur_u_classes, f"{repo}@{cur_ref}", cur_version, choice, snapshot_dir, cur_commit)
+    return prev_u_classes, cur_u_classes
+
+
+def filter_blueprinttype_classes(u_classes: dict[str, UClassRecord]) -> list[UClassRecord]:
+    """Returns the classes marked BlueprintType, as references to the parsed records rather than copies."""
+    return [class_info for class_info in u_classes.values() if "BlueprintType" in class_info.uclass_params]
+
+
+def filter_blueprintable_classes(
+    u_classes: dict[str, UClassRecord], hierarchy: ClassHierarchy | None = None
+) -> list[UClassRecord]:
     """Filter out classes that are not blueprintable."""
-    blueprintable_cache: dict[str, bool] = {}
-    
-    def is_blueprintable(cls_name: str) -> bool:
-        # Check cache first
-        if cls_name in blueprintable_cache:
-            return blueprintable_cache[cls_name]
-        
-        # Check if class is marked as NotBlueprintable
-        if "NotBlueprintable" in [p.split('=')[0].strip() for p in u_classes.get(cls_name, {}).get("uclass_params", [])]:
-            blueprintable_cache[cls_name] = False
-            return False
-        
-        # Check current class's UCLASS parameters
-        current_class = u_classes.get(cls_name, {})
-        if "Blueprintable" in [p.split('=')[0].strip() for p in current_class.get("uclass_params", [])]:
-            blueprintable_cache[cls_name] = True
-            return True
-        
-        # Recursively check all parent classes
-        for parent in current_class.get("inheritance_list", []):
-            if is_blueprintable(parent["name"]):
-                blueprintable_cache[cls_name] = True
-                return True
-        
-        # Cache negative result
-        blueprintable_cache[cls_name] = False
-        return False
-    
-    # Check all classes and collect qualified ones
-    result: list[dict[str, Any]] = []
-    for cls_name, cls_info in u_classes.items():
-        if is_blueprintable(cls_name):
-            result.append({
-                "name": cls_name,
-                "relpath": cls_info["relpath"],
-                "ufunctions": filter_blueprint_functions(cls_info["ufunctions"])
-            })
-    
-    return result
+    hierarchy = hierarchy if hierarchy is not None else ClassHierarchy(u_classes)
+    blueprintable_classes = hierarchy.blueprintable_classes()
+
+    # Check all classes and collect qualified ones, as references to the parsed records rather than copies
+    return [cls_info for cls_name, cls_info in u_classes.items() if cls_name in blueprintable_classes]
+
 
+def blueprint_classes(u_classes: dict[str, UClassRecord]) -> list[UClassRecord]:
+    """Returns the classes that are BlueprintType or Blueprintable, once each."""
+    with profiler.stage("filter classes"):
+        return list({
+            cls.name: cls
+            for cls in filter_blueprinttype_classes(u_classes) + filter_blueprintable_classes(u_classes)
+        }.values())
 
-def filter_blueprint_functions(u_functions: list[dict[str, Any]]) -> list[str]:
-    blueprint_functions: list[str] = []
+
+def filter_blueprint_functions(u_functions: list[UFunctionRecord]) -> list[UFunctionRecord]:
+    blueprint_functions: list[UFunctionRecord] = []
     for function in u_functions:
-        if "BlueprintCallable" in function["ufunc_params"] or "BlueprintPure" in function["ufunc_params"]:
-            blueprint_functions.append(function["name"])
+        if "BlueprintCallable" in function.ufunc_params or "BlueprintPure" in function.ufunc_params:
+            blueprint_functions.append(function)
     return blueprint_functions
 
 
-def diff(prev_list: list[dict[str, Any]], cur_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    prev_classes = {cls['name']: cls for cls in prev_list}
-    cur_classes = {cls['name']: cls for cls in cur_list}
+def function_signatures(functions: list[UFunctionRecord]) -> dict[str, dict[str, UFunctionRecord]]:
+    """
+    Returns the functions by name and signature, e.g. `{"Foo": {"bool Foo(int32) const": <record>}}`, with every
+    declaration parsed by a single cxxheaderparser call. A declaration that fails to parse is compared as written, and
+    all overloads of a function compare equal when SIGNATURE_DIFF is disabled.
+    """
+    if SIGNATURE_DIFF:
+        with profiler.stage("parse signatures"):
+            parsed = parse_function_signatures([function.declaration for function in functions])
+    else:
+        parsed = [None] * len(functions)
+    signatures: dict[str, dict[str, UFunctionRecord]] = {}
+    for function, signature in zip(functions, parsed):
+        if signature is not None:
+            text = format_function_signature(signature)
+        else:
+            text = function.declaration if SIGNATURE_DIFF else ""
+        signatures.setdefault(function.name, {})[text] = function
+    return signatures
+
+
+def function_rename_key(name: str, signature: str, function: UFunctionRecord) -> tuple | None:
+    """Returns what a renamed function keeps, its signature without the name and its specifiers, None if unknown."""
+    if not signature:
+        return None
+    return signature.replace(f"{name}(", "(", 1), parse_specifiers(function.ufunc_params)
+
+
+def class_features(cls: UClassRecord) -> frozenset[str]:
+    """
+    Returns what a class keeps when renamed, to find it by similarity: the names and normalized signatures of its
+    functions, its bases and its specifiers. Signatures are compared without the function name, parameter names and
+    default values, so a renamed function keeps its signature and a function with a retyped parameter its name.
+    """
+    features = [f"base {base.access} {base.name}" for base in cls.inheritance_list]
+    features += [f"specifier {specifier}" for specifier in parse_specifiers(cls.uclass_params)]
+    for name, overloads in function_signatures(cls.ufunctions).items():
+        features.append(f"function {name}")
+        for signature, function in overloads.items():
+            rename_key = function_rename_key(name, signature, function)
+            if rename_key is not None:
+                shape, specifiers = rename_key
+                features.append(f"signature {shape} {' '.join(sorted(specifiers))}")
+    return frozenset(features)
+
+
+def related_classes(removed: dict[str, frozenset[str]], added: dict[str, frozenset[str]], prev: str, cur: str) -> bool:
+    """
+    Returns whether a removed and an added class, given by their `class_features`, have at least RENAME_MIN_FUNCTIONS
+    function names or signatures in common, so classes alike only by their bases and specifiers, e.g. one that lost
+    BlueprintType and an unrelated new class, are not matched as renamed.
+    """
+    shared = removed[prev] & added[cur]
+    return any(
+        sum(feature.startswith(kind) for feature in shared) >= RENAME_MIN_FUNCTIONS
+        for kind in ("function ", "signature ")
+    )
+
+
+def header_module(relpath: str) -> tuple[str, ...]:
+    """Returns the module directory of a header, or its directory when it is not in a module."""
+    parts = path_parts(relpath)
+    return engine_module_parts(parts)[0] or parts[:-1]
+
+
+def match_renamed_classes(
+    prev_classes: dict[str, UClassRecord], cur_classes: dict[str, UClassRecord]
+) -> dict[str, str]:
+    """Returns the previous name of every class found renamed, by current name."""
+    if RENAME_SIMILARITY is None:
+        return {}
+    with profiler.stage("match renames"):
+        removed, added = (
+            {
+                name: class_features(cls) for name, cls in classes.items()
+                if name not in others and len(cls.ufunctions) >= RENAME_MIN_FUNCTIONS
+            }
+            for classes, others in ((prev_classes, cur_classes), (cur_classes, prev_classes))
+        )
+        related = partial(related_classes, removed, added)
+        return {cur: prev for prev, cur, _ in match_similar(removed, added, RENAME_SIMILARITY, related=related)}
+
+
+def diff(prev_list: list[UClassRecord], cur_list: list[UClassRecord]) -> list[dict[str, Any]]:
+    prev_classes = {cls.name: cls for cls in prev_list}
+    cur_classes = {cls.name: cls for cls in cur_list}
+    renamed_classes = match_renamed_classes(prev_classes, cur_classes)
     
     result: list[dict[str, Any]] = []
     
-    all_classes = set(prev_classes.keys()).union(cur_classes.keys())
+    all_classes = set(prev_classes.keys()).union(cur_classes.keys()) - set(renamed_classes.values())
     
     for cls_name in all_classes:
-        prev_cls = prev_classes.get(cls_name)
+        prev_cls = prev_classes.get(renamed_classes.get(cls_name, cls_name))
         cur_cls = cur_classes.get(cls_name)
+        if prev_cls is cur_cls:
+            continue    # Carried over from an unchanged header
         
-        prev_funcs = prev_cls['ufunctions'] if prev_cls else []
-        cur_funcs = cur_cls['ufunctions'] if cur_cls else []
-
-        # if prev_cls and cur_cls and prev_cls['relpath'] != cur_cls['relpath']:
-        #     print(f"Class '{cls_name}' has changed paths: {prev_cls['relpath']} -> {cur_cls['relpath']}")
-        relpath = cur_cls['relpath'] if cur_cls else prev_cls['relpath']
-
-        added = list(set(cur_funcs) - set(prev_funcs))
-        removed = list(set(prev_funcs) - set(cur_funcs))
+        prev_funcs = filter_blueprint_functions(prev_cls.ufunctions) if prev_cls else []
+        cur_funcs = filter_blueprint_functions(cur_cls.ufunctions) if cur_cls else []
+        moved = prev_cls and cur_cls and header_module(prev_cls.relpath) != header_module(cur_cls.relpath)
+        if prev_funcs == cur_funcs and not moved and cls_name not in renamed_classes:
+            continue    # Same Blueprint API surface
+
+        relpath = cur_cls.relpath if cur_cls else prev_cls.relpath
+
+        prev_signatures = function_signatures(prev_funcs)
+        cur_signatures = function_signatures(cur_funcs)
+        added: dict[tuple[str, str], UFunctionRecord] = {}
+        removed: dict[tuple[str, str], UFunctionRecord] = {}
+        changed: list[tuple[str, str]] = []
+        for name in prev_signatures.keys() | cur_signatures.keys():
+            prev_overloads = prev_signatures.get(name, {})
+            cur_overloads = cur_signatures.get(name, {})
+            only_prev = prev_overloads.keys() - cur_overloads.keys()
+            only_cur = cur_overloads.keys() - prev_overloads.keys()
+            if prev_overloads and cur_overloads and len(only_prev) == 1 and len(only_cur) == 1:
+                changed.append((name, f"{only_prev.pop()} -> {only_cur.pop()}"))
+            else:
+                added.update(((name, signature), cur_overloads[signature]) for signature in only_cur)
+                removed.update(((name, signature), prev_overloads[signature]) for signature in only_prev)
+
+        # A removed function and an added one with the same signature and specifiers, apart from the name, is a rename
+        renamed: list[tuple[str, str]] = []
+        removed_keys, added_keys = (
+            {
+                key: rename_key for key, function in functions.items()
+                if (rename_key := function_rename_key(*key, function)) is not None
+            }
+            for functions in (removed, added)
+        )
+        for prev_function, cur_function in pair_by_key(removed_keys, added_keys):
+            del removed[prev_function], added[cur_function]
+            renamed.append((cur_function[0], f"{prev_function[1]} -> {cur_function[1]}"))
         
         # Only keep classes with actual changes
-        if added or removed:  # Check if either list has elements
+        if added or removed or changed or renamed or moved or cls_name in renamed_classes:
             result.append({
                 'class_name': cls_name,
                 'module': relpath.split('\\')[2] + "::" + relpath.split('\\')[3],
                 'relpath': relpath,
                 'added_functions': sorted(added),
-                'removed_functions': sorted(removed)
+                'removed_functions': sorted(removed),
+                'changed_functions': sorted(changed),
+                'renamed_functions': sorted(renamed),
+                'renamed_from': renamed_classes.get(cls_name),
+                'moved_from': prev_cls.relpath if moved else None,
             })
     
     return result
 
 
-# TODO: implement more organized output
-def diff_to_excel(diff_result: list[dict[str, Any]], output_file: str) -> None:
-    # Convert to DataFrame and explode list columns
-    df = pd.DataFrame(diff_result)
-    
-    # Create separate rows for added and removed functions
-    added_df = df.explode('added_functions').dropna(subset=['added_functions']).copy()
-    added_df['change_type'] = 'Added'
-    added_df.rename(columns={'added_functions': 'function'}, inplace=True)
-    
-    removed_df = df.explode('removed_functions').dropna(subset=['removed_functions']).copy()
-    removed_df['change_type'] = 'Removed'
-    removed_df.rename(columns={'removed_functions': 'function'}, inplace=True)
-    
-    # Combine both results
-    combined_df = pd.concat([added_df, removed_df], ignore_index=True)
-    
-    # Reorder and select final columns
-    final_df = combined_df[['module', 'relpath', 'class_name', 'function', 'change_type']]
-    
-    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-        final_df.to_excel(writer, sheet_name="API Changes", index=False)
-        
-        # Auto-adjust column widths
-        worksheet = writer.sheets['API Changes']
-        for i, col in enumerate(final_df.columns):
-            max_len = max(final_df[col].astype(str).map(len).max(), len(col)) + 2
-            worksheet.set_column(i, i, max_len)
-    
-    print(f"Excel report saved to: {output_file}")
-    
+def diff_rows(diff_result: list[dict[str, Any]]) -> Iterator[dict[str, str]]:
+    """
+    Yields one report row per added function, then per removed function, changed signature and renamed function,
+    then one per renamed class and one per class moved to another module.
+    """
+    for change_type, functions_key in (
+        ("Added", "added_functions"),
+        ("Removed", "removed_functions"),
+        ("Changed", "changed_functions"),
+        ("Renamed", "renamed_functions"),
+    ):
+        for class_diff in diff_result:
+            for function, signature in class_diff[functions_key]:
+                yield {
+                    "module": class_diff["module"],
+                    "relpath": class_diff["relpath"],
+                    "class_name": class_diff["class_name"],
+                    "function": function,
+                    "signature": signature,
+                    "change_type": change_type,
+                }
+    for change_type, previous_key, current_key in (
+        ("Renamed", "renamed_from", "class_name"), ("Moved", "moved_from", "relpath")
+    ):
+        for class_diff in diff_result:
+            if class_diff[previous_key] is not None:
+                yield {
+                    "module": class_diff["module"],
+                    "relpath": class_diff["relpath"],
+                    "class_name": class_diff["class_name"],
+                    "function": "",
+                    "signature": f"{class_diff[previous_key]} -> {class_diff[current_key]}",
+                    "change_type": change_type,
+                }
+
+
+def write_diff_report(diff_result: list[dict[str, Any]], output_file: str) -> None:
+    # Rows are written as they are produced; the format follows the extension of output_file
+    with open_report_writer(output_file, DIFF_REPORT_COLUMNS, "API Changes") as writer:
+        writer.write_rows(diff_rows(diff_result))
+
+    print(f"Report saved to: {output_file}")
 
-if __name__ == "__main__":
-    prev_u_classes = parse_ue_classes(UE_PREV_ROOT_DIR, UE_PREV_VERSION, DIFF_CHOICE)
 
-    prev_blueprint_classes = list({
-        cls["name"]: cls
-        for cls in filter_blueprinttype_classes(prev_u_classes) + filter_blueprintable_classes(prev_u_classes)
-    }.values())
+if __name__ == "__main__":
+    profiler.reset(PROFILE, trace=PROFILE_TRACE_PATH is not None)
+
+    if GIT_REPO:
+        prev_u_classes, cur_u_classes = load_ue_classes_incremental(
+            GIT_REPO, GIT_PREV_REF, GIT_CUR_REF, UE_PREV_VERSION, UE_CUR_VERSION, DIFF_CHOICE
+        )
+    elif PRUNE_UNCHANGED and os.path.isdir(UE_PREV_ROOT_DIR) and os.path.isdir(UE_CUR_ROOT_DIR):
+        prev_u_classes, cur_u_classes = load_ue_classes_pruned(
+            UE_PREV_ROOT_DIR, UE_CUR_ROOT_DIR, UE_PREV_VERSION, UE_CUR_VERSION, DIFF_CHOICE
+        )
+    else:
+        prev_u_classes = load_ue_classes(UE_PREV_ROOT_DIR, UE_PREV_VERSION, DIFF_CHOICE)
+        cur_u_classes = load_ue_classes(UE_CUR_ROOT_DIR, UE_CUR_VERSION, DIFF_CHOICE)
+
+    prev_blueprint_classes = blueprint_classes(prev_u_classes)
 
     # print(json.dumps(prev_blueprint_classes, indent=4))
     
-    cur_u_classes = parse_ue_classes(UE_CUR_ROOT_DIR, UE_CUR_VERSION, DIFF_CHOICE)
-    
-    cur_blueprint_classes = list({
-        cls["name"]: cls 
-        for cls in filter_blueprinttype_classes(cur_u_classes) + filter_blueprintable_classes(cur_u_classes)
-    }.values())
+    cur_blueprint_classes = blueprint_classes(cur_u_classes)
 
     # print(json.dumps(cur_blueprint_classes, indent=4))
 
-    blueprint_api_diff = diff(prev_blueprint_classes, cur_blueprint_classes)
+    with profiler.stage("diff"):
+        blueprint_api_diff = diff(prev_blueprint_classes, cur_blueprint_classes)
 
     # print(json.dumps(blueprint_api_diff, indent=4))
 
-    diff_to_excel(blueprint_api_diff, f"outputs/blueprint_diff_{UE_PREV_VERSION}_{UE_CUR_VERSION}.xlsx")
\ No newline at end of file
+    with profiler.stage("write report"):
+        write_diff_report(
+            blueprint_api_diff, f"outputs/blueprint_diff_{UE_PREV_VERSION}_{UE_CUR_VERSION}.{REPORT_FORMAT}"
+        )
+
+    if profiler.enabled:
+        print(profiler.summary(PROFILE_TOP_FILES))
+    if profiler.trace:
+        profiler.export_chrome_trace(PROFILE_TRACE_PATH)
+        print(f"Trace saved to: {PROFILE_TRACE_PATH}")
\ No newline at end of file
@@ -1,12 +1,9 @@
 import os
-import re
-import json
-import shutil, tempfile
+import shutil
 from typing import Any
+from collections.abc import Iterable, Iterator
 from enum import Enum
-from tqdm import tqdm
 from pathlib import Path
-import pandas as pd
 from DiffTool import *
 
 class Choice(Enum):
@@ -17,144 +14,238 @@ class Choice(Enum):
 UE_ROOT_DIR = Path("E:\\Program Files\\Epic Games\\UE_5.6")
 UE_VERSION = "5.6"
 DEPRECATION_CHOICE = Choice.PLUGINS
-OUTPUT_DIR = "outputs/deprecations"
-
-
-def filter_deprecation_files(UEpath: Path, UEversion: str, choice: Choice) -> None:
-    UE_SOURCE_DIR = Path("Engine\\Source")
-    UE_DEVELOPER_DIR = os.path.join(UEpath, UE_SOURCE_DIR, "Developer")
-    UE_EDITOR_DIR = os.path.join(UEpath, UE_SOURCE_DIR, "Editor")
-    UE_RUNTIME_DIR = os.path.join(UEpath, UE_SOURCE_DIR, "Runtime")
-    UE_PLUGINS_DIR = Path("Engine\\Plugins")
-    UE_PLUGINS_DIR = os.path.join(UEpath, UE_PLUGINS_DIR)
-
-    all_files = []
-    target_dirs = [
-        *([UE_DEVELOPER_DIR, UE_EDITOR_DIR, UE_RUNTIME_DIR] if choice == Choice.SOURCE else []),
-        *([UE_PLUGINS_DIR] if choice == Choice.PLUGINS else [])
-    ] if choice else [UE_DEVELOPER_DIR, UE_EDITOR_DIR, UE_RUNTIME_DIR, UE_PLUGINS_DIR]
-    for target_dir in target_dirs:
-        for root, _, files in os.walk(target_dir):
-            all_files.extend(
-                os.path.join(root, file) 
-                for file in files 
-                if file.endswith(".h")
-            )
-    
-    if os.path.exists(OUTPUT_DIR):
-        shutil.rmtree(OUTPUT_DIR, onexc=lambda f,p,_: (os.chmod(p, 0o777), f(p)))
-    os.makedirs(OUTPUT_DIR)   
+REPORT_VERSIONS = (UE_VERSION,)     # Versions to report the deprecations of, all served from one scan
+DEPRECATED_SINCE = None     # Set to a version to also report everything deprecated in it or earlier
+INDEX_PATH = "outputs/cache/deprecations.sqlite"    # Deprecations of every version, reused while the headers of UE_ROOT_DIR are unchanged, None to always rescan
+INDEX_VERSION = 2   # Bump whenever the records of find_deprecated_functions change to invalidate saved indexes
+REPORT_FORMAT = "csv"   # One of csv, xlsx, jsonl or parquet (requires pyarrow)
+DUMP_DIR = None     # Set to e.g. "outputs/deprecations" to dump the preprocessed headers with deprecations, for debugging
+UE_MACRO_LINES = ("UCLASS", "USTRUCT", "UFUNCTION", "UPROPERTY")
+PREFILTER_KEYWORDS = (b"UE_DEPRECATED",)    # Headers without any of these are skipped before decoding
+SCAN_WORKERS = None     # Number of scanning processes, None for all usable CPUs
+IO_WORKERS = DEFAULT_IO_WORKERS     # Number of threads listing directories and reading headers
+READ_AHEAD = DEFAULT_READ_AHEAD     # Maximum number of headers read ahead of the scan
+FILE_TIME_BUDGET = 120  # Seconds a scanning process may spend on one header before it is killed, None for no limit
+FILE_MEMORY_BUDGET = 4096   # MB a scanning process may use on one header before it is killed, None for no limit
+QUARANTINE_PATH = "outputs/cache/deprecations.quarantine.json"  # Headers killed for exceeding a budget, skipped while unchanged. None to disable
+PROFILE = False     # Print a stage breakdown and the slowest headers at the end of the run
+PROFILE_TOP_FILES = 10  # Number of slowest headers listed in the profile
+PROFILE_TRACE_PATH = None   # Set to e.g. "outputs/deprecations.trace.json" to export a Chrome trace of the run
+
+
+def dump_filtered_file(content: str, relpath: str, dump_dir: str) -> None:
+    """Writes a preprocessed header under `dump_dir`, mirroring its path in the engine tree, for debugging."""
+    output_path = Path(dump_dir) / relpath
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def find_deprecated_functions(content: str, relpath: str) -> list[dict[str, Any]]:
+    """Finds the deprecated functions of every version in a preprocessed header."""
+    deprecated_functions: list[dict[str, Any]] = []
 
-    for file_path in tqdm(all_files, desc="Processing files", unit="file"):
-        try:
-            with open(file_path, "r", encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-                # Preprocessing
-                content = re.sub(r'TEXT\s*\(\"(.*?)\"\)', 'TEXT("")', content)      # Replace TEXT("...") with empty string
-                content = re.sub(r'^\s*#.*', '', content, flags=re.MULTILINE)       # Remove preprocessor directives
-                content = re.sub(r'^\s*(UCLASS|USTRUCT|UFUNCTION|UPROPERTY).*', '', content, flags=re.MULTILINE)  # Remove UE macros
-                content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)        # Remove multi-line comments
-                content = re.sub(r'\s*//.*', '', content, flags=re.MULTILINE)       # Remove C++ comments
-
-                deprecated_matches = re.finditer(
-                    r"UE_DEPRECATED\s*\(\s*(\d+\.\d+)\s*,\s*\"(.*?)\"\s*\)",
-                    content,
-                    re.DOTALL
-                )
-
-                for deprecated_match in deprecated_matches:
-                    deprecated_version = deprecated_match.group(1)
-                    if deprecated_version == UEversion:
-                        relative_path = Path(file_path).relative_to(UEpath)
-                        output_path = Path(OUTPUT_DIR) / relative_path
-                        output_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(output_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                        break
-        except Exception as e:
-            print(f"Error processing file {file_path}. Please check the file manually.")
-
-    return
+    with profiler.stage("find deprecations"):
+        deprecations = find_deprecations(content, DEPRECATION_MACROS)
+    with profiler.stage("scope map"):
+        scope_map = ScopeMap(content) if deprecations else None
+    for deprecation in deprecations:
+        # Find the innermost scope containing the function
+        local_scope = scope_map.resolve(deprecation["span"][0])
+
+        deprecated_functions.append({
+            "relpath": relpath,
+            "module": relpath.split("\\")[2] + "::" + relpath.split("\\")[3],
+            "name": deprecation["name"],
+            "scope": local_scope,
+            "reason": deprecation["reason"],
+            "declaration": deprecation["declaration"],
+            "macro": deprecation["macro"],
+            "version": deprecation["version"],
+        })
 
+    return deprecated_functions
 
-# TODO: Support parsing more types of deprecations
-def parse_deprecated_functions(UEpath: Path, UEversion: str, choice: Choice) -> list[dict[str, Any]]:
-    # Filter files with deprecated functions
-    filter_deprecation_files(UEpath, UEversion, choice)
 
-    deprecated_functions: list[dict[str, Any]] = []
+class DeprecationAnalyzer(Analyzer):
+    """
+    Finds the deprecated functions of every version in a header, optionally dumping the preprocessed header.
 
-    UE_SOURCE_DIR = Path("Engine\\Source")
-    UE_DEVELOPER_DIR = os.path.join(OUTPUT_DIR, UE_SOURCE_DIR, "Developer")
-    UE_EDITOR_DIR = os.path.join(OUTPUT_DIR, UE_SOURCE_DIR, "Editor")
-    UE_RUNTIME_DIR = os.path.join(OUTPUT_DIR, UE_SOURCE_DIR, "Runtime")
-    UE_PLUGINS_DIR = Path("Engine\\Plugins")
-    UE_PLUGINS_DIR = os.path.join(OUTPUT_DIR, UE_PLUGINS_DIR)
-
-    all_files = []
-    target_dirs = [
-        *([UE_DEVELOPER_DIR, UE_EDITOR_DIR, UE_RUNTIME_DIR] if choice == Choice.SOURCE else []),
-        *([UE_PLUGINS_DIR] if choice == Choice.PLUGINS else [])
-    ] if choice else [UE_DEVELOPER_DIR, UE_EDITOR_DIR, UE_RUNTIME_DIR, UE_PLUGINS_DIR]
-    for target_dir in target_dirs:
-        for root, _, files in os.walk(target_dir):
-            all_files.extend(
-                os.path.join(root, file) 
-                for file in files 
-                if file.endswith(".h")
-            )
+    The result of a header is the list of its deprecated functions.
+    """
 
-    for file_path in tqdm(all_files, desc="Processing files", unit="file"):
-        try:
-            with open(file_path, "r", encoding='utf-8') as f:
-                # Read the file content
-                content = f.read()
-
-                # Find all UFUNCTION declarations in class body
-                function_matches = re.finditer(
-                    r'^\s*UE_DEPRECATED\s*\(\s*(\d+\.\d+)\s*,\s*"(.*?)"\s*\)\s*?\n\s*(.*?)\s*?(?=\n|$)',
-                    content,
-                    re.MULTILINE | re.DOTALL
-                )
-
-                for function_match in function_matches:
-                    deprecated_version = function_match.group(1)
-                    deprecated_reason = function_match.group(2)
-                    function_declaration = function_match.group(3)
-                    # function_line = content[:function_match.start()].count('\n') + 1
-
-                    if deprecated_version == UEversion:
-                        function_declaration = function_declaration.strip()
-                        func_name = function_declaration[:function_declaration.find('(')].strip().split()[-1]
-                        relpath = str(Path(file_path).relative_to(OUTPUT_DIR))
-                        
-                        # Find the innermost scope containing the function
-                        local_scope = None
-                        
-                        deprecated_functions.append({
-                            "relpath": relpath,
-                            "module": relpath.split("\\")[2] + "::" + relpath.split("\\")[3],
-                            "name": func_name,
-                            "scope": local_scope,
-                            "reason": deprecated_reason,
-                            "declaration": function_declaration,
-                        })
-        except Exception as e:
-            print(f"Error processing file {file_path}. Please check the file manually.")
+    name = "deprecations"
+    keywords = PREFILTER_KEYWORDS   # Headers without any UE_DEPRECATED are skipped before decoding them
 
-    return deprecated_functions
+    def __init__(self, dump_dir: str | None = None):
+        self.dump_dir = dump_dir
+
+    def analyze(self, source: SourceFile, deprecated_functions: list[dict[str, Any]]) -> None:
+        # Preprocessing: empty TEXT("...") literals, remove preprocessor directives, UE macro lines and comments
+        content = source.code_without_macro_lines(UE_MACRO_LINES)
+        deprecated_functions.extend(find_deprecated_functions(content, source.relpath))
 
+        if self.dump_dir and deprecated_functions:
+            with profiler.stage("dump"):
+                dump_filtered_file(content, source.relpath, self.dump_dir)
 
-# TODO: Implement more organized report
-def report_deprecated_functions(deprecated_funcs: list[dict[str, Any]], output: str) -> None:
-    # Create a DataFrame from the deprecated functions list
-    df = pd.DataFrame(deprecated_funcs)
-    # Save the DataFrame to a CSV file
-    df.to_csv(output, index=False)
+
+def reset_dump_dir(dump_dir: str) -> None:
+    """Empties the dump directory, creating it if needed."""
+    if os.path.exists(dump_dir):
+        shutil.rmtree(dump_dir, onexc=lambda f,p,_: (os.chmod(p, 0o777), f(p)))
+    os.makedirs(dump_dir)
+
+
+# TODO: Support parsing more types of deprecations
+def scan_deprecated_functions(
+    UEpath: Path,
+    choice: Choice,
+    dump_dir: str | None = DUMP_DIR,
+    files: list[str] | None = None,
+    failed_files: list[str] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Streams the deprecated functions of every version, reading and preprocessing every header once.
+
+    Args:
+        UEpath: The root directory of the engine tree
+        choice: Which part of the engine to scan
+        dump_dir: Optional directory receiving a preprocessed copy of every header with a deprecation, replaced on
+            every run
+        files: The headers to scan, discovered under `UEpath` if not given
+        failed_files: Optional list the headers that failed or were quarantined are added to
+
+    Yields:
+        dict[str, Any]: One record per deprecated function, in engine tree order
+    """
+    if files is None:
+        target_dirs = engine_target_dirs(UEpath, choice.value if choice else None)
+        with profiler.stage("discover"):
+            files = discover_files(target_dirs, ".h", workers=IO_WORKERS)
+    all_files = files
+
+    if dump_dir:
+        reset_dump_dir(dump_dir)
+
+    # Read headers ahead of the scan, skipping those without any UE_DEPRECATED before decoding them
+    budget = FileBudget(FILE_TIME_BUDGET, FILE_MEMORY_BUDGET) if FILE_TIME_BUDGET or FILE_MEMORY_BUDGET else None
+    prefilter_stats = PrefilterStats()
+    load_stats = LoadStats()
+    with Quarantine(QUARANTINE_PATH) as quarantine:
+        for file_path, outcomes in scan_files(
+            all_files, str(UEpath), [DeprecationAnalyzer(dump_dir)], SCAN_WORKERS, IO_WORKERS, READ_AHEAD,
+            None, load_stats, prefilter_stats, desc="Processing files", budget=budget, quarantine=quarantine,
+        ):
+            deprecated_functions, error = outcomes[DeprecationAnalyzer.name]
+            if error is not None:
+                print(f"Error processing file {file_path}. Please check the file manually.")
+                if failed_files is not None:
+                    failed_files.append(file_path)
+                continue
+            yield from deprecated_functions
+
+    print(load_stats.summary())
+    print(prefilter_stats.summary())
+    print(quarantine.summary())
+
+
+def deprecation_index_meta(UEpath: Path, choice: Choice, files: list[str]) -> dict[str, str]:
+    """
+    Returns the metadata a saved deprecation index must match to be reused for an engine tree, including a stamp of
+    the size and modification time of its headers, so an index is not reused once the tree was updated in place.
+    """
+    return {
+        "root": str(UEpath),
+        "choice": choice.value if choice else "All",
+        "scanner_version": str(INDEX_VERSION),
+        "files": files_stamp(files, str(UEpath)),
+    }
+
+
+def build_deprecation_index(
+    UEpath: Path, choice: Choice, index_path: str | None = INDEX_PATH, dump_dir: str | None = DUMP_DIR
+) -> DeprecationIndex:
+    """
+    Indexes the deprecated functions of every version, reusing the index saved at `index_path` for the same tree
+    with the same headers. An index with headers that failed or were quarantined is not saved, so they are scanned
+    again on the next run.
+
+    Args:
+        UEpath: The root directory of the engine tree
+        choice: Which part of the engine to scan
+        index_path: Where the index is saved and reloaded from, None to always rescan
+        dump_dir: Optional directory receiving a preprocessed copy of every header with a deprecation
+
+    Returns:
+        DeprecationIndex: The deprecated functions keyed by the version they were deprecated in
+    """
+    target_dirs = engine_target_dirs(UEpath, choice.value if choice else None)
+    with profiler.stage("discover"):
+        files = discover_files(target_dirs, ".h", workers=IO_WORKERS)
+    meta = deprecation_index_meta(UEpath, choice, files)
+    if index_path and os.path.isfile(index_path):
+        try:
+            with profiler.stage("load index"):
+                index, saved_meta = DeprecationIndex.load(index_path)
+            if saved_meta == meta:
+                print(f"Loaded {len(index)} deprecations from index {index_path}")
+                return index
+        except ValueError as e:
+            print(f"Ignoring deprecation index {index_path}: {e}")
+
+    failed_files: list[str] = []
+    index = DeprecationIndex(scan_deprecated_functions(UEpath, choice, dump_dir, files, failed_files))
+    if index_path:
+        save_deprecation_index(index, index_path, meta, failed_files)
+    return index
+
+
+def save_deprecation_index(
+    index: DeprecationIndex, index_path: str, meta: dict[str, str], failed_files: list[str]
+) -> None:
+    """Saves a deprecation index for reuse, unless some headers failed or were quarantined and it is incomplete."""
+    if failed_files:
+        print(f"Not saving deprecation index {index_path}: {len(failed_files)} headers could not be scanned")
+        return
+    with profiler.stage("save index"):
+        index.save(index_path, **meta)
+
+
+def parse_deprecated_functions(
+    UEpath: Path,
+    UEversion: str,
+    choice: Choice,
+    index_path: str | None = INDEX_PATH,
+    dump_dir: str | None = DUMP_DIR,
+) -> list[dict[str, Any]]:
+    return build_deprecation_index(UEpath, choice, index_path, dump_dir).deprecated_in(UEversion)
+
+
+def report_deprecated_functions(deprecated_funcs: Iterable[dict[str, Any]], output: str) -> None:
+    # Write the deprecated functions row by row; the format follows the extension of output
+    with open_report_writer(output, DEPRECATION_FIELDS, "Deprecations") as writer:
+        writer.write_rows(deprecated_funcs)
 
 
 if __name__ == "__main__":
-    deprecated_funcs = parse_deprecated_functions(UE_ROOT_DIR, UE_VERSION, DEPRECATION_CHOICE)
-    
-    report_deprecated_functions(deprecated_funcs, f"outputs/UE_DEPRECATED_{UE_VERSION}.csv")
\ No newline at end of file
+    profiler.reset(PROFILE, trace=PROFILE_TRACE_PATH is not None)
+
+    deprecation_index = build_deprecation_index(UE_ROOT_DIR, DEPRECATION_CHOICE)
+
+    with profiler.stage("write reports"):
+        for version in REPORT_VERSIONS:
+            report_deprecated_functions(
+                deprecation_index.deprecated_in(version), f"outputs/UE_DEPRECATED_{version}.{REPORT_FORMAT}"
+            )
+        if DEPRECATED_SINCE:
+            report_deprecated_functions(
+                deprecation_index.deprecated_since(DEPRECATED_SINCE),
+                f"outputs/UE_DEPRECATED_SINCE_{DEPRECATED_SINCE}.{REPORT_FORMAT}",
+            )
+
+    if profiler.enabled:
+        print(profiler.summary(PROFILE_TOP_FILES))
+    if profiler.trace:
+        profiler.export_chrome_trace(PROFILE_TRACE_PATH)
+        print(f"Trace saved to: {PROFILE_TRACE_PATH}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+from pathlib import Path
+from DiffTool import *
+import blueprint_diff as bd
+import deprecations as dp
+
+# Runs the Blueprint diff of blueprint_diff.py and the deprecation reports of deprecations.py together, configured
+# in those two scripts. The current engine tree is walked, read and preprocessed once for both analyses, and its
+# deprecation index is saved where deprecations.py reuses it.
+
+
+def scan_engine_tree(
+    UEpath: Path,
+    UEversion: str,
+    choice: bd.Choice,
+    workers: int | None = bd.PARSE_WORKERS,
+    cache_path: str | None = bd.PARSE_CACHE_PATH,
+    dump_dir: str | None = dp.DUMP_DIR,
+    files: list[str] | None = None,
+    deprecation_failures: list[str] | None = None,
+) -> tuple[dict[str, UClassRecord], DeprecationIndex]:
+    """
+    Parses the UE classes of an engine tree and indexes its deprecated functions in a single traversal.
+
+    Args:
+        UEpath: The root directory of the engine tree
+        UEversion: The engine version, e.g. "5.6"
+        choice: Which part of the engine to scan
+        workers: Number of analysis processes, None for all usable CPUs
+        cache_path: The parse cache of the UE classes, None to disable it
+        dump_dir: Optional directory receiving a preprocessed copy of every header with a deprecation
+        files: The headers to scan, discovered under `UEpath` if not given
+        deprecation_failures: Optional list the headers missing from the deprecation index are added to, those that
+            failed or were quarantined
+
+    Returns:
+        tuple[dict[str, UClassRecord], DeprecationIndex]: The classes as returned by `bd.parse_ue_classes`, and the
+            deprecated functions as indexed by `dp.build_deprecation_index`
+    """
+    u_classes: dict[str, UClassRecord] = {}
+    deprecation_index = DeprecationIndex()
+    run_counters.clear()
+
+    if files is None:
+        with profiler.stage("discover"):
+            files = discover_files(engine_target_dirs(UEpath, choice.value if choice else None), ".h", bd.IO_WORKERS)
+    all_files = files
+    if dump_dir:
+        dp.reset_dump_dir(dump_dir)
+
+    cache = ParseCache(cache_path, bd.PARSE_CACHE_VERSION) if cache_path else None
+    # Shared by both analyses, whose entries are kept apart by analyzer name
+    quarantine = Quarantine(bd.QUARANTINE_PATH) if bd.QUARANTINE_PATH else None
+    prefilter_stats = PrefilterStats()
+    load_stats = LoadStats()
+    failed_files = []
+    try:
+        with profiler.stage("scan headers (wall)"):
+            for file_path, outcomes in scan_files(
+                all_files, str(UEpath), [bd.UClassAnalyzer(UEversion), dp.DeprecationAnalyzer(dump_dir)],
+                workers, bd.IO_WORKERS, bd.READ_AHEAD, cache, load_stats, prefilter_stats,
+                budget=bd.FILE_BUDGET, quarantine=quarantine,
+            ):
+                header_classes, class_error = outcomes[bd.UClassAnalyzer.name]
+                deprecated_functions, deprecation_error = outcomes[dp.DeprecationAnalyzer.name]
+                u_classes.update(header_classes)
+                if deprecation_error is None:
+                    for deprecated_function in deprecated_functions:
+                        deprecation_index.add(deprecated_function)
+                elif deprecation_failures is not None:
+                    deprecation_failures.append(file_path)
+                if class_error is not None or deprecation_error is not None:
+                    failed_files.append(file_path)
+    finally:
+        if cache:
+            print(f"Parse cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+        if quarantine:
+            quarantine.save()
+            print(quarantine.summary())
+    print(load_stats.summary())
+    print(prefilter_stats.summary())
+    print(bd.CLASS_DECL_PARSER.summary())
+
+    for file_path in failed_files:
+        print(f"Error processing {file_path}. Please check the file manually.")
+    return u_classes, deprecation_index
+
+
+if __name__ == "__main__":
+    profiler.reset(bd.PROFILE or dp.PROFILE, trace=bd.PROFILE_TRACE_PATH is not None)
+
+    prev_u_classes = bd.load_ue_classes(bd.UE_PREV_ROOT_DIR, bd.UE_PREV_VERSION, bd.DIFF_CHOICE)
+    if os.path.isfile(bd.UE_CUR_ROOT_DIR):
+        raise SystemExit(f"{bd.UE_CUR_ROOT_DIR} is a snapshot; deprecations can only be scanned from an engine tree")
+    with profiler.stage("discover"):
+        cur_files = discover_files(
+            engine_target_dirs(bd.UE_CUR_ROOT_DIR, bd.DIFF_CHOICE.value if bd.DIFF_CHOICE else None), ".h",
+            bd.IO_WORKERS,
+        )
+    # Stamped before scanning, so headers edited during the scan invalidate the saved index
+    index_meta = dp.deprecation_index_meta(bd.UE_CUR_ROOT_DIR, bd.DIFF_CHOICE, cur_files)
+    deprecation_failures: list[str] = []
+    cur_u_classes, deprecation_index = scan_engine_tree(
+        bd.UE_CUR_ROOT_DIR, bd.UE_CUR_VERSION, bd.DIFF_CHOICE, files=cur_files,
+        deprecation_failures=deprecation_failures,
+    )
+    if bd.SNAPSHOT_DIR:
+        bd.save_ue_snapshot(cur_u_classes, bd.UE_CUR_ROOT_DIR, bd.UE_CUR_VERSION, bd.DIFF_CHOICE, bd.SNAPSHOT_DIR)
+    if dp.INDEX_PATH:
+        dp.save_deprecation_index(deprecation_index, dp.INDEX_PATH, index_meta, deprecation_failures)
+
+    with profiler.stage("diff"):
+        blueprint_api_diff = bd.diff(bd.blueprint_classes(prev_u_classes), bd.blueprint_classes(cur_u_classes))
+
+    with profiler.stage("write reports"):
+        bd.write_diff_report(
+            blueprint_api_diff,
+            f"outputs/blueprint_diff_{bd.UE_PREV_VERSION}_{bd.UE_CUR_VERSION}.{bd.REPORT_FORMAT}",
+        )
+        for version in dp.REPORT_VERSIONS:
+            dp.report_deprecated_functions(
+                deprecation_index.deprecated_in(version), f"outputs/UE_DEPRECATED_{version}.{dp.REPORT_FORMAT}"
+            )
+        if dp.DEPRECATED_SINCE:
+            dp.report_deprecated_functions(
+                deprecation_index.deprecated_since(dp.DEPRECATED_SINCE),
+                f"outputs/UE_DEPRECATED_SINCE_{dp.DEPRECATED_SINCE}.{dp.REPORT_FORMAT}",
+            )
+
+    if profiler.enabled:
+        print(profiler.summary(bd.PROFILE_TOP_FILES))
+    if profiler.trace:
+        profiler.export_chrome_trace(bd.PROFILE_TRACE_PATH)
+        print(f"Trace saved to: {bd.PROFILE_TRACE_PATH}")
@@ -0,0 +1,65 @@
+import blueprint_diff as bd
+from DiffTool import *
+
+CORE = "Engine\\Source\\Runtime\\Core\\Public\\"
+ENGINE = "Engine\\Source\\Runtime\\Engine\\Public\\"
+
+def ufunction(declaration, *specifiers):
+    return UFunctionRecord(declaration.split("(")[0].split()[-1], specifiers or ("BlueprintCallable",), declaration)
+
+def uclass(name, relpath, *declarations, specifiers=("BlueprintType", "Blueprintable")):
+    return UClassRecord(
+        name, relpath, specifiers, (BaseRef("public", "UObject"),), [ufunction(decl) for decl in declarations]
+    )
+
+def rows(prev, cur):
+    return [(row["class_name"], row["change_type"], row["signature"]) for row in bd.diff_rows(bd.diff(prev, cur))]
+
+WIDGET = ("void Show()", "void Hide()", "int32 Count(int32 Index) const", "void SetName(const FString& Name)")
+
+def test_renamed_class_with_renamed_and_retyped_functions():
+    """Test a renamed class is matched by its normalized signatures, and its functions diffed against the new class"""
+    prev = [uclass("UOldWidget", CORE + "Widget.h", *WIDGET)]
+    cur = [uclass(
+        "UNewWidget", CORE + "Widget.h",
+        "void Show()", "void Conceal()", "int32 Count(int64 Index) const", "void SetName(const FString& NewName)",
+    )]
+    assert rows(prev, cur) == [
+        ("UNewWidget", "Changed", "int32 Count(int32) const -> int32 Count(int64) const"),
+        ("UNewWidget", "Renamed", "void Hide() -> void Conceal()"),
+        ("UNewWidget", "Renamed", "UOldWidget -> UNewWidget"),
+    ]
+
+def test_unrelated_classes_are_not_renamed():
+    """Test a removed and an added class alike only by their bases and specifiers are not matched"""
+    prev = [uclass("UFaded", CORE + "Faded.h", "void Show()", "void Hide()")]
+    cur = [uclass("UUnrelated", CORE + "Unrelated.h", "void Show()", "float Speed() const")]
+    assert sorted(change_type for _, change_type, _ in rows(prev, cur)) == ["Added", "Added", "Removed", "Removed"]
+
+def test_moved_class_across_modules():
+    """Test a class whose header moved to another module is reported, and one renamed within its module is not"""
+    prev = [uclass("UMoved", CORE + "Moved.h", *WIDGET), uclass("URenamed", CORE + "Old.h", *WIDGET)]
+    cur = [uclass("UMoved", ENGINE + "Moved.h", *WIDGET), uclass("URenamed", CORE + "Private\\New.h", *WIDGET)]
+    assert rows(prev, cur) == [("UMoved", "Moved", f"{CORE}Moved.h -> {ENGINE}Moved.h")]
+
+def test_parameter_type_change():
+    """Test a function whose parameter type changed is reported as Changed, and a renamed parameter is not"""
+    prev = [uclass("UFoo", CORE + "Foo.h", "void Move(float Speed)", "void Stop(bool bNow)")]
+    cur = [uclass("UFoo", CORE + "Foo.h", "void Move(double Speed)", "void Stop(bool bImmediately)")]
+    assert rows(prev, cur) == [("UFoo", "Changed", "void Move(float) -> void Move(double)")]
+
+def test_overloads_added_and_removed():
+    """Test overloads added or removed next to an unchanged one are reported as Added or Removed"""
+    prev = [uclass("UFoo", CORE + "Foo.h", "void Set(int32 X)", "int32 Get(int32 X)", "bool Get(bool X)")]
+    cur = [uclass("UFoo", CORE + "Foo.h", "void Set(int32 X)", "void Set(float X)", "int32 Get(int32 X)")]
+    assert rows(prev, cur) == [("UFoo", "Added", "void Set(float)"), ("UFoo", "Removed", "bool Get(bool)")]
+
+def test_name_only_comparison(monkeypatch):
+    """Test only added and removed names are reported, not signatures or overloads, when signature diffing is off"""
+    monkeypatch.setattr(bd, "SIGNATURE_DIFF", False)
+    prev = [uclass("UFoo", CORE + "Foo.h", "void Move(float Speed)", "void Get(int32 X)", "void Stop()")]
+    cur = [uclass(
+        "UFoo", CORE + "Foo.h", "void Move(double Speed)", "void Get(int32 X)", "void Get(float X)", "void Jump()"
+    )]
+    assert rows(prev, cur) == [("UFoo", "Added", ""), ("UFoo", "Removed", "")]
+    assert [row["function"] for row in bd.diff_rows(bd.diff(prev, cur))] == ["Jump", "Stop"]
@@ -0,0 +1,57 @@
+import pytest
+from DiffTool import *
+
+SOURCE = '''
+class A { void F(int X = (1 + 2)) { Log("} ) {"); } char C = '{'; };
+class B { int Y; };
+'''
+
+def test_matches_every_bracket():
+    """Test every opening bracket maps to its matching close"""
+    index = BracketIndex(SOURCE)
+    for open_pos, close_pos in index.matches.items():
+        assert {'(': ')', '{': '}'}[SOURCE[open_pos]] == SOURCE[close_pos]
+    first_brace = SOURCE.index('{')
+    assert SOURCE[index.match(first_brace) + 1] == ';'
+
+def test_index_agrees_with_local_scan():
+    """Test the prebuilt index and the span-local scan find the same brackets"""
+    index = BracketIndex(SOURCE)
+    for pos, char in enumerate(SOURCE):
+        if char in '({' and pos in index.matches:
+            assert find_matching_bracket(SOURCE, pos) == index.match(pos)
+
+def test_brackets_in_strings_are_skipped():
+    """Test brackets inside string and character literals are ignored"""
+    s = 'f("(", \'(\', x)'
+    assert find_matching_bracket(s, 1) == len(s) - 1
+    assert BracketIndex(s).match(1) == len(s) - 1
+
+def test_unclosed_bracket():
+    """Test unclosed brackets have no match"""
+    s = "{ ( }"
+    assert BracketIndex(s).match(2) is None
+    assert find_matching_bracket(s, 2) is None
+    assert BracketIndex(s).match(0) == 4
+
+def test_span_variants_match_string_variants():
+    """Test span variants locate exactly what the string variants return"""
+    index = BracketIndex(SOURCE)
+    brace = SOURCE.index('{')
+    start, end = read_class_body_span(SOURCE, brace, index)
+    assert SOURCE[start:end] == read_class_body(SOURCE, brace)
+
+    paren = SOURCE.index('(')
+    start, end = read_arguments_span(SOURCE, paren, index)
+    assert SOURCE[start:end] == read_arguments(SOURCE, paren) == "int X = (1 + 2)"
+
+    start, end = extract_arguments_span("UCLASS( Blueprintable, meta=(A=B) )", "UCLASS")
+    assert (start, end) == (8, 33)
+    assert extract_arguments_span("USTRUCT()", "UCLASS") is None
+
+def test_span_errors():
+    """Test span variants raise the same errors as the string variants"""
+    with pytest.raises(ValueError, match="must point to"):
+        read_class_body_span("abc", 0)
+    with pytest.raises(ValueError, match="Unbalanced braces"):
+        read_class_body_span("{ {", 0, BracketIndex("{ {"))
@@ -0,0 +1,68 @@
+import pytest
+from DiffTool import *
+
+@pytest.mark.parametrize("declaration", [
+    "class MyClass : public Base1, protected Base2, private Base3 {};",
+    "class NS1::NS2::MyClass : private NS3::BaseClass {};",
+    "class StandaloneClass {};",
+    "class UFoo final : public UObject, public IFooInterface {};",
+    "class A : B {};",
+    "struct S : B {};",
+    "class A : public virtual B, virtual protected C {};",
+    "class ::A : public ::B {};",
+    "class\n  Spaced  :\n public   Base {};  ",
+])
+def test_fast_backend_matches_cxxheaderparser(declaration):
+    """Test the fast tier agrees with cxxheaderparser on the shapes it accepts"""
+    fast = FastClassDeclarationBackend().parse(declaration)
+    assert fast is not None
+    assert fast == CxxHeaderParserBackend().parse(declaration)
+
+@pytest.mark.parametrize("declaration", [
+    "class Container : public Base<std::vector<int>> {};",
+    "class alignas(8) Aligned {};",
+    "class A : public B... {};",
+    "union U {};",
+    "class A : public public B {};",
+    "class public {};",
+    "class A : public B",
+])
+def test_fast_backend_declines(declaration):
+    """Test the fast tier declines declarations it does not recognize"""
+    assert FastClassDeclarationBackend().parse(declaration) is None
+
+def test_tiered_parser_falls_back():
+    """Test declined declarations reach the next tier and hits are counted per tier"""
+    run_counters.clear()
+    parser = make_class_declaration_parser()
+    assert parser.parse("class A : public B<int> {};")['bases'][0]['name'] == 'B<int>'
+    assert parser.parse("class A : public B {};")['bases'][0]['name'] == 'B'
+    assert run_counters["class_decl.fast"] == 1
+    assert run_counters["class_decl.cxxheaderparser"] == 1
+    assert "fast 1 (50.0%)" in parser.summary()
+
+def test_cross_check_uses_reference_on_mismatch():
+    """Test sampled cross-checks catch and correct a wrong fast-tier result"""
+    class WrongBackend(ClassDeclarationBackend):
+        name = "wrong"
+        def parse(self, class_decl):
+            return {'name': 'Wrong', 'bases': []}
+
+    run_counters.clear()
+    parser = TieredClassDeclarationParser([WrongBackend(), CxxHeaderParserBackend()], cross_check_rate=1.0)
+    assert parser.parse("class Right {};")['name'] == 'Right'
+    assert run_counters["class_decl.mismatches"] == 1
+
+def test_cross_check_sampling_is_per_declaration():
+    """Test declarations are sampled by hash at about the rate, the same way by every parser with the same seed"""
+    declarations = [f"class UFoo{i} : public UObject {{}};" for i in range(2000)]
+    parser = TieredClassDeclarationParser([FastClassDeclarationBackend(), CxxHeaderParserBackend()], 0.1)
+    sampled = [parser._sampled(decl) for decl in declarations]
+    assert 150 < sum(sampled) < 250
+    assert [make_class_declaration_parser(0.1)._sampled(decl) for decl in declarations] == sampled
+    assert [make_class_declaration_parser(0.1, seed=1)._sampled(decl) for decl in declarations] != sampled
+
+def test_invalid_declaration_raises():
+    """Test declarations no tier can parse raise ValueError"""
+    with pytest.raises(ValueError):
+        parse_class_declaration("class A : {};")
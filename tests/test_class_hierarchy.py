@@ -0,0 +1,58 @@
+from DiffTool import *
+
+def make_class(name, params, *parents):
+    return UClassRecord(name, "", params, tuple(BaseRef("public", parent) for parent in parents))
+
+def make_classes(*classes):
+    return {cls.name: cls for cls in classes}
+
+U_CLASSES = make_classes(
+    make_class("UBase", ["Blueprintable", "Abstract"], "UObject"),
+    make_class("UChild", ["meta=(DisplayName=\"Child\")"], "UBase"),
+    make_class("UGrandChild", [], "UChild", "IInterface"),
+    make_class("USealed", ["NotBlueprintable"], "UBase"),
+    make_class("UUnderSealed", [], "USealed"),
+    make_class("UOther", ["BlueprintType"], "UObject"),
+)
+
+def test_blueprintable_inheritance():
+    """Test Blueprintable propagates to subclasses until a NotBlueprintable class"""
+    hierarchy = ClassHierarchy(U_CLASSES)
+    assert hierarchy.blueprintable_classes() == {"UBase", "UChild", "UGrandChild"}
+    assert not hierarchy.is_blueprintable("UUnderSealed")
+    assert not hierarchy.is_blueprintable("UObject")
+
+def test_specifiers_with_values():
+    """Test specifiers are matched by name, ignoring their values"""
+    hierarchy = ClassHierarchy(make_classes(make_class("UFoo", ["Blueprintable=true"])))
+    assert hierarchy.is_blueprintable("UFoo")
+    assert parse_specifiers(['meta=(DisplayName="Foo")', " Abstract "]) == {"meta", "Abstract"}
+
+def test_subclasses():
+    """Test subclasses include indirect ones, also of classes that were not parsed"""
+    hierarchy = ClassHierarchy(U_CLASSES)
+    assert hierarchy.subclasses("UChild") == ["UGrandChild"]
+    assert set(hierarchy.subclasses("UObject")) == set(U_CLASSES)
+    assert hierarchy.subclasses("UGrandChild") == []
+
+def test_inherited_specifiers():
+    """Test inherited specifiers combine a class with all its ancestors"""
+    hierarchy = ClassHierarchy(U_CLASSES)
+    assert hierarchy.inherited_specifiers("UGrandChild") == {"Blueprintable", "Abstract", "meta"}
+    assert hierarchy.inherited_specifiers("UObject") == frozenset()
+
+def test_deep_chain():
+    """Test inheritance chains deeper than the recursion limit"""
+    u_classes = make_classes(
+        make_class("U0", ["Blueprintable"]), *(make_class(f"U{i}", [], f"U{i - 1}") for i in range(1, 5000))
+    )
+    hierarchy = ClassHierarchy(u_classes)
+    assert len(hierarchy.blueprintable_classes()) == 5000
+    assert hierarchy.inherited_specifiers("U4999") == {"Blueprintable"}
+
+def test_cycle():
+    """Test an inheritance cycle terminates"""
+    hierarchy = ClassHierarchy(make_classes(make_class("UA", ["Abstract"], "UB"), make_class("UB", [], "UA")))
+    assert hierarchy.blueprintable_classes() == frozenset()
+    assert hierarchy.inherited_specifiers("UB") == {"Abstract"}
+    assert hierarchy.subclasses("UA") == ["UB"]
@@ -0,0 +1,98 @@
+import os
+import pytest
+from DiffTool import *
+
+CODE = """
+class UFoo : public UObject
+{
+    UE_DEPRECATED(5.5, "Use Bar instead")
+    void Foo(int A);
+
+    UE_DEPRECATED_FORGAME(5.6, "Game code only")
+    virtual bool IsFoo() const;
+
+    UE_DEPRECATED_FORENGINE(5.10, "Engine code only")
+    static void Baz();
+};
+"""
+
+def record(name, version):
+    return {"relpath": "Foo.h", "name": name, "version": version}
+
+def test_find_all_versions_and_variants():
+    """Test every deprecation macro variant is found in one pass, whatever its version"""
+    deprecations = find_deprecations(CODE)
+    assert [(d["macro"], d["version"], d["name"]) for d in deprecations] == [
+        ("UE_DEPRECATED", "5.5", "Foo"),
+        ("UE_DEPRECATED_FORGAME", "5.6", "IsFoo"),
+        ("UE_DEPRECATED_FORENGINE", "5.10", "Baz"),
+    ]
+    assert deprecations[0]["reason"] == "Use Bar instead"
+    assert deprecations[1]["declaration"] == "virtual bool IsFoo() const;"
+
+def test_find_selected_macros():
+    """Test the scan can be restricted to some macros"""
+    assert [d["name"] for d in find_deprecations(CODE, ("UE_DEPRECATED",))] == ["Foo"]
+
+def test_malformed_declaration():
+    """Test a macro not followed by a declaration is reported"""
+    with pytest.raises(ValueError):
+        find_deprecations('UE_DEPRECATED(5.5, "x")\n(\n')
+
+def test_version_queries():
+    """Test per-version and deprecated-since queries, ordering versions numerically"""
+    index = DeprecationIndex([record("A", "5.10"), record("B", "5.9"), record("C", "5.5"), record("D", "5.9")])
+    assert index.versions() == ["5.5", "5.9", "5.10"]
+    assert [r["name"] for r in index.deprecated_in("5.9")] == ["B", "D"]
+    assert index.deprecated_in("4.27") == []
+    assert [r["name"] for r in index.deprecated_since("5.9")] == ["C", "B", "D"]
+    assert len(index) == 4
+
+def test_save_and_load(tmp_path):
+    """Test a saved index loads back with the same records and metadata"""
+    index = DeprecationIndex({**record(name, "5.6"), "macro": "UE_DEPRECATED"} for name in "ABC")
+    path = str(tmp_path / "deprecations.sqlite")
+    index.save(path, choice="Plugins")
+    loaded, meta = DeprecationIndex.load(path)
+    assert meta == {"choice": "Plugins"}
+    assert [(r["name"], r["macro"], r["scope"]) for r in loaded.deprecated_in("5.6")] == [
+        ("A", "UE_DEPRECATED", None), ("B", "UE_DEPRECATED", None), ("C", "UE_DEPRECATED", None)
+    ]
+
+def test_load_rejects_other_files(tmp_path):
+    """Test files that are not deprecation indexes are rejected"""
+    path = tmp_path / "Foo.h"
+    path.write_text(CODE)
+    with pytest.raises(ValueError):
+        DeprecationIndex.load(str(path))
+    with pytest.raises(ValueError):
+        DeprecationIndex.load(str(tmp_path / "missing.sqlite"))
+
+@pytest.fixture
+def engine_tree(tmp_path, monkeypatch):
+    import deprecations as dp
+    monkeypatch.setattr(dp, "QUARANTINE_PATH", str(tmp_path / "quarantine.json"))
+    public = tmp_path / "UE" / "Engine\\Plugins" / "Plug\\Source\\Mod\\Public"
+    public.mkdir(parents=True)
+    (public / "Foo.h").write_text('class UFoo {\nUE_DEPRECATED(5.5, "Old")\nvoid Foo();\n};\n')
+    return dp, tmp_path / "UE", public
+
+def test_index_is_reused_until_headers_change(engine_tree, tmp_path):
+    """Test a saved index is reused for an unchanged tree, and rescanned once a header was edited in place"""
+    dp, root, public = engine_tree
+    index_path = str(tmp_path / "deprecations.sqlite")
+    assert [r["name"] for r in dp.build_deprecation_index(root, None, index_path, None).deprecated_in("5.5")] == ["Foo"]
+    saved_at = os.stat(index_path).st_mtime_ns
+    assert len(dp.build_deprecation_index(root, None, index_path, None)) == 1
+    assert os.stat(index_path).st_mtime_ns == saved_at
+
+    (public / "Foo.h").write_text('class UFoo {\nUE_DEPRECATED(5.6, "Older")\nvoid Bar();\n};\n')
+    assert [r["name"] for r in dp.build_deprecation_index(root, None, index_path, None).deprecated_in("5.6")] == ["Bar"]
+
+def test_incomplete_index_is_not_saved(engine_tree, tmp_path):
+    """Test an index missing headers that could not be scanned is not saved for reuse"""
+    dp, root, public = engine_tree
+    os.symlink(public / "Missing.h", public / "Broken.h")
+    index_path = str(tmp_path / "deprecations.sqlite")
+    assert len(dp.build_deprecation_index(root, None, index_path, None)) == 1
+    assert not os.path.exists(index_path)
@@ -0,0 +1,32 @@
+import os
+import pytest
+from DiffTool import *
+
+@pytest.fixture
+def tree(tmp_path):
+    for path in ["A/X.h", "A/Y.cpp", "A/B/Z.h", "A/B/C/W.h", "A/D/V.h", "E/U.h", "Top.h"]:
+        full = tmp_path / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_text("// header")
+    return tmp_path
+
+def walk_headers(roots):
+    files = []
+    for root in roots:
+        for dirpath, _, names in os.walk(root):
+            files.extend(os.path.join(dirpath, name) for name in names if name.endswith(".h"))
+    return files
+
+def test_matches_os_walk_order(tree):
+    """Test concurrent discovery returns the same files in the same order as os.walk"""
+    roots = [str(tree / "A"), str(tree / "E")]
+    assert discover_files(roots, ".h", workers=4) == walk_headers(roots)
+    assert discover_files([str(tree)], ".h", workers=1) == walk_headers([str(tree)])
+
+def test_missing_roots_are_ignored(tree):
+    """Test missing target directories yield no files"""
+    assert discover_files([str(tree / "Missing")], ".h") == []
+
+def test_suffix_filter(tree):
+    """Test only files with the given suffix are listed"""
+    assert discover_files([str(tree / "A")], ".cpp") == [str(tree / "A" / "Y.cpp")]
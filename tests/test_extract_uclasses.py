@@ -0,0 +1,57 @@
+import time
+from DiffTool import *
+
+HEADER = '''
+UCLASS(BlueprintType, meta=(DisplayName="Foo) class UFake"))
+class ENGINE_API UFoo : public UObject
+{
+    GENERATED_BODY()
+    UCLASS() is not a declaration
+};
+
+  UCLASS()
+class UE_DEPRECATED(5.4, "Use {UFoo}; instead") UBar : public UFoo, public IBaz {};
+
+UCLASS(Within=Engine) class UForward;
+'''
+
+def test_extracts_all_uclasses():
+    """Test every UCLASS is found in order with its macro arguments and declaration"""
+    records = extract_uclasses(HEADER)
+    assert [r['decl'] for r in records] == [
+        'ENGINE_API UFoo : public UObject',
+        'UE_DEPRECATED(5.4, "Use {UFoo}; instead") UBar : public UFoo, public IBaz',
+        'UForward',
+    ]
+    assert [r['args'] for r in records] == [
+        'BlueprintType, meta=(DisplayName="Foo) class UFake")', '', 'Within=Engine'
+    ]
+
+def test_spans():
+    """Test spans run from the macro to the `;` or `{` ending the declaration"""
+    records = extract_uclasses(HEADER)
+    start, end = records[0]['span']
+    assert HEADER[start:].startswith('UCLASS(BlueprintType') and HEADER[end - 1] == '{'
+    start, end = records[1]['decl_span']
+    assert HEADER[start:end] == records[1]['decl']
+    assert HEADER[records[2]['span'][1] - 1] == ';'
+
+def test_skips_malformed_macros():
+    """Test macros left unclosed or not followed by a class are skipped without swallowing the next class"""
+    code = "UCLASS(meta=(A)\nUCLASS() struct FNot;\nUCLASS() class UOnly : public UObject {};\nUCLASS() class UOpen"
+    assert [r['decl'] for r in extract_uclasses(code)] == ['UOnly : public UObject']
+
+def test_region_and_bracket_index():
+    """Test scanning a region with a prebuilt bracket index"""
+    code = "UCLASS() class UOutside {};\n" + HEADER
+    index = BracketIndex(code)
+    records = extract_uclasses(code, code.index('\n'), None, index)
+    assert [r['decl'] for r in records] == [r['decl'] for r in extract_uclasses(HEADER)]
+
+def test_pathological_header():
+    """Test a header of malformed macros that sent the lazy class regex across the whole file is scanned quickly"""
+    code = 'UCLASS(meta=(DisplayName="X"))\n' * 10000 + "UCLASS() class\n" * 10000 + "UCLASS(\n" * 10000
+    start = time.perf_counter()
+    records = extract_uclasses(HEADER + code)
+    assert [r['decl'] for r in records] == [r['decl'] for r in extract_uclasses(HEADER)]
+    assert time.perf_counter() - start < 1.0
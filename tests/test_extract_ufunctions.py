@@ -0,0 +1,74 @@
+import pytest
+from DiffTool import *
+
+BODY = '''
+    GENERATED_BODY()
+public:
+    UFUNCTION(BlueprintCallable, meta=(DisplayName="Do (it)"))
+    void DoIt(const FVector& V = FVector{0, 0, 0}) const;
+
+    UE_DEPRECATED(5.4, "Use DoIt instead")
+    UFUNCTION(BlueprintPure)
+    int32 OldGetter() const { return 0; }
+
+    UE_DEPRECATED(5.3, "Unrelated") void PlainFunction();
+    UFUNCTION()
+    static TArray<FString> GetNames();
+
+    UFUNCTION(BlueprintCallable)
+    UE_DEPRECATED(5.5, "Trailing deprecation")
+    virtual bool Trailing(int32 X);
+'''
+
+def test_extracts_all_ufunctions():
+    """Test every UFUNCTION is found in order with its name and macro arguments"""
+    records = extract_ufunctions(BODY)
+    assert [r['name'] for r in records] == ['DoIt', 'OldGetter', 'GetNames', 'Trailing']
+    assert records[0]['args'] == 'BlueprintCallable, meta=(DisplayName="Do (it)")'
+    assert records[2]['args'] == ''
+
+def test_deprecation_attachment():
+    """Test only deprecations directly attached to a UFUNCTION are recorded"""
+    versions = [r['deprecated_version'] for r in extract_ufunctions(BODY)]
+    assert versions == [None, '5.4', None, '5.5']
+
+def test_declaration_spans():
+    """Test declaration spans run to the `;` or `{` after the parameter list"""
+    records = extract_ufunctions(BODY)
+    start, end = records[0]['decl_span']
+    assert BODY[start:end] == 'void DoIt(const FVector& V = FVector{0, 0, 0}) const'
+    start, end = records[1]['decl_span']
+    assert BODY[start:end] == 'int32 OldGetter() const '
+    assert BODY[records[1]['span'][0]:].startswith('UFUNCTION(BlueprintPure)')
+
+def test_declarations():
+    """Test declarations are recorded without macros or body"""
+    declarations = [r['declaration'] for r in extract_ufunctions(BODY)]
+    assert declarations == [
+        'void DoIt(const FVector& V = FVector{0, 0, 0}) const',
+        'int32 OldGetter() const',
+        'static TArray<FString> GetNames()',
+        'virtual bool Trailing(int32 X)',
+    ]
+
+def test_region_and_bracket_index():
+    """Test scanning a region with a prebuilt bracket index"""
+    code = "UFUNCTION() void Outside();\nclass A {" + BODY + "};"
+    index = BracketIndex(code)
+    start, end = read_class_body_span(code, code.index('{'), index)
+    records = extract_ufunctions(code, start, end, index)
+    assert [r['name'] for r in records] == ['DoIt', 'OldGetter', 'GetNames', 'Trailing']
+    assert extract_ufunctions(code, start, end) == records
+
+def test_no_ufunctions():
+    """Test bodies without UFUNCTIONs yield no records"""
+    assert extract_ufunctions("int32 X; void F();") == []
+
+@pytest.mark.parametrize("code", [
+    "UFUNCTION(BlueprintCallable void F();",
+    "UFUNCTION() int32 Value;",
+])
+def test_malformed_declarations(code):
+    """Test malformed macros and declarations raise ValueError"""
+    with pytest.raises(ValueError):
+        extract_ufunctions(code)
@@ -0,0 +1,104 @@
+import os
+import time
+import pytest
+from DiffTool import *
+
+BUDGET = FileBudget(seconds=0.5, poll_interval=0.05)
+
+def _process(item):
+    if item == "hang":
+        time.sleep(60)
+    if item == "grow":
+        hog = b"x" * (256 << 20)
+        time.sleep(60)
+    return item.upper()
+
+def _exceeded(item, reason):
+    return f"{item}: {reason}"
+
+class HangAnalyzer(Analyzer):
+    name = "hang"
+    cache_variant = "1"
+
+    def analyze(self, source, result):
+        if "HANG" in source.text:
+            time.sleep(60)
+        result.append(source.relpath)
+
+def test_budget_kills_slow_files():
+    """Test a file over the time budget is killed and reported while the others complete in order"""
+    items = ["a", "hang", "b", "c", "d"]
+    start = time.perf_counter()
+    results = list(map_files(_process, items, workers=2, budget=BUDGET, on_exceeded=_exceeded))
+    assert time.perf_counter() - start < 30
+    assert results == ["A", "hang: Exceeded the time budget of 0.5 s", "B", "C", "D"]
+
+def test_budget_applies_in_a_single_worker():
+    """Test a budget is enforced in a worker process even when running serially"""
+    results = list(map_files(_process, ["hang", "a"], workers=1, budget=BUDGET, on_exceeded=_exceeded))
+    assert results == ["hang: Exceeded the time budget of 0.5 s", "A"]
+
+def test_exceeded_without_handler_raises():
+    """Test a file over budget raises when no handler is given"""
+    with pytest.raises(FileBudgetExceeded) as e:
+        list(map_files(_process, ["a", "hang"], workers=2, budget=BUDGET))
+    assert e.value.file == "hang"
+
+@pytest.mark.skipif(process_memory(os.getpid()) is None, reason="process memory cannot be measured here")
+def test_memory_budget():
+    """Test a worker growing over the memory budget is killed"""
+    budget = FileBudget(seconds=30, memory_mb=process_memory(os.getpid()) / (1 << 20) + 128, poll_interval=0.05)
+    results = list(map_files(_process, ["a", "grow"], workers=2, budget=budget, on_exceeded=_exceeded))
+    assert results[0] == "A" and results[1].startswith("grow: Exceeded the memory budget")
+
+def test_quarantine_persists(tmp_path):
+    """Test quarantined files are saved with their reason and released once their contents change"""
+    header = tmp_path / "Header.h"
+    header.write_bytes(b"struct FHuge;")
+    path = str(tmp_path / "quarantine.json")
+    with Quarantine(path) as quarantine:
+        quarantine.add(str(header), "Exceeded the time budget of 1 s", header.read_bytes())
+        quarantine.add("Engine/Source/Git.h", "Exceeded the memory budget of 1 MB")
+    quarantine = Quarantine(path)
+    assert quarantine.reason(str(header)) == "Exceeded the time budget of 1 s"
+    assert quarantine.reason("Engine/Source/Git.h") == "Exceeded the memory budget of 1 MB"
+    header.write_bytes(b"struct FSmall;")
+    assert quarantine.reason(str(header)) is None and str(header) not in quarantine.entries
+    assert quarantine.skipped == 2
+
+def test_quarantine_is_per_analyzer(tmp_path):
+    """Test a file quarantined for some analyzers is only skipped by scans needing no other analyzer"""
+    quarantine = Quarantine(str(tmp_path / "quarantine.json"))
+    quarantine.add("Engine/Source/Both.h", "Exceeded", analyzers=("uclasses", "deprecations"))
+    quarantine.add("Engine/Source/Classes.h", "Exceeded", analyzers=("uclasses",))
+    quarantine.save()
+    quarantine = Quarantine(str(tmp_path / "quarantine.json"))
+    assert quarantine.reason("Engine/Source/Both.h", ("deprecations",)) == "Exceeded"
+    assert quarantine.reason("Engine/Source/Classes.h", ("uclasses",)) == "Exceeded"
+    assert quarantine.reason("Engine/Source/Classes.h", ("deprecations",)) is None
+    assert quarantine.reason("Engine/Source/Classes.h", ("uclasses", "deprecations")) is None
+    assert list(quarantine.entries) == ["Engine/Source/Both.h", "Engine/Source/Classes.h"]
+
+def test_scan_quarantines_files_over_budget(tmp_path):
+    """Test a header over budget is quarantined and not cached, and skipped without being read on the next scan"""
+    files = []
+    for i, content in enumerate([b"UCLASS() class UFoo {};", b"HANG", b"UCLASS() class UBar {};"]):
+        path = tmp_path / f"Header{i}.h"
+        path.write_bytes(content)
+        files.append(str(path))
+    root = str(tmp_path)
+    cache_path = str(tmp_path / "cache.sqlite")
+    quarantine = Quarantine(str(tmp_path / "quarantine.json"))
+    with ParseCache(cache_path, "1") as cache:
+        outcomes = dict(scan_files(files, root, [HangAnalyzer()], workers=2, cache=cache, budget=BUDGET,
+                                   quarantine=quarantine))
+    assert outcomes[files[0]]["hang"] == (["Header0.h"], None)
+    assert outcomes[files[1]]["hang"] == ([], "Exceeded the time budget of 0.5 s")
+    assert list(quarantine.entries) == [files[1]]
+
+    stats = LoadStats()
+    with ParseCache(cache_path, "1") as cache:
+        outcomes = dict(scan_files(files, root, [HangAnalyzer()], workers=1, cache=cache, load_stats=stats,
+                                   quarantine=quarantine))
+        assert (cache.hits, stats.files_loaded) == (2, 0)
+    assert outcomes[files[1]]["hang"] == ([], "Quarantined: Exceeded the time budget of 0.5 s")
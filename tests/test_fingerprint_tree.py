@@ -0,0 +1,61 @@
+from DiffTool import *
+
+PREV = {
+    "Engine/Source/Runtime/Core/Public/Math.h": "1",
+    "Engine/Source/Runtime/Core/Public/String.h": "2",
+    "Engine/Source/Runtime/Engine/Classes/Actor.h": "3",
+    "Engine/Plugins/FX/Niagara/Source/Niagara/Public/System.h": "4",
+    "Engine/Plugins/FX/Niagara/Source/NiagaraCore/Public/Core.h": "5",
+    "Engine/Plugins/Media/Source/Media/Public/Player.h": "6",
+}
+
+def test_module_and_plugin_of_header():
+    """Test engine and plugin headers map to their module and plugin directories"""
+    assert engine_module_parts(path_parts("Engine\\Source\\Runtime/Core/Public/Math.h")) == (
+        ("Engine", "Source", "Runtime", "Core"), None
+    )
+    assert engine_module_parts(path_parts("Engine/Plugins/FX/Niagara/Source/Niagara/Public/System.h")) == (
+        ("Engine", "Plugins", "FX", "Niagara", "Source", "Niagara"), ("Engine", "Plugins", "FX", "Niagara")
+    )
+    assert engine_module_parts(path_parts("Engine/Plugins/Loose.h")) == (None, None)
+
+def test_directory_digests_follow_contents():
+    """Test directories hash equal exactly when they hold the same files with the same contents"""
+    same = FingerprintTree(dict(reversed(PREV.items())))
+    changed = FingerprintTree({**PREV, "Engine/Source/Runtime/Core/Public/Math.h": "9"})
+    renamed = FingerprintTree({
+        path.replace("String.h", "Text.h"): digest for path, digest in PREV.items()
+    })
+    tree = FingerprintTree(PREV)
+    assert same.directories == tree.directories
+    core = ("Engine", "Source", "Runtime", "Core")
+    assert changed.directories[core] != tree.directories[core]
+    assert changed.directories[("Engine", "Source", "Runtime", "Engine")] == tree.directories[
+        ("Engine", "Source", "Runtime", "Engine")
+    ]
+    assert changed.directories[()] != tree.directories[()] and renamed.directories[core] != tree.directories[core]
+
+def test_compare_prunes_unchanged_subtrees():
+    """Test unchanged files are found and unchanged modules and plugins counted"""
+    cur = FingerprintTree({
+        **{path: digest for path, digest in PREV.items() if "Media" not in path},
+        "Engine/Source/Runtime/Core/Public/Math.h": "9",
+        "Engine/Plugins/Media/Source/Media/Public/Player.h": "6",
+        "Engine/Plugins/Media/Source/Media/Public/Added.h": "7",
+    })
+    comparison = cur.compare(FingerprintTree(PREV))
+    assert comparison.unchanged == {
+        "Engine/Source/Runtime/Core/Public/String.h",
+        "Engine/Source/Runtime/Engine/Classes/Actor.h",
+        "Engine/Plugins/FX/Niagara/Source/Niagara/Public/System.h",
+        "Engine/Plugins/FX/Niagara/Source/NiagaraCore/Public/Core.h",
+        "Engine/Plugins/Media/Source/Media/Public/Player.h",
+    }
+    assert (comparison.modules, comparison.modules_unchanged) == (5, 3)
+    assert (comparison.plugins, comparison.plugins_unchanged) == (2, 1)
+    assert "5/7 headers, 3/5 modules and 1/2 plugins unchanged" in comparison.summary()
+
+def test_compare_skips_unchanged_directories():
+    """Test an unchanged tree is matched at its root without descending into it"""
+    comparison = FingerprintTree(PREV).compare(FingerprintTree(dict(PREV)))
+    assert comparison.unchanged == set(PREV) and comparison.directories_compared == 1
@@ -0,0 +1,106 @@
+import shutil
+import subprocess
+import pytest
+from DiffTool import *
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+FOO_V1 = b'UCLASS()\nclass UFoo : public UObject\n{\n};\n'
+FOO_V2 = b'UCLASS(BlueprintType)\nclass UFoo : public UObject\n{\n};\n'
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True, capture_output=True,
+    )
+
+def _write(repo, relpath, data):
+    path = repo / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+@pytest.fixture
+def engine_repo(tmp_path):
+    """A repository with two tagged commits: v1, then v2 modifying, adding and deleting headers"""
+    repo = tmp_path / "UE"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _write(repo, "Engine/Source/Runtime/Core/Public/Foo.h", FOO_V1)
+    _write(repo, "Engine/Source/Runtime/Core/Public/Old.h", b"struct FOld;\n")
+    _write(repo, "Engine/Source/Runtime/Core/Public/Same.h", b"UE_DEPRECATED(5.5, \"Gone\")\nvoid Same();\n")
+    _write(repo, "Engine/Source/Runtime/Core/Private/Foo.cpp", b"#include \"Foo.h\"\n")
+    _write(repo, "Engine/Source/Programs/Tool/Tool.h", b"struct FTool;\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "v1")
+    _git(repo, "tag", "v1")
+    _write(repo, "Engine/Source/Runtime/Core/Public/Foo.h", FOO_V2)
+    _write(repo, "Engine/Plugins/Bar/Source/Bar/Public/Bar.h", b"UCLASS()\nclass UBar : public UObject\n{\n};\n")
+    (repo / "Engine/Source/Runtime/Core/Public/Old.h").unlink()
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "v2")
+    _git(repo, "tag", "v2")
+    return str(repo)
+
+def test_list_files(engine_repo):
+    """Test headers are listed at a ref, limited to the engine's header directories"""
+    assert git_list_files(engine_repo, "v1", engine_pathspecs()) == [
+        "Engine/Source/Runtime/Core/Public/Foo.h",
+        "Engine/Source/Runtime/Core/Public/Old.h",
+        "Engine/Source/Runtime/Core/Public/Same.h",
+    ]
+    assert git_list_files(engine_repo, "v2", engine_pathspecs("Plugins")) == ["Engine/Plugins/Bar/Source/Bar/Public/Bar.h"]
+
+def test_changed_files(engine_repo):
+    """Test changed headers are reported with their status, and unchanged ones are not"""
+    assert git_changed_files(engine_repo, "v1", "v2", engine_pathspecs()) == {
+        "Engine/Plugins/Bar/Source/Bar/Public/Bar.h": "A",
+        "Engine/Source/Runtime/Core/Public/Foo.h": "M",
+        "Engine/Source/Runtime/Core/Public/Old.h": "D",
+    }
+    assert git_changed_files(engine_repo, "v2", "v2") == {}
+
+def test_grep_files(engine_repo):
+    """Test searching a ref returns repository-relative paths, and no match an empty set"""
+    assert git_grep_files(engine_repo, "v2", "UE_DEPRECATED", engine_pathspecs()) == {
+        "Engine/Source/Runtime/Core/Public/Same.h"
+    }
+    assert git_grep_files(engine_repo, "v2", "NOT_IN_ANY_FILE") == set()
+
+def test_rev_parse(engine_repo):
+    """Test refs resolve to commit hashes, and unknown refs raise"""
+    assert len(git_rev_parse(engine_repo, "v1")) == 40
+    assert git_rev_parse(engine_repo, "v1") != git_rev_parse(engine_repo, "v2")
+    with pytest.raises(RuntimeError):
+        git_rev_parse(engine_repo, "no-such-tag")
+
+def test_blob_reader(engine_repo):
+    """Test file contents are read at any ref without a checkout, and missing files read as None"""
+    with GitBlobReader(engine_repo) as reader:
+        assert reader.read("v1", "Engine/Source/Runtime/Core/Public/Foo.h") == FOO_V1
+        assert reader.read("v2", "Engine/Source/Runtime/Core/Public/Foo.h") == FOO_V2
+        assert reader.read("v2", "Engine/Source/Runtime/Core/Public/Old.h") is None
+        assert reader.read("v1", "Engine/Source/Runtime/Core/Public") is None
+
+def test_load_git_files(engine_repo):
+    """Test loading from git prefilters by keyword and reports missing files as errors"""
+    paths = ["Engine/Source/Runtime/Core/Public/Foo.h", "Engine/Source/Runtime/Core/Public/Old.h",
+             "Engine/Source/Runtime/Core/Public/Same.h"]
+    stats, prefilter_stats = LoadStats(), PrefilterStats()
+    loaded = list(load_git_files(engine_repo, "v2", paths, (b"UCLASS",), stats, prefilter_stats))
+    assert loaded == [
+        (paths[0], FOO_V2, None),
+        (paths[1], None, f"{paths[1]} does not exist at v2"),
+        (paths[2], None, None),
+    ]
+    assert (stats.files_loaded, prefilter_stats.files_skipped) == (1, 1)
+
+def test_incremental_parse_through_pool(engine_repo, tmp_path):
+    """Test both refs are parsed end to end through the budgeted worker pool, the current one incrementally"""
+    import blueprint_diff as bd
+    prev, cur = bd.load_ue_classes_incremental(
+        engine_repo, "v1", "v2", "5.5", "5.6", None, snapshot_dir=str(tmp_path / "snapshots")
+    )
+    assert list(prev) == ["UFoo"] and prev["UFoo"].uclass_params == ()
+    assert sorted(cur) == ["UBar", "UFoo"] and cur["UFoo"].uclass_params == ("BlueprintType",)
+    assert cur["UBar"].relpath == "Engine\\Plugins\\Bar\\Source\\Bar\\Public\\Bar.h"
+    assert bd.parse_ue_classes_at_ref(engine_repo, "v1", "5.5", ["Engine/Source/Runtime/Core/Public/Foo.h"], 1) == prev
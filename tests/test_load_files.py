@@ -0,0 +1,43 @@
+import pytest
+from DiffTool import *
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"H{i}.h"
+        path.write_bytes(b"UCLASS()\r\nclass A {};" if i % 2 == 0 else b"struct B {};")
+        paths.append(str(path))
+    return paths
+
+def test_loads_in_order(files):
+    """Test files are yielded in input order with their bytes"""
+    loaded = list(load_files(files, workers=4, read_ahead=3))
+    assert [path for path, _, _ in loaded] == files
+    assert all(data is not None and error is None for _, data, error in loaded)
+
+def test_prefilter_skips_files(files):
+    """Test files without keywords are yielded without content and counted as skipped"""
+    prefilter_stats = PrefilterStats()
+    stats = LoadStats()
+    loaded = list(load_files(files, (b"UCLASS",), stats=stats, prefilter_stats=prefilter_stats))
+    assert [data is not None for _, data, _ in loaded] == [i % 2 == 0 for i in range(20)]
+    assert prefilter_stats.files_skipped == 10
+    assert stats.files_loaded == 10
+    assert stats.elapsed >= stats.io_wait >= 0
+
+def test_read_errors_are_reported(tmp_path):
+    """Test unreadable files are yielded with their error"""
+    (path, data, error), = load_files([str(tmp_path / "Missing.h")])
+    assert data is None and error
+
+def test_early_stop(files):
+    """Test consumers may stop before all files are read"""
+    loader = load_files(files, read_ahead=2)
+    assert next(loader)[0] == files[0]
+    loader.close()
+
+def test_decode_source_translates_newlines():
+    """Test decoding translates line endings like text-mode reads"""
+    assert decode_source(b"a\r\nb\rc\n") == "a\nb\nc\n"
+    assert decode_source(b"\xffok", errors="ignore") == "ok"
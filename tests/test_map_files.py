@@ -0,0 +1,56 @@
+import pytest
+from DiffTool import *
+
+def _describe(path, prefix):
+    return f"{prefix}:{path}"
+
+def _fail_on_odd(path):
+    if int(path) % 2:
+        raise ValueError(path)
+    return path
+
+def test_serial_preserves_order():
+    """Test in-process mapping yields results in input order"""
+    files = [str(i) for i in range(10)]
+    assert list(map_files(_describe, files, "x", workers=1)) == [f"x:{i}" for i in range(10)]
+
+def test_parallel_matches_serial():
+    """Test the process pool yields the same ordered results as the serial path"""
+    files = [str(i) for i in range(200)]
+    serial = list(map_files(_describe, files, "p", workers=1))
+    parallel = list(map_files(_describe, files, "p", workers=3))
+    assert parallel == serial
+
+def test_empty_file_list():
+    """Test mapping over no files yields nothing"""
+    assert list(map_files(_describe, [], "x", workers=4)) == []
+
+def test_worker_exceptions_propagate():
+    """Test exceptions raised by the mapped function reach the caller"""
+    with pytest.raises(ValueError):
+        list(map_files(_fail_on_odd, ["0", "1", "2"], workers=2))
+
+def test_usable_cpu_count_positive():
+    """Test the usable CPU count is at least one"""
+    assert usable_cpu_count() >= 1
+
+def test_lazy_input_with_total():
+    """Test generator input is consumed lazily when the total is given"""
+    files = (str(i) for i in range(50))
+    assert list(map_files(_describe, files, "g", workers=2, total=50)) == [f"g:{i}" for i in range(50)]
+
+@pytest.mark.parametrize("budget", [None, FileBudget(seconds=30)])
+def test_files_in_flight_are_bounded(budget):
+    """Test no more than `max_in_flight` files are taken from the input ahead of the results yielded"""
+    taken = 0
+    def files():
+        nonlocal taken
+        for i in range(300):
+            taken += 1
+            yield str(i)
+    ahead = []
+    results = map_files(_describe, files(), "b", workers=2, total=300, budget=budget, max_in_flight=5)
+    for i, result in enumerate(results):
+        assert result == f"b:{i}"
+        ahead.append(taken - i)
+    assert max(ahead) <= 5
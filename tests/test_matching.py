@@ -0,0 +1,64 @@
+import random
+from DiffTool import *
+
+def features(*names):
+    return frozenset(names)
+
+def test_pair_by_key():
+    """Test items pair by key only when the key is unique on both sides"""
+    removed = {"Old": ("void()", "A"), "Twin1": ("int32()",), "Twin2": ("int32()",), "Gone": ("float()",)}
+    added = {"New": ("void()", "A"), "Other": ("int32()",)}
+    assert pair_by_key(removed, added) == [("Old", "New")]
+    assert pair_by_key({"A": 1}, {"B": 1, "C": 1}) == []
+
+def test_identical_sets_pair_exactly():
+    """Test items with the same features pair with similarity 1"""
+    removed = {"UOld": features("void A()", "void B()")}
+    added = {"UNew": features("void B()", "void A()"), "UOther": features("void C()")}
+    assert match_similar(removed, added) == [("UOld", "UNew", 1.0)]
+
+def test_similar_sets_pair_one_to_one():
+    """Test each item pairs at most once, with its most similar counterpart above the threshold"""
+    removed = {
+        "UOld": features("A", "B", "C", "D"),
+        "UAlike": features("A", "B", "C", "E"),
+        "UUnrelated": features("X", "Y"),
+        "UEmpty": features(),
+    }
+    added = {"UNew": features("A", "B", "C", "D", "F"), "UFar": features("Y", "Z", "W", "V"), "UEmpty2": features()}
+    assert match_similar(removed, added, threshold=0.5) == [("UOld", "UNew", 0.8)]
+
+def test_unrelated_sets_do_not_pair():
+    """Test similar items the `related` predicate rejects, e.g. alike only by their bases, are not paired"""
+    removed = {"UFaded": features("public UObject", "void A()", "void B()")}
+    added = {"UUnrelated": features("public UObject", "void A()", "void C()")}
+    shared_functions = lambda prev, cur: len(removed[prev] & added[cur] - {"public UObject"}) >= 2
+    assert match_similar(removed, added) == [("UFaded", "UUnrelated", 0.5)]
+    assert match_similar(removed, added, related=shared_functions) == []
+    added["URenamed"] = features("public AActor", "void A()", "void B()")
+    assert match_similar(removed, added, related=shared_functions) == [("UFaded", "URenamed", 0.5)]
+
+def test_minhash_signatures():
+    """Test signatures are stable and estimate similarity, so similar sets share a band"""
+    index = MinHashLSH()
+    assert index.signature(["A", "B"]) == MinHashLSH().signature(["B", "A"])
+    assert stable_hash("UFoo") == stable_hash("UFoo") != stable_hash("UBar")
+    index.add("UNew", [f"F{i}" for i in range(20)])
+    index.add("UFar", [f"G{i}" for i in range(20)])
+    assert index.candidates([f"F{i}" for i in range(1, 21)]) == {"UNew"}
+
+def test_matches_at_scale():
+    """Test renamed items are found among many unrelated ones, as an exhaustive comparison finds them"""
+    rng = random.Random(3)
+    removed, added = {}, {}
+    for i in range(500):
+        functions = [f"void F{rng.randrange(10 ** 6)}()" for _ in range(8)]
+        removed[f"UOld{i}"] = frozenset(functions)
+        added[f"UNew{i}"] = frozenset(functions[1:] + ["void Added()"]) if i % 2 else frozenset([f"void G{i}()"])
+    pairs = match_similar(removed, added, threshold=0.6)
+    expected = {
+        (prev, cur) for prev, prev_features in removed.items() for cur, cur_features in added.items()
+        if jaccard(prev_features, cur_features) >= 0.6
+    }
+    assert {(prev, cur) for prev, cur, _ in pairs} == expected
+    assert len(pairs) == 250
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import pytest
+from DiffTool import *
+
+@pytest.fixture
+def header(tmp_path):
+    path = tmp_path / "Header.h"
+    path.write_text("UCLASS() class UFoo : public UObject {};")
+    return str(path)
+
+def test_miss_then_hit(tmp_path, header):
+    """Test a stored result is served on the next lookup"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.get(header) == (False, None)
+        cache.put(header, {"UFoo": []})
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.get(header) == (True, {"UFoo": []})
+        assert (cache.hits, cache.misses) == (1, 0)
+
+def test_content_change_misses(tmp_path, header):
+    """Test edited files are re-parsed"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        cache.get(header)
+        cache.put(header, "old")
+    with open(header, "a") as f:
+        f.write("\n// edited")
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.get(header) == (False, None)
+
+def test_edit_while_parsing_misses(tmp_path, header):
+    """Test a file edited after being read is not served the result parsed from its previous contents"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        cache.get(header)
+        with open(header, "rb") as f:
+            data = f.read()
+        with open(header, "w") as f:
+            f.write("UCLASS() class UBar : public UObject {};")
+        st = os.stat(header)
+        os.utime(header, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        cache.put(header, {"UFoo": []}, digest=content_digest(data))
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.get(header) == (False, None)
+
+def test_missing_file_misses(tmp_path):
+    """Test looking up a file that cannot be read is a miss"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.get(str(tmp_path / "Missing.h")) == (False, None)
+
+def test_touched_file_with_same_content_hits(tmp_path, header):
+    """Test a modification time change alone does not invalidate the entry"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        cache.get(header)
+        cache.put(header, "value")
+    st = os.stat(header)
+    os.utime(header, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert cache.get(header) == (True, "value")
+
+def test_results_are_committed_before_close(tmp_path, header):
+    """Test stored results survive a scan that is interrupted before the cache is closed"""
+    cache = ParseCache(str(tmp_path / "cache.sqlite"), "1", commit_interval=0)
+    cache.get(header)
+    cache.put(header, "value")
+    db = sqlite3.connect(str(tmp_path / "cache.sqlite"))
+    assert db.execute("SELECT path FROM entries").fetchall() == [(header,)]
+    db.close()
+    cache.close()
+
+def test_variants_are_separate(tmp_path, header):
+    """Test results for different variants of the same file do not collide"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        cache.put(header, "5.5", variant="5.5")
+        assert cache.get(header, variant="5.6") == (False, None)
+        assert cache.get(header, variant="5.5") == (True, "5.5")
+
+def test_tool_version_change_invalidates(tmp_path, header):
+    """Test bumping the tool version drops every entry"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        cache.put(header, "value")
+    with ParseCache(str(tmp_path / "cache.sqlite"), "2") as cache:
+        assert cache.get(header) == (False, None)
+
+def test_explicit_invalidation(tmp_path, header):
+    """Test entries can be dropped per file"""
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        cache.put(header, "value")
+        cache.invalidate(header)
+        assert cache.get(header) == (False, None)
+
+def test_size_bounded_eviction(tmp_path):
+    """Test least recently used entries are evicted past the size bound"""
+    files = []
+    for i in range(4):
+        path = tmp_path / f"H{i}.h"
+        path.write_text(str(i))
+        files.append(str(path))
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1", max_bytes=2500) as cache:
+        for file in files:
+            cache.put(file, "x" * 1000)
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        assert [cache.get(file)[0] for file in files] == [False, False, True, True]
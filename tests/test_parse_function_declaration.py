@@ -88,3 +88,10 @@ def test_array_parameters():
     
     assert result['params'][0]['type'] == 'int[]'
     assert result['params'][1]['type'] == 'char*[]'
+
+# Test function type template arguments
+def test_function_type_template_argument():
+    func_decl = "TFunction<bool(int32, const FString&)> MakeFilter() {}"
+    result = parse_function_declaration(func_decl)
+    
+    assert result['type'] == 'TFunction<bool(int32, const FString&)>'
@@ -0,0 +1,59 @@
+from DiffTool import *
+
+DECLARATIONS = [
+    "void DoIt(const FVector& V = FVector{0, 0, 0}) const",
+    "int32 OldGetter() const",
+    "static TArray<FString> GetNames()",
+    "TMap<int32, TArray<FName>> Lookup(UObject* Context, float Scale = 1.0f)",
+]
+
+def test_batch_matches_single_parses():
+    """Test declarations parsed together get the signatures they get when parsed one by one"""
+    batched = parse_function_signatures(DECLARATIONS)
+    assert batched == [parse_function_signatures([declaration])[0] for declaration in DECLARATIONS]
+    assert batched[3] == {
+        'name': 'Lookup',
+        'type': 'TMap<int32, TArray<FName>>',
+        'params': [{'type': 'UObject*', 'name': 'Context'}, {'type': 'float', 'name': 'Scale'}],
+        'const': False,
+        'static': False,
+    }
+
+def test_qualifiers():
+    """Test const and static qualifiers are recorded"""
+    signatures = parse_function_signatures(DECLARATIONS)
+    assert [(s['const'], s['static']) for s in signatures] == [
+        (True, False), (True, False), (False, True), (False, False)
+    ]
+
+def test_failures_are_mapped_back():
+    """Test declarations that fail to parse get None without affecting the others"""
+    declarations = ["void Bad(int32 X Y)"] + DECLARATIONS[:2] + ["", "int32 Field", "bool (Broken"] + DECLARATIONS[2:]
+    signatures = parse_function_signatures(declarations)
+    assert [s is None for s in signatures] == [True, False, False, True, True, True, False, False]
+    assert [s for s in signatures if s is not None] == parse_function_signatures(DECLARATIONS)
+
+def test_format_function_signature():
+    """Test formatted signatures leave out parameter names and default values"""
+    formatted = [format_function_signature(s) for s in parse_function_signatures(DECLARATIONS)]
+    assert formatted == [
+        "void DoIt(const FVector&) const",
+        "int32 OldGetter() const",
+        "static TArray<FString> GetNames()",
+        "TMap<int32, TArray<FName>> Lookup(UObject*, float)",
+    ]
+    assert parse_function_signatures([]) == []
+
+def test_function_type_parameters():
+    """Test function types in template arguments and function pointers are part of the signature"""
+    declarations = [
+        "void Bind(TFunction<void(int32, const FString&)> Callback)",
+        "void Bind(TFunction<void(float)> Callback)",
+        "void Call(void (*Raw)(float, ...))",
+    ]
+    formatted = [format_function_signature(s) for s in parse_function_signatures(declarations)]
+    assert formatted == [
+        "void Bind(TFunction<void(int32, const FString&)>)",
+        "void Bind(TFunction<void(float)>)",
+        "void Call(void(*)(float, ...))",
+    ]
@@ -0,0 +1,66 @@
+import pytest
+from DiffTool import *
+
+def test_line_comments():
+    """Test line comments are removed up to the line break"""
+    assert preprocess_source("int a; // comment\nint b;") == "int a; \nint b;"
+
+def test_block_comments_keep_line_breaks():
+    """Test block comments are removed while keeping their line breaks"""
+    assert preprocess_source("a /* one\ntwo */ b") == "a \n b"
+    assert preprocess_source("a/**/b") == "a b"
+
+def test_comment_markers_inside_strings():
+    """Test comment markers inside string literals are kept"""
+    s = 'FString Path = "C://Temp/*x*/";'
+    assert preprocess_source(s) == s
+
+def test_quotes_inside_comments():
+    """Test quotes inside comments do not start string literals"""
+    assert preprocess_source('/* "unterminated */ int a; // it\'s\nint b;') == "  int a; \nint b;"
+
+def test_text_literals_emptied():
+    """Test TEXT macro literals are emptied"""
+    assert preprocess_source('Log(TEXT("a \\" // b"));') == 'Log(TEXT(""));'
+    assert preprocess_source('MYTEXT("kept")') == 'MYTEXT("kept")'
+
+def test_preprocessor_directives():
+    """Test directives, including continued lines, are removed"""
+    s = '#include "A.h"\n  #define X(a) \\\n    a\nint y;'
+    assert preprocess_source(s) == "\n\n\nint y;"
+
+def test_strip_strings():
+    """Test all string and character literal bodies are emptied on request"""
+    s = 'a = "x"; b = \'y\'; c = 1\'000;'
+    assert preprocess_source(s, strip_strings=True) == "a = \"\"; b = ''; c = 1'000;"
+
+def test_raw_strings():
+    """Test raw string literals are lexed as a whole"""
+    s = 'R"x(quote " and // )x" tail'
+    assert preprocess_source(s) == s
+    assert preprocess_source(s, strip_strings=True) == '"" tail'
+
+def test_strip_macro_lines():
+    """Test lines starting with the given macros are removed"""
+    s = "UPROPERTY(EditAnywhere)\nint32 X;\n\tUFUNCTION() void F();\nUPROPERTYish Y;"
+    result = preprocess_source(s, strip_macro_lines=("UPROPERTY", "UFUNCTION"))
+    assert result == "\nint32 X;\n\nUPROPERTYish Y;"
+
+@pytest.mark.parametrize("code", [
+    '"unterminated string\nint a;',
+    "/* unterminated comment",
+    "#define X \\",
+])
+def test_unterminated_tokens(code):
+    """Test unterminated tokens end at the line break or the end of input"""
+    assert preprocess_source(code).count("\n") == code.count("\n")
+
+def test_strip_macro_lines_after_preprocessing():
+    """Test stripping macro lines from cleaned code matches stripping them while preprocessing"""
+    s = (
+        '// UFUNCTION() in a comment\nUCLASS(meta=(A="// not a comment"))\nclass UFoo\n{\n'
+        '\tUFUNCTION(BlueprintCallable) \\\n\t\tvoid F();\n\tconst char* S = R"(\nUPROPERTY()\n)";\n};'
+    )
+    macros = ("UCLASS", "UFUNCTION", "UPROPERTY")
+    assert strip_macro_lines(preprocess_source(s), macros) == preprocess_source(s, strip_macro_lines=macros)
+    assert strip_macro_lines("UFUNCTION() void F();", ()) == "UFUNCTION() void F();"
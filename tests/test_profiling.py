@@ -0,0 +1,98 @@
+import json
+import pytest
+from DiffTool import *
+
+def _profiled(path):
+    with profiler.file(path, 10):
+        with profiler.stage("work"):
+            pass
+    return path
+
+@pytest.fixture
+def global_profiler():
+    yield profiler
+    profiler.reset()
+
+def test_disabled_records_nothing():
+    """Test a disabled profiler hands out no-op context managers and records nothing"""
+    disabled = Profiler()
+    with disabled.file("Foo.h", 10):
+        with disabled.stage("parse"):
+            pass
+    disabled.error("ValueError")
+    disabled.add("read wait", 1.0)
+    assert disabled.stages == {} and disabled.files == [] and not disabled.errors
+
+def test_stages_accumulate():
+    """Test repeated stages sum their times and calls"""
+    enabled = Profiler(enabled=True)
+    for _ in range(3):
+        with enabled.stage("parse"):
+            pass
+    enabled.add("read wait", 0.5, 2)
+    assert enabled.stages["parse"][1] == 3
+    assert enabled.stages["read wait"] == [0.5, 2]
+
+def test_file_costs_and_errors():
+    """Test stages inside a file are attributed to it, and errors mark the file"""
+    enabled = Profiler(enabled=True)
+    with enabled.file("Foo.h", 100):
+        with enabled.stage("preprocess"):
+            pass
+        enabled.error("ValueError")
+    with pytest.raises(KeyError):
+        with enabled.file("Bar.h", 50):
+            raise KeyError("Bar")
+    with enabled.stage("report"):
+        pass
+
+    foo, bar = enabled.files
+    assert (foo.path, foo.bytes, foo.error, list(foo.stages)) == ("Foo.h", 100, "ValueError", ["preprocess"])
+    assert bar.error == "KeyError"
+    assert enabled.errors == {"ValueError": 1, "KeyError": 1}
+
+def test_summary_lists_slowest_files():
+    """Test the summary reports totals, stages and the slowest files first"""
+    enabled = Profiler(enabled=True)
+    enabled.files = [FileCost("Fast.h", 1024, 0.1), FileCost("Slow.h", 2048, 0.5), FileCost("Medium.h", 0, 0.2)]
+    enabled.add("parse", 0.8, 3)
+    enabled.error("read")
+    assert [cost.path for cost in enabled.slowest_files(2)] == ["Slow.h", "Medium.h"]
+    summary = enabled.summary(top=2)
+    assert "3 files" in summary and "1 errors (read 1)" in summary and "parse" in summary
+    assert summary.index("Slow.h") < summary.index("Medium.h") and "Fast.h" not in summary
+
+def test_merge():
+    """Test merging adds the stages, files and errors of another profiler"""
+    parent, worker = Profiler(enabled=True), Profiler(enabled=True)
+    parent.add("parse", 1.0)
+    worker.add("parse", 2.0)
+    with worker.file("Foo.h"):
+        worker.error("ValueError")
+    parent.merge(worker.state())
+    assert parent.stages["parse"] == [3.0, 2]
+    assert [cost.path for cost in parent.files] == ["Foo.h"]
+    assert parent.errors["ValueError"] == 1
+
+def test_chrome_trace_export(tmp_path):
+    """Test the trace holds one complete event per timed span"""
+    enabled = Profiler(enabled=True, trace=True)
+    with enabled.file("Engine/Foo.h", 10):
+        with enabled.stage("parse"):
+            pass
+    path = tmp_path / "trace.json"
+    enabled.export_chrome_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [(event["name"], event["cat"], event["ph"]) for event in events] == [
+        ("parse", "stage", "X"), ("Foo.h", "file", "X")
+    ]
+    assert events[1]["args"] == {"path": "Engine/Foo.h", "bytes": 10}
+
+def test_worker_profiles_reach_parent(global_profiler):
+    """Test map_files ships what worker processes record back to the parent profiler"""
+    files = [f"{i}.h" for i in range(20)]
+    for workers in (1, 3):
+        global_profiler.reset(True)
+        assert list(map_files(_profiled, files, workers=workers)) == files
+        assert sorted(cost.path for cost in global_profiler.files) == sorted(files)
+        assert global_profiler.stages["work"][1] == 20
@@ -0,0 +1,50 @@
+import pytest
+import blueprint_diff as bd
+from DiffTool import *
+
+def header(class_name, *functions):
+    body = "".join(f"    UFUNCTION(BlueprintCallable)\n    {function};\n" for function in functions)
+    return f"UCLASS(BlueprintType)\nclass {class_name} : public UObject\n{{\n    GENERATED_BODY()\npublic:\n{body}}};\n"
+
+PREV = {
+    "Same.h": header("USame", "void Do()"),
+    "Changed.h": header("UChanged", "void Do()"),
+    "Deprecated.h": header("UDeprecated", "void Old()", "void Do()").replace(
+        "    UFUNCTION", '    UE_DEPRECATED(5.6, "Use Do")\n    UFUNCTION', 1
+    ),
+}
+CUR = {
+    **PREV,
+    "Changed.h": header("UChanged", "void Do()", "void Undo()"),
+    "Added.h": header("UAdded", "void Do()"),
+}
+
+def write_tree(root, headers):
+    public = root / "Engine\\Source" / "Runtime" / "Core" / "Public"
+    public.mkdir(parents=True)
+    for name, text in headers.items():
+        (public / name).write_text(text)
+    return root
+
+@pytest.fixture
+def trees(tmp_path, monkeypatch):
+    monkeypatch.setattr(bd, "QUARANTINE_PATH", str(tmp_path / "quarantine.json"))
+    return write_tree(tmp_path / "Prev", PREV), write_tree(tmp_path / "Cur", CUR)
+
+@pytest.mark.parametrize("prev_version", ["5.6", "5.5"])
+def test_pruned_matches_full_parse(trees, prev_version):
+    """Test carrying unchanged headers over yields the classes of a full parse of the current tree, in order"""
+    prev_root, cur_root = trees
+    prev, cur = bd.load_ue_classes_pruned(prev_root, cur_root, prev_version, "5.6", None, None, None)
+    full = bd.parse_ue_classes(cur_root, "5.6", None, cache_path=None)
+    assert list(cur) == list(full) and cur == full
+    assert cur["USame"] is prev["USame"] and cur["UChanged"] is not prev["UChanged"]
+
+def test_deprecations_are_reparsed_across_versions(trees):
+    """Test unchanged headers with deprecations are parsed again when the versions differ, and carried over if not"""
+    prev_root, cur_root = trees
+    prev, cur = bd.load_ue_classes_pruned(prev_root, cur_root, "5.5", "5.6", None, None, None)
+    functions = lambda classes: [function.name for function in classes["UDeprecated"].ufunctions]
+    assert functions(prev) == ["Old", "Do"] and functions(cur) == ["Do"]
+    prev, cur = bd.load_ue_classes_pruned(prev_root, cur_root, "5.5", "5.5", None, None, None)
+    assert cur["UDeprecated"] is prev["UDeprecated"]
@@ -0,0 +1,39 @@
+import pickle
+from DiffTool import *
+
+def make_record():
+    return UClassRecord(
+        name="".join(["UFoo"]),
+        relpath="Foo.h",
+        uclass_params=["BlueprintType"],
+        inheritance_list=[BaseRef("public", "UObject")],
+        ufunctions=[UFunctionRecord("Bar", ["BlueprintCallable", 'Category="A"'], "void Bar(int32 X) const")],
+    )
+
+def test_slots():
+    """Test records carry no per-instance dictionary"""
+    record = make_record()
+    assert not hasattr(record, "__dict__")
+    assert not hasattr(record.ufunctions[0], "__dict__")
+    assert not hasattr(record.inheritance_list[0], "__dict__")
+
+def test_sequences_are_tuples():
+    """Test specifier and base lists are stored as tuples"""
+    record = make_record()
+    assert record.uclass_params == ("BlueprintType",)
+    assert record.inheritance_list == (BaseRef("public", "UObject"),)
+    assert record.ufunctions[0].ufunc_params == ("BlueprintCallable", 'Category="A"')
+
+def test_strings_are_interned():
+    """Test equal names and specifiers share one object"""
+    first, second = make_record(), make_record()
+    assert first.name is second.name
+    assert first.ufunctions[0].ufunc_params[1] is second.ufunctions[0].ufunc_params[1]
+
+def test_pickle_round_trip_interns():
+    """Test records sent between processes are equal and interned again"""
+    record = make_record()
+    loaded = pickle.loads(pickle.dumps(record))
+    assert loaded == record
+    assert loaded.name is record.name
+    assert loaded.inheritance_list[0].name is record.inheritance_list[0].name
@@ -68,3 +68,18 @@ def test_incomplete_strings():
     code = '''bad_string = "unterminated\nanother = 'valid' '''
     expected = '''bad_string = "unterminated\nanother = \"\" '''
     assert remove_string_literals(code) == expected
+
+def test_unterminated_triple_quotes():
+    # Test an unterminated triple-quoted literal falls back to single-quoted literals
+    code = '''x = """abc"'''
+    expected = '''x = \"\"\"\"'''
+    assert remove_string_literals(code) == expected
+
+def test_many_unterminated_literals():
+    # Test inputs made of unterminated literals are left in place, quickly
+    code = 'x = "' + '\\"' * 50000 + " '" + "\\'" * 50000
+    assert remove_string_literals(code) == code
+    code = '"""' + 'x\\"""' * 20000
+    assert remove_string_literals(code) == '"' + '""' * 20001
+    code = 'TEXT(rf"' * 20000
+    assert remove_string_literals(code) == 'TEXT(""' * 10000
@@ -0,0 +1,61 @@
+import csv
+import json
+import zipfile
+import pytest
+from DiffTool import *
+
+COLUMNS = ["class_name", "function", "change_type"]
+ROWS = [
+    {"class_name": "UFoo", "function": "Bar", "change_type": "Added"},
+    {"class_name": "UFoo", "function": "Baz, with comma", "change_type": None},
+    ["ULongerClassName", "Qux", "Removed"],
+]
+
+def test_csv(tmp_path):
+    """Test CSV reports hold a header and every row, with missing values empty"""
+    path = str(tmp_path / "report.csv")
+    with open_report_writer(path, COLUMNS) as writer:
+        writer.write_rows(ROWS)
+    with open(path, newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [
+            COLUMNS,
+            ["UFoo", "Bar", "Added"],
+            ["UFoo", "Baz, with comma", ""],
+            ["ULongerClassName", "Qux", "Removed"],
+        ]
+    assert writer.rows_written == 3
+
+def test_jsonl(tmp_path):
+    """Test JSON Lines reports hold one object per row"""
+    path = str(tmp_path / "out" / "report.jsonl")
+    with open_report_writer(path, COLUMNS) as writer:
+        writer.write_rows(ROWS)
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[1] == {"class_name": "UFoo", "function": "Baz, with comma", "change_type": None}
+    assert records[2]["class_name"] == "ULongerClassName"
+
+def test_xlsx(tmp_path):
+    """Test Excel reports are named by the title and sized to the longest value of each column"""
+    path = str(tmp_path / "report.xlsx")
+    with open_report_writer(path, COLUMNS, "API Changes") as writer:
+        writer.write_rows(ROWS)
+    with zipfile.ZipFile(path) as workbook:
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        assert 'name="API Changes"' in workbook.read("xl/workbook.xml").decode()
+    assert sheet.count("<row ") == 4
+    assert 'width="18.7109375"' in sheet     # len("ULongerClassName") + 2
+
+def test_parquet(tmp_path):
+    """Test Parquet reports round trip through pyarrow"""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "report.parquet")
+    with ParquetReportWriter(path, COLUMNS, batch_size=2) as writer:
+        writer.write_rows(ROWS)
+    table = parquet.read_table(path)
+    assert table.column("function").to_pylist() == ["Bar", "Baz, with comma", "Qux"]
+
+def test_unknown_format(tmp_path):
+    """Test unsupported extensions are rejected"""
+    with pytest.raises(ValueError):
+        open_report_writer(str(tmp_path / "report.txt"), COLUMNS)
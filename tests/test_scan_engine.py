@@ -0,0 +1,133 @@
+import os
+import pytest
+from DiffTool import *
+
+class NameAnalyzer(Analyzer):
+    name = "names"
+    keywords = (b"UCLASS",)
+    cache_variant = "1"
+
+    def analyze(self, source, result):
+        result.append((source.relpath, source.code.split()[1]))
+
+class LengthAnalyzer(Analyzer):
+    name = "lengths"
+
+    def analyze(self, source, result):
+        if "FAIL" in source.text:
+            result.append("partial")
+            raise ValueError("failed")
+        result.append(len(source.code_without_macro_lines(("UCLASS",))))
+
+class SharedSourceAnalyzer(Analyzer):
+    name = "shared"
+
+    def analyze(self, source, result):
+        result.append(source.code is source.code and source.brackets is source.brackets)
+
+@pytest.fixture
+def tree(tmp_path):
+    files = []
+    for i, content in enumerate([
+        "UCLASS() class UFoo {};",
+        "struct FBar {}; // no class macro",
+        "UCLASS() class UBaz {}; FAIL",
+    ]):
+        path = tmp_path / f"Header{i}.h"
+        path.write_bytes(content.encode())
+        files.append(str(path))
+    return str(tmp_path), files
+
+def test_results_in_file_order(tree):
+    """Test every analyzer reports a result and error for every file, in file order"""
+    root, files = tree
+    results = list(scan_files(files, root, [NameAnalyzer(), LengthAnalyzer()], workers=1))
+    assert [file_path for file_path, _ in results] == files
+    assert [outcomes["names"] for _, outcomes in results] == [
+        ([("Header0.h", "class")], None), ([], None), ([("Header2.h", "class")], None)
+    ]
+    assert results[1][1]["lengths"] == ([len("struct FBar {}; ")], None)
+
+def test_errors_keep_partial_results(tree):
+    """Test an analyzer error is reported for its file with what was found before it"""
+    root, files = tree
+    outcomes = dict(scan_files(files, root, [NameAnalyzer(), LengthAnalyzer()], workers=1))
+    assert outcomes[files[2]]["lengths"] == (["partial"], "failed")
+    assert outcomes[files[2]]["names"][1] is None
+
+def test_keywords_skip_files(tree):
+    """Test files without an analyzer's keywords are not decoded for it"""
+    root, files = tree
+    stats = PrefilterStats()
+    outcomes = dict(scan_files(files, root, [NameAnalyzer()], workers=1, prefilter_stats=stats))
+    assert outcomes[files[1]]["names"] == ([], None)
+    assert (stats.files_scanned, stats.files_skipped) == (3, 1)
+
+def test_source_is_preprocessed_once(tree):
+    """Test the decoded and preprocessed source is shared by the analyzers of a file"""
+    root, files = tree
+    outcomes = dict(scan_files(files, root, [SharedSourceAnalyzer()], workers=1))
+    assert all(outcome["shared"] == ([True], None) for outcome in outcomes.values())
+
+def test_parallel_matches_serial(tree):
+    """Test worker processes yield the same results as an in-process scan"""
+    root, files = tree
+    analyzers = [NameAnalyzer(), LengthAnalyzer()]
+    assert list(scan_files(files, root, analyzers, workers=2)) == list(scan_files(files, root, analyzers, workers=1))
+
+def test_cached_results_skip_reading(tree, tmp_path):
+    """Test results of cacheable analyzers are served from the cache on the next scan"""
+    root, files = tree
+    cache_path = str(tmp_path / "cache" / "cache.sqlite")
+    with ParseCache(cache_path, "1") as cache:
+        first = list(scan_files(files, root, [NameAnalyzer()], workers=1, cache=cache))
+    with ParseCache(cache_path, "1") as cache:
+        stats = LoadStats()
+        second = list(scan_files(files, root, [NameAnalyzer()], workers=1, cache=cache, load_stats=stats))
+        assert (cache.hits, stats.files_loaded) == (3, 0)
+    assert second == first
+
+def test_read_errors(tree):
+    """Test unreadable files are reported to every analyzer"""
+    root, files = tree
+    missing = os.path.join(root, "Missing.h")
+    outcomes = dict(scan_files([missing], root, [NameAnalyzer(), LengthAnalyzer()], workers=1))
+    assert all(result == [] and error for result, error in outcomes[missing].values())
+
+def test_read_errors_are_not_cached(tree, tmp_path):
+    """Test unreadable files are reported without being cached, and files are read once to be parsed and cached"""
+    root, files = tree
+    missing = os.path.join(root, "Missing.h")
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        stats = LoadStats()
+        outcomes = dict(scan_files(files + [missing], root, [NameAnalyzer()], workers=1, cache=cache, load_stats=stats))
+        assert outcomes[missing]["names"][1] and stats.files_loaded == 2
+        assert cache._db.execute("SELECT path FROM entries ORDER BY path").fetchall() == [(f,) for f in sorted(files)]
+
+def test_unchanged_files_are_not_analyzed(tree, tmp_path):
+    """Test files accepted by `unchanged` are read once, hashed and yielded without outcomes"""
+    root, files = tree
+    with ParseCache(str(tmp_path / "cache.sqlite"), "1") as cache:
+        list(scan_files(files[:1], root, [NameAnalyzer()], workers=1, cache=cache))
+        digests, seen, stats = {}, [], LoadStats()
+        results = list(scan_files(
+            files, root, [NameAnalyzer()], workers=1, cache=cache, load_stats=stats, digests=digests,
+            unchanged=lambda file_path, data, digest: seen.append(file_path) or file_path == files[1],
+        ))
+    assert [outcomes is None for _, outcomes in results] == [False, True, False]
+    assert seen == files[1:] and stats.files_loaded == 1
+    with open(files[0], "rb") as f:
+        assert digests[files[0]] == content_digest(f.read()) and sorted(digests) == sorted(files)
+
+def test_decode_errors():
+    """Test invalid UTF-8 is dropped from the text and kept as the decode error"""
+    source = SourceFile("Foo.h", "", b"class \xff UFoo {};")
+    assert source.text == "class  UFoo {};"
+    assert isinstance(source.decode_error, UnicodeDecodeError)
+    assert SourceFile("Foo.h", "", b"class UFoo {};").decode_error is None
+
+def test_engine_target_dirs():
+    """Test the header directories of each part of an engine tree"""
+    assert [os.path.basename(path) for path in engine_target_dirs("UE", "Source")] == ["Developer", "Editor", "Runtime"]
+    assert engine_target_dirs("UE", "Plugins") == [os.path.join("UE", "Engine\\Plugins")]
+    assert len(engine_target_dirs("UE")) == 4
@@ -0,0 +1,62 @@
+from DiffTool import *
+
+CODE = """
+namespace UE::Foo
+{
+namespace
+{
+    int Hidden;
+}
+template <class T>
+struct TBar : public TBase<T>
+{
+    void Method() { if (bValid) { Body; } }
+public:
+    struct ENGINE_API UE_DEPRECATED(5.0, "Use FOther") FInner final
+    {
+        int Nested;
+    };
+    enum class EKind : uint8 { First, Second };
+    int AfterInner;
+};
+const char* Text = "class UNotAScope {";
+class ENGINE_API UBaz : public UObject { int Member; };
+}
+int Global;
+"""
+
+def resolve(name):
+    return ScopeMap(CODE).resolve(CODE.index(name))
+
+def test_namespaces_and_classes():
+    """Test positions resolve to their fully qualified enclosing scope"""
+    assert resolve("TBase") == "UE::Foo"
+    assert resolve("Method") == "UE::Foo::TBar"
+    assert resolve("Member") == "UE::Foo::UBaz"
+
+def test_nested_types():
+    """Test nested structs qualify with their outer class, and the outer scope resumes after them"""
+    assert resolve("Nested") == "UE::Foo::TBar::FInner"
+    assert resolve("AfterInner") == "UE::Foo::TBar"
+
+def test_transparent_braces():
+    """Test function bodies, enums and anonymous namespaces do not add to the scope"""
+    assert resolve("Body") == "UE::Foo::TBar"
+    assert resolve("Second") == "UE::Foo::TBar"
+    assert resolve("Hidden") == "UE::Foo"
+
+def test_strings_and_global_scope():
+    """Test braces in string literals are ignored, and global positions resolve to None"""
+    assert resolve("UNotAScope") == "UE::Foo"
+    assert resolve("Global") is None
+
+def test_unclosed_scope():
+    """Test a scope left open extends to the end of the code"""
+    code = "class UFoo : public UObject { void Bar();"
+    assert ScopeMap(code).resolve(code.index("Bar")) == "UFoo"
+
+def test_deprecation_scope():
+    """Test deprecations resolve to the class declaring them"""
+    code = 'namespace NS {\nclass UFoo {\n  UE_DEPRECATED(5.6, "x")\n  void Bar();\n};\n}\n'
+    deprecation = find_deprecations(code)[0]
+    assert ScopeMap(code).resolve(deprecation["span"][0]) == "NS::UFoo"
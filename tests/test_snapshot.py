@@ -0,0 +1,83 @@
+import sqlite3
+import time
+import pytest
+from DiffTool import *
+
+def make_classes(count):
+    return {
+        f"UClass{i}": UClassRecord(
+            name=f"UClass{i}",
+            relpath=f"Engine\\Plugins\\P{i % 7}\\Source\\Public\\Class{i}.h",
+            uclass_params=("BlueprintType", 'meta=(DisplayName="Class")') if i % 2 else (),
+            inheritance_list=(BaseRef("public", f"UClass{i - 1}"),) if i else (),
+            ufunctions=[
+                UFunctionRecord(
+                    f"Function{j}", ("BlueprintCallable", 'Category="A|B"') if j % 2 else (),
+                    f"void Function{j}(const TArray<int32>& Values, float Scale = 1.f) const" if j % 3 else "",
+                )
+                for j in range(i % 4)
+            ],
+        )
+        for i in range(count)
+    }
+
+def test_round_trip(tmp_path):
+    """Test a snapshot loads back to the saved classes, in the same order, with its metadata"""
+    u_classes = make_classes(50)
+    path = str(tmp_path / f"UE_5.5{SNAPSHOT_SUFFIX}")
+    save_snapshot(u_classes, path, engine_version="5.5", choice="Plugins")
+    loaded, meta = load_snapshot(path)
+    assert loaded == u_classes
+    assert list(loaded) == list(u_classes)
+    assert meta == {"engine_version": "5.5", "choice": "Plugins"}
+
+def test_multiple_bases_and_empty_params(tmp_path):
+    """Test empty lists and several bases survive the round trip"""
+    u_classes = {"UFoo": UClassRecord(
+        name="UFoo",
+        relpath="Foo.h",
+        inheritance_list=(BaseRef("public", "UObject"), BaseRef("private", "IBar")),
+        ufunctions=[UFunctionRecord("Baz")],
+    )}
+    path = str(tmp_path / "foo.uesnap")
+    save_snapshot(u_classes, path)
+    assert load_snapshot(path) == (u_classes, {})
+
+def test_overwrite(tmp_path):
+    """Test saving over an existing snapshot replaces it"""
+    path = str(tmp_path / "foo.uesnap")
+    save_snapshot(make_classes(10), path)
+    save_snapshot(make_classes(3), path)
+    assert load_snapshot(path)[0] == make_classes(3)
+
+def test_missing_file(tmp_path):
+    """Test a missing snapshot is reported"""
+    with pytest.raises(ValueError):
+        load_snapshot(str(tmp_path / "missing.uesnap"))
+
+def test_not_a_snapshot(tmp_path):
+    """Test other files are rejected"""
+    path = tmp_path / "Header.h"
+    path.write_text("UCLASS() class UFoo : public UObject {};")
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+def test_format_version_mismatch(tmp_path):
+    """Test snapshots written in another format version are rejected"""
+    path = str(tmp_path / "foo.uesnap")
+    save_snapshot(make_classes(3), path)
+    with sqlite3.connect(path) as db:
+        db.execute("UPDATE meta SET value = '0' WHERE key = 'format_version'")
+    db.close()
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+def test_load_speed(tmp_path):
+    """Test a snapshot of an engine-sized tree loads well under a second"""
+    u_classes = make_classes(20000)
+    path = str(tmp_path / "large.uesnap")
+    save_snapshot(u_classes, path)
+    start = time.perf_counter()
+    loaded, _ = load_snapshot(path)
+    assert time.perf_counter() - start < 1.0
+    assert len(loaded) == len(u_classes)
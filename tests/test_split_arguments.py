@@ -26,7 +26,12 @@ from DiffTool import *
     
     # Real-world examples
     ("TArray<int32>,FMyStruct", ["TArray<int32>", "FMyStruct"]),
-    ("TMap<FString, FVector>,UObject*", ["TMap<FString, FVector>", "UObject*"])
+    ("TMap<FString, FVector>,UObject*", ["TMap<FString, FVector>", "UObject*"]),
+
+    # Brackets and commas inside string literals
+    ("Category=\"A, (B)\",meta=(Tip='>')", ["Category=\"A, (B)\"", "meta=(Tip='>')"]),
+    ("Tip=\"Say \\\"a, b\\\"\", Pure", ["Tip=\"Say \\\"a, b\\\"\"", "Pure"]),
+    ("Tip=\"unterminated, (", ["Tip=\"unterminated, ("]),
 ])
 
 def test_split_arguments(input_str, expected):
@@ -49,3 +54,10 @@ def test_unbalanced_parentheses_handling():
     with pytest.raises(ValueError) as exc_info:
         split_arguments(invalid_case)
     assert str(exc_info.value) == f"Unbalanced parentheses or brackets in argument string '{invalid_case}'"
+
+def test_adversarial_inputs():
+    """Test deeply nested and unterminated argument lists are split quickly"""
+    depth = 50000
+    assert split_arguments("a, " + "(" * depth + "b, c" + ")" * depth) == ["a", "(" * depth + "b, c" + ")" * depth]
+    unterminated = 'Category="' + '\\", (' * depth
+    assert split_arguments("Pure, " + unterminated) == ["Pure", unterminated]